@@ -81,4 +81,27 @@ LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'login' 
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
-DEFAULT_FROM_EMAIL = 'bilgi@is-takip.com'
\ No newline at end of file
+DEFAULT_FROM_EMAIL = 'bilgi@is-takip.com'
+# Aynı alıcı ve görev için bu süre (saniye) içinde biriken e-postalar tek özet olarak gönderilir
+MAIL_DIGEST_WINDOW = 120
+# Aynı görev, kişi ve olay türündeki okunmamış bildirimler bu süre (saniye) içinde tek satırda birleştirilir
+NOTIFICATION_COALESCE_WINDOW = 600
+# Bildirim saklama süreleri (gün); `manage.py prune_notifications` ile uygulanır
+NOTIFICATION_RETENTION_READ_DAYS = 30
+NOTIFICATION_RETENTION_DAYS = 180
+# Bildirim akışı (SSE): değişiklik ölçütü kontrol aralığı, kalp atışı ve bağlantı ömrü (saniye).
+# Akış yalnızca ASGI altında (ör. `uvicorn config.asgi:application`) açılır. Her kontrol
+# sayaç satırının tek birincil anahtar okumasıdır; kalp atışı kontrol aralığından uzun tutulur.
+NOTIFICATION_STREAM_INTERVAL = 3
+NOTIFICATION_STREAM_HEARTBEAT = 15
+NOTIFICATION_STREAM_LIFETIME = 300
+# Pano yanıt önbelleği. Birden fazla süreçle çalışırken takım sürümlerinin tüm
+# süreçlerce görülmesi için paylaşılan bir arka uç (Redis/Memcached) kullanılmalıdır;
+# `manage.py check --deploy` süreç içi önbellekte uyarır (core.W001).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "is-takip",
+    }
+}
+DASHBOARD_CACHE_TIMEOUT = 600
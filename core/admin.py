@@ -1,6 +1,15 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Task, RoadmapItem, WorkLog, Notification
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import WorkLogImportForm
+from .models import CustomUser, Task, RoadmapItem, WorkLog, EmailOutbox, Notification, NotificationCounter, NotificationOutbox, TeamAnnouncement, WorkLogDaily, WorkloadDay
+from .worklogs import import_worklogs, read_worklog_rows
 
 # Admin paneli global görsel ayarları
 admin.site.site_header = "ASELSAN İş Yönetim Platformu"
@@ -46,4 +55,69 @@ class TaskAdmin(admin.ModelAdmin):
 class WorkLogAdmin(admin.ModelAdmin):
     list_display = ['task', 'user', 'hours', 'date']
     list_filter = ['date', 'user', 'task']
-    search_fields = ['description', 'task__title', 'user__username']
\ No newline at end of file
+    search_fields = ['description', 'task__title', 'user__username']
+    change_list_template = 'admin/core/worklog/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='core_worklog_import'),
+        ] + super().get_urls()
+
+    # Geçmiş zaman çizelgelerinin toplu yüklenmesi; satır başına bildirim ve e-posta üretilmez
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = WorkLogImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            fmt = form.cleaned_data['format'] or ('jsonl' if upload.name.endswith(('.jsonl', '.ndjson')) else 'csv')
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            result = import_worklogs(read_worklog_rows(stream, fmt), dry_run=form.cleaned_data['dry_run'])
+            for line_no, error in result['errors'][:20]:
+                messages.warning(request, f"Satır {line_no}: {error}")
+            verb = 'geçerli' if form.cleaned_data['dry_run'] else 'içe aktarıldı'
+            messages.success(request, f"{result['created']} efor kaydı {verb}, {result['failed']} satır atlandı.")
+            return redirect('admin:core_worklog_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta, 'form': form, 'title': 'Efor kayıtlarını içe aktar',
+        }
+        return TemplateResponse(request, 'admin/core/worklog/import_form.html', context)
+
+# Efor kayıtlarının günlük özet tablosu; raporlar buradan okunur, elle düzenlenmez
+@admin.register(WorkLogDaily)
+class WorkLogDailyAdmin(admin.ModelAdmin):
+    list_display = ['user', 'task', 'team', 'day', 'hours']
+    list_filter = ['team', 'day']
+    search_fields = ['user__username', 'task__title']
+
+# Önceden hesaplanmış iş yükü tablosu; tutarlılık denetimi için salt okunur izlenir
+@admin.register(WorkloadDay)
+class WorkloadDayAdmin(admin.ModelAdmin):
+    list_display = ['user', 'strategy', 'day', 'hours', 'computed_on']
+    list_filter = ['strategy', 'computed_on', 'user__team']
+    search_fields = ['user__username']
+
+# Bildirim kuyruğu; işlenmemiş olayların birikip birikmediği buradan izlenir
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'title', 'task', 'actor', 'created_at', 'processed_at']
+    list_filter = ['level', ('processed_at', admin.EmptyFieldListFilter)]
+    search_fields = ['title', 'message']
+
+@admin.register(TeamAnnouncement)
+class TeamAnnouncementAdmin(admin.ModelAdmin):
+    list_display = ['id', 'team', 'title', 'author', 'level', 'created_at']
+    list_filter = ['team', 'level', 'created_at']
+    search_fields = ['title', 'message']
+
+@admin.register(NotificationCounter)
+class NotificationCounterAdmin(admin.ModelAdmin):
+    list_display = ['user', 'unread_count']
+    search_fields = ['user__username']
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ['id', 'subject', 'task', 'actor', 'created_at', 'sent_at']
+    list_filter = [('sent_at', admin.EmptyFieldListFilter)]
+    search_fields = ['subject', 'body']
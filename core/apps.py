@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # İş yükü tablosunu güncel tutan model sinyallerini kaydeder
+        from . import signals  # noqa: F401
+        # Canlı ortam denetimleri (`manage.py check --deploy`)
+        from . import checks  # noqa: F401
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Süreç içi önbellekler: her süreç kendi kopyasını tutar
+_PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Pano takım sürümleri önbellekte tutulur; canlıda birden fazla süreç aynı sürümleri
+    görmelidir. `manage.py check --deploy` süreç içi önbellekte uyarır.
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if backend not in _PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        "Varsayılan önbellek süreç içi (%s); pano takım sürümleri süreçler arasında "
+        "geçersizleşmez." % backend.rsplit(".", 1)[-1],
+        hint="CACHES['default'] için Redis ya da Memcached gibi paylaşılan bir arka uç kullanın.",
+        id="core.W001",
+    )]
@@ -0,0 +1,258 @@
+import hashlib
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Task, WorkLogDaily
+
+# Panolarda "kapanmış" sayılan görev durumları
+CLOSED_STATUSES = ('tamamlandi', 'iptal')
+
+# Pano önbellek kayıtlarının üst ömrü (saniye); asıl geçersizleştirme takım sürümüyle yapılır
+DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 600)
+
+# Takım sürümleri önbellekte tutulur; birden fazla süreçle çalışırken her süreç aynı sürümü
+# görmelidir, bu yüzden canlıda paylaşılan bir arka uç gerekir (bkz. checks.py). Takımı
+# olmayan kullanıcıların panoları '-' sürümünü paylaşır.
+_VERSION_KEY = 'dashboard:team-version:{}'
+_STATS_KEYS = {'hits': 'dashboard:stats:hits', 'misses': 'dashboard:stats:misses'}
+
+
+# ==========================================
+# PANO ÖNBELLEĞİ
+# ==========================================
+
+def team_data_version(team):
+    """
+    Takımın veri sürümünü döner. Sürüm yoksa (ilk kullanım ya da önbellekten düşmüş)
+    zaman damgasıyla başlatılır; böylece eski sürüm numaralı kayıtlarla çakışmaz.
+    """
+    key = _version_key(team)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def _version_key(team):
+    return _VERSION_KEY.format(team or '-')
+
+
+def bump_team_versions(teams):
+    """
+    Verilen takımların sürümünü artırır; o takımlara ait tüm pano kayıtları geçersizleşir.
+    Boş takım (None/'') takımı olmayan kullanıcıların ortak sürümünü artırır.
+    """
+    for key in {_version_key(t) for t in teams}:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), None)
+
+
+def cached_dashboard(user, view_name, params, builder):
+    """
+    Pano verisini (kullanıcı, görünüm, parametreler, takım veri sürümü) anahtarıyla önbellekten
+    sunar; kayıt yoksa `builder()` çalıştırılıp sonucu saklanır.
+
+    Args:
+        user (CustomUser): Panoyu görüntüleyen kullanıcı.
+        view_name (str): Görünüm adı (ör. 'employee', 'manager-ajax').
+        params (tuple): Strateji, aralık, tarih sınırları gibi yanıtı belirleyen değerler.
+        builder (callable): Önbellek ıskasında çağrılan, saklanabilir (pickle) bir değer döndüren fonksiyon.
+    """
+    digest = hashlib.md5(repr(params).encode('utf-8')).hexdigest()
+    key = f'dashboard:{view_name}:{user.pk}:{team_data_version(user.team)}:{digest}'
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+    _count('misses')
+    value = builder()
+    cache.set(key, value, DASHBOARD_CACHE_TIMEOUT)
+    return value
+
+
+def dashboard_cache_stats():
+    """Pano önbelleğinin isabet (hits) ve ıska (misses) sayaçlarını döner."""
+    return {name: cache.get(key, 0) for name, key in _STATS_KEYS.items()}
+
+
+def _count(name):
+    key = _STATS_KEYS[name]
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+# ==========================================
+# PANO ANLIK GÖRÜNTÜLERİ
+# ==========================================
+
+
+class EmployeeDashboardSnapshot:
+    """
+    Çalışan panosunun görev verisini tek sorguda okuyup bellekte tutan anlık görüntü.
+
+    Ağır Count/Subquery sorgusu bir kez çalıştırılır; uyarılar, kritik görev, bugünün
+    listesi, odak görevleri ve KPI'lar bu listeden Python tarafında türetilir.
+    Şablon `tasks` üzerinde yeniden sorgu tetiklemez.
+    """
+
+    def __init__(self, tasks, today):
+        self.today = today
+        self.tasks = list(tasks)
+        self.count = len(self.tasks)
+
+        self.alerts = []
+        self.today_tasks = []
+        self.focus_tasks = []
+        self.total_remaining_hours = 0.0
+        self.total_completed_steps = 0
+        first_open = None
+
+        for task in self.tasks:
+            self.total_completed_steps += int(task.completed_steps or 0)
+            is_open = task.status not in CLOSED_STATUSES
+            is_today = is_open and task.start_date <= today <= task.due_date
+            if is_today:
+                self.today_tasks.append(task)
+            if task.status == 'calisiliyor' or task.priority == 'yuksek' or is_today:
+                self.focus_tasks.append(task)
+
+            if not is_open:
+                continue
+            if first_open is None:
+                first_open = task
+            self.total_remaining_hours += max(0.0, float(task.planned_hours or 0) - float(task.spent_hours or 0))
+
+            if task.due_date < today:
+                self.alerts.append({"task": task, "type": "danger", "msg": "GECİKMİŞ GÖREV!"})
+            elif task.status == 'baslanmadi' and (task.due_date - today).days <= 2:
+                self.alerts.append({"task": task, "type": "warning", "msg": "VADE YAKLAŞIYOR! (Henüz başlanmadı)"})
+
+        self.urgent_task = self.alerts[0]["task"] if self.alerts else first_open
+
+    @classmethod
+    def for_user(cls, user, today):
+        """
+        Kullanıcının sorumlu ya da ortak olduğu görevleri kişisel efor ve yol haritası
+        sayılarıyla birlikte tek sorguda yükler.
+        """
+        # Alt sorgu: Kullanıcının ilgili göreve harcadığı kişisel efor toplamını günlük özet tablodan getirir (şişmeyi önler)
+        user_contrib_sq = (
+            WorkLogDaily.objects
+            .filter(task=OuterRef("pk"), user=user)
+            .values("task")
+            .annotate(total=Sum("hours"))
+            .values("total")[:1]
+        )
+        tasks = (
+            Task.objects.involving(user)
+            .annotate(
+                user_contribution=Coalesce(
+                    Subquery(user_contrib_sq, output_field=DecimalField(max_digits=6, decimal_places=2)),
+                    Value(0, output_field=DecimalField(max_digits=6, decimal_places=2)),
+                ),
+                total_steps=Count("roadmap", distinct=True),
+                completed_steps=Count("roadmap", filter=Q(roadmap__is_completed=True), distinct=True),
+            ).order_by("due_date")
+        )
+        return cls(tasks, today)
+
+
+class TeamDashboardSnapshot:
+    """
+    Yönetici panosunun tüm görev panellerini tek taramada kuran anlık görüntü.
+
+    Takımın görevleri yol haritası sayılarıyla tek sorguda, iş ortağı id'leri ara
+    tablodan bir sorguda okunur. Üye grupları, bugünün listesi, kritik görevler,
+    seçime göre tablo/odak listeleri ve KPI'lar aynı döngüde sınıflandırılır.
+    """
+
+    def __init__(self, tasks, partner_ids, employees, today, target_user=None):
+        self.today = today
+        self.today_tasks = []
+        self.delayed_tasks = []
+        self.tasks = []
+        self.focus_tasks = []
+        self.total_remaining_hours = 0.0
+        self.total_completed_steps = 0
+        member_tasks = defaultdict(list)
+
+        for task in tasks:
+            task.partner_ids = partner_ids.get(task.id, [])
+            self._attach_progress(task)
+            members = {task.assigned_to_id, *task.partner_ids}
+            is_open = task.status not in CLOSED_STATUSES
+            days_left = (task.due_date - today).days
+
+            if is_open:
+                for member_id in members:
+                    member_tasks[member_id].append(task)
+                if task.start_date <= today <= task.due_date:
+                    self.today_tasks.append(task)
+                if days_left < 0 or (task.status == 'baslanmadi' and days_left <= 3):
+                    self.delayed_tasks.append(task)
+
+            if target_user is not None and target_user.id not in members:
+                continue
+            self.tasks.append(task)
+            self.total_completed_steps += int(task.completed_steps or 0)
+            if not is_open:
+                continue
+            self.total_remaining_hours += max(0.0, float(task.planned_hours or 0) - float(task.spent_hours or 0))
+            if task.status == 'calisiliyor' or task.priority == 'yuksek' or days_left <= 2:
+                self.focus_tasks.append(task)
+
+        self.active_tasks = [t for t in self.tasks if t.status not in CLOSED_STATUSES]
+        selection_delayed = [
+            t for t in self.active_tasks
+            if t.due_date < today or (t.status == 'baslanmadi' and 0 <= (t.due_date - today).days <= 3)
+        ]
+        self.urgent_task = selection_delayed[0] if selection_delayed else (self.active_tasks[0] if self.active_tasks else None)
+
+        self.member_groups = []
+        for member in employees:
+            m_tasks = member_tasks.get(member.id, [])
+            self.member_groups.append({
+                "member": member, "tasks": m_tasks, "count": len(m_tasks),
+                "next_due": m_tasks[0].due_date if m_tasks else None,
+                "overdue": sum(1 for x in m_tasks if x.due_date < today),
+                "due_soon": sum(1 for x in m_tasks if 0 <= (x.due_date - today).days <= 2),
+            })
+
+    @staticmethod
+    def _attach_progress(task):
+        planned = float(task.planned_hours or 0)
+        spent = float(task.spent_hours or 0)
+        raw = int(round((spent / planned) * 100)) if planned > 0 else 0
+        task.progress_pct_raw = raw
+        task.progress_pct_bar = max(0, min(raw, 100))
+
+    @classmethod
+    def for_team(cls, tasks, employees, today, target_user=None):
+        """
+        Takım görevlerini (kapanmışlar dahil; ör. `Task.objects.filter(assigned_to__team=takım)`) vadeye
+        göre sıralı tek sorguda, iş ortağı id'lerini ikinci bir sorguda yükler.
+        """
+        task_list = list(
+            tasks.select_related("assigned_to")
+            .annotate(
+                total_steps=Count("roadmap", distinct=True),
+                completed_steps=Count("roadmap", filter=Q(roadmap__is_completed=True), distinct=True),
+            ).order_by("due_date")
+        )
+        partner_ids = defaultdict(list)
+        if task_list:
+            through = Task.partners.through.objects.filter(task_id__in=tasks.values("id"))
+            for task_id, user_id in through.values_list("task_id", "customuser_id"):
+                partner_ids[task_id].append(user_id)
+        return cls(task_list, partner_ids, employees, today, target_user=target_user)
@@ -3,7 +3,7 @@ from django.core.exceptions import ValidationError
 from datetime import date
 from decimal import Decimal, InvalidOperation
 
-from .models import Task, CustomUser, WorkLog
+from .models import Task, CustomUser, TeamAnnouncement, WorkLog
 
 class TaskForm(forms.ModelForm):
     """
@@ -237,4 +237,92 @@ class RoadmapEditForm(forms.Form):
         lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
         if len(lines) < 1:
             raise ValidationError("Yol haritası boş bırakılamaz.")
-        return text
\ No newline at end of file
+        return text
+
+
+class TeamAnnouncementForm(forms.ModelForm):
+    """
+    Yöneticinin kendi takımına tek satırlık duyuru gönderdiği formdur.
+    """
+    class Meta:
+        model = TeamAnnouncement
+        fields = ["title", "message", "level"]
+        widgets = {
+            "title": forms.TextInput(attrs={"class": "form-control", "placeholder": "Duyuru başlığı", "required": "true"}),
+            "message": forms.Textarea(attrs={"class": "form-control", "rows": 3, "placeholder": "Takıma iletmek istediğiniz mesaj"}),
+            "level": forms.Select(attrs={"class": "form-select"}),
+        }
+        labels = {
+            "title": "Başlık",
+            "message": "Mesaj",
+            "level": "Önem Seviyesi",
+        }
+
+
+class WorkLogImportForm(forms.Form):
+    """
+    Yönetim panelinden geçmiş efor kayıtlarının (CSV / JSONL) toplu yüklendiği formdur.
+    """
+    file = forms.FileField(label="Dosya", help_text="Alanlar: task (görev id), user (kullanıcı adı), hours, date (YYYY-AA-GG), description.")
+    format = forms.ChoiceField(
+        label="Biçim", choices=[("", "Uzantıdan belirle"), ("csv", "CSV"), ("jsonl", "JSONL")], required=False,
+    )
+    dry_run = forms.BooleanField(label="Yalnızca doğrula (kaydetme)", required=False)
+
+
+class TimesheetForm(forms.Form):
+    """
+    Haftalık zaman çizelgesi: kullanıcının aktif görevleri × haftanın günleri için saat hücreleri.
+    Boş hücreler yok sayılır; gelecek günlerin hücreleri (WorkLogForm kuralı gereği) kapalıdır.
+    Her görev satırına tek bir iş açıklaması girilir.
+    """
+    DEFAULT_DESCRIPTION = "Haftalık zaman çizelgesi girişi"
+    MAX_DAILY_HOURS = Decimal("24")
+
+    def __init__(self, *args, tasks, days, logged=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tasks = list(tasks)
+        self.days = list(days)
+        self.logged = logged or {}
+        today = date.today()
+        for task in self.tasks:
+            for day in self.days:
+                self.fields[self.cell_name(task, day)] = forms.DecimalField(
+                    required=False, min_value=Decimal("0"), max_value=self.MAX_DAILY_HOURS, max_digits=5, decimal_places=2,
+                    disabled=day > today,
+                    widget=forms.NumberInput(attrs={"class": "form-control form-control-sm text-center", "step": "0.25", "min": "0", "max": "24"}),
+                )
+            self.fields[f"d-{task.pk}"] = forms.CharField(
+                required=False, max_length=500,
+                widget=forms.TextInput(attrs={"class": "form-control form-control-sm", "placeholder": self.DEFAULT_DESCRIPTION}),
+            )
+
+    @staticmethod
+    def cell_name(task, day):
+        return f"h-{task.pk}-{day:%Y%m%d}"
+
+    def clean(self):
+        cleaned = super().clean()
+        for day in self.days:
+            total = sum((cleaned.get(self.cell_name(task, day)) or 0 for task in self.tasks), Decimal("0"))
+            if total > self.MAX_DAILY_HOURS:
+                raise ValidationError(f"{day:%d.%m.%Y} için girilen toplam süre 24 saati aşamaz.")
+        return cleaned
+
+    def rows(self):
+        """Şablon için görev satırları: (görev, açıklama alanı, [(gün, hücre alanı, kayıtlı saat)])."""
+        return [
+            (task, self[f"d-{task.pk}"], [(day, self[self.cell_name(task, day)], self.logged.get((task.pk, day))) for day in self.days])
+            for task in self.tasks
+        ]
+
+    def entries(self):
+        """Doldurulmuş hücreler: görev başına (görev, açıklama, [(gün, saat)]) listesi."""
+        result = []
+        for task in self.tasks:
+            cells = [(day, self.cleaned_data.get(self.cell_name(task, day))) for day in self.days]
+            cells = [(day, hours) for day, hours in cells if hours]
+            if cells:
+                description = (self.cleaned_data.get(f"d-{task.pk}") or "").strip() or self.DEFAULT_DESCRIPTION
+                result.append((task, description, cells))
+        return result
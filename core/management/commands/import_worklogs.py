@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.worklogs import WORKLOG_IMPORT_BATCH_SIZE, import_worklogs, read_worklog_rows
+
+
+class Command(BaseCommand):
+    help = "CSV ya da JSONL dosyasındaki geçmiş efor kayıtlarını satır satır doğrulayıp partiler halinde içe aktarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="İçe aktarılacak dosya (task, user, hours, date, description alanları).")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Dosya biçimi; verilmezse uzantıdan belirlenir.")
+        parser.add_argument("--batch-size", type=int, default=WORKLOG_IMPORT_BATCH_SIZE, help="Tek işlemde yazılacak satır sayısı.")
+        parser.add_argument("--dry-run", action="store_true", help="Yazmadan yalnızca doğrular.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        try:
+            stream = open(path, encoding="utf-8-sig", newline="")
+        except OSError as exc:
+            raise CommandError(f"Dosya açılamadı: {exc}")
+        with stream:
+            result = import_worklogs(read_worklog_rows(stream, fmt), batch_size=max(1, options["batch_size"]), dry_run=options["dry_run"])
+
+        for line_no, error in result["errors"][:20]:
+            self.stdout.write(f"Satır {line_no}: {error}")
+        if result["failed"]:
+            self.stdout.write(self.style.WARNING(f"{result['failed']} satır hatalı olduğu için atlandı."))
+        verb = "geçerli" if options["dry_run"] else "içe aktarıldı"
+        self.stdout.write(self.style.SUCCESS(f"{result['created']} efor kaydı {verb}."))
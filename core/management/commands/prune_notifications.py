@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Notification, TeamAnnouncement
+from core.notifications import NOTIFICATION_RETENTION_DAYS, NOTIFICATION_RETENTION_READ_DAYS, delete_in_batches, delete_notifications
+
+
+class Command(BaseCommand):
+    help = "Saklama süresini aşan bildirimleri küçük partiler halinde siler (okunmuşlar N, tümü M gün sonra)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--read-days", type=int, default=NOTIFICATION_RETENTION_READ_DAYS, help="Okunmuş bildirimlerin saklanacağı gün sayısı.")
+        parser.add_argument("--days", type=int, default=NOTIFICATION_RETENTION_DAYS, help="Okunmamışlar dahil tüm bildirimlerin saklanacağı gün sayısı.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Tek işlemde silinecek en fazla satır.")
+        parser.add_argument("--pause", type=float, default=0.1, help="Partiler arasında beklenecek süre (saniye).")
+        parser.add_argument("--dry-run", action="store_true", help="Silmeden, silinecek satır sayılarını raporlar.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        policies = [
+            (f"{options['read_days']} günden eski okunmuş", Q(is_read=True, created_at__lt=now - timedelta(days=options["read_days"]))),
+            (f"{options['days']} günden eski", Q(created_at__lt=now - timedelta(days=options["days"]))),
+        ]
+        batch_size, pause = max(1, options["batch_size"]), max(0.0, options["pause"])
+
+        total = 0
+        for label, condition in policies:
+            queryset = Notification.objects.filter(condition)
+            if options["dry_run"]:
+                removed = queryset.count()
+            else:
+                removed = delete_notifications(queryset, batch_size=batch_size, pause=pause)
+            total += removed
+            self.stdout.write(f"{label}: {removed} bildirim")
+
+        # Duyurular da aynı partili döngüyle silinir; okuma işaretleri id tabanlıdır, etkilenmez
+        announcements = TeamAnnouncement.objects.filter(created_at__lt=now - timedelta(days=options["days"]))
+        if options["dry_run"]:
+            removed = announcements.count()
+        else:
+            removed = delete_in_batches(announcements, batch_size=batch_size, pause=pause)
+        total += removed
+        self.stdout.write(f"{options['days']} günden eski takım duyurusu: {removed}")
+
+        verb = "silinecek" if options["dry_run"] else "silindi"
+        self.stdout.write(self.style.SUCCESS(f"Toplam {total} bildirim {verb}."))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import CustomUser
+from core.utils import find_workload_drift, refresh_workload_days
+
+
+class Command(BaseCommand):
+    help = "WorkloadDay (günlük iş yükü) tablosunu tüm kullanıcılar için yeniden oluşturur veya tutarlılığını denetler."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Yalnızca verilen kullanıcı id'lerini işler.")
+        parser.add_argument("--check", action="store_true", help="Yeniden oluşturmadan, tabloyu anlık hesaplamayla karşılaştırır.")
+        parser.add_argument("--chunk-size", type=int, default=200, help="Tek seferde yenilenecek kullanıcı sayısı.")
+
+    def handle(self, *args, **options):
+        user_ids = options["user_ids"]
+
+        if options["check"]:
+            drift = find_workload_drift(user_ids)
+            for user_id, strategy, day, stored, expected in drift[:20]:
+                self.stdout.write(f"Kullanıcı {user_id} / {strategy} / {day}: tablo={stored} beklenen={expected}")
+            if drift:
+                raise CommandError(f"{len(drift)} günlük iş yükü kaydı anlık hesaplamayla uyuşmuyor.")
+            self.stdout.write(self.style.SUCCESS("WorkloadDay tablosu anlık hesaplamayla tutarlı."))
+            return
+
+        ids = list(CustomUser.objects.order_by("id").values_list("id", flat=True))
+        if user_ids:
+            ids = [uid for uid in ids if uid in set(user_ids)]
+
+        chunk_size = max(1, options["chunk_size"])
+        for i in range(0, len(ids), chunk_size):
+            refresh_workload_days(ids[i:i + chunk_size])
+        self.stdout.write(self.style.SUCCESS(f"{len(ids)} kullanıcının iş yükü tablosu yeniden oluşturuldu."))
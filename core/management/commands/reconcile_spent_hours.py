@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from core.worklogs import reconcile_spent_hours, reconcile_worklog_daily
+
+
+class Command(BaseCommand):
+    help = (
+        "Görevlerin harcanan süresini ve günlük efor özet tablosunu efor kayıtlarıyla parça parça "
+        "karşılaştırır ve sapmaları onarır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Tek seferde karşılaştırılan görev sayısı (varsayılan 500).")
+        parser.add_argument("--check", action="store_true", help="Yalnızca raporlar; sapmaları onarmaz.")
+
+    def handle(self, *args, **options):
+        chunk_size, repair = max(1, options["chunk_size"]), not options["check"]
+
+        drifted = reconcile_spent_hours(chunk_size=chunk_size, repair=repair)
+        for task_id, stored, expected in drifted[:20]:
+            self.stdout.write(f"Görev {task_id}: kayıtlı={stored} gerçek={expected}")
+        self._summary(drifted, "görevin harcanan süresi", "Görevlerin harcanan süreleri tutarlı.", repair)
+
+        daily = reconcile_worklog_daily(chunk_size=chunk_size, repair=repair)
+        for user_id, task_id, day, stored, expected in daily[:20]:
+            self.stdout.write(f"Özet (kullanıcı {user_id}, görev {task_id}, {day}): kayıtlı={stored} gerçek={expected}")
+        self._summary(daily, "günlük efor özeti satırı", "Günlük efor özet tablosu tutarlı.", repair)
+
+    def _summary(self, drifted, label, ok_message, repair):
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(ok_message))
+        elif repair:
+            self.stdout.write(self.style.WARNING(f"{len(drifted)} {label} düzeltildi."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(drifted)} {label} efor kayıtlarıyla uyuşmuyor."))
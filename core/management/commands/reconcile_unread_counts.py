@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.notifications import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Okunmamış bildirim sayaçlarını gerçek bildirim sayılarıyla karşılaştırır ve sapmaları onarır."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Yalnızca verilen kullanıcı id'lerini işler.")
+
+    def handle(self, *args, **options):
+        fixed = reconcile_unread_counts(options["user_ids"])
+        for user_id, stored, expected in fixed[:20]:
+            self.stdout.write(f"Kullanıcı {user_id}: sayaç={stored} gerçek={expected}")
+        if fixed:
+            self.stdout.write(self.style.WARNING(f"{len(fixed)} kullanıcının okunmamış bildirim sayacı düzeltildi."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Okunmamış bildirim sayaçları tutarlı."))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.notifications import deliver_queued_emails, process_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Bildirim kuyruğundaki (outbox) olayları işleyip alıcılara Notification kayıtlarını oluşturur; "
+        "bekleme süresi dolan görev e-postalarını tek bağlantı üzerinden özetleyerek gönderir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Bekleyen olayları işleyip çıkar.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Tek işlemde (transaction) işlenecek olay sayısı.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Kuyruk boşken yoklama aralığı (saniye).")
+        parser.add_argument("--mail-window", type=int, default=None, help="E-posta özet birleştirme penceresi (saniye). Varsayılan: MAIL_DIGEST_WINDOW.")
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        window = options["mail_window"]
+        if options["once"]:
+            processed = process_outbox(batch_size=batch_size)
+            sent = deliver_queued_emails(window=window)
+            self.stdout.write(self.style.SUCCESS(f"{processed} bildirim olayı işlendi, {sent} e-posta gönderildi."))
+            return
+
+        self.stdout.write("Bildirim kuyruğu dinleniyor (çıkmak için Ctrl+C)...")
+        try:
+            while True:
+                processed = process_outbox(batch_size=batch_size)
+                sent = deliver_queued_emails(window=window)
+                if processed or sent:
+                    self.stdout.write(f"{processed} bildirim olayı işlendi, {sent} e-posta gönderildi.")
+                else:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Bildirim çalışanı durduruldu."))
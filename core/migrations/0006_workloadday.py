@@ -0,0 +1,35 @@
+# Generated by Django 4.2.28 on 2026-10-16 22:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_roadmapitem_completed_at_roadmapitem_completed_by'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkloadDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('strategy', models.CharField(choices=[('balanced', 'Dengeli'), ('priority_weighted', 'Öncelik Bazlı'), ('size_weighted', 'İş Büyüklüğü'), ('deadline_weighted', 'Vade Bazlı')], max_length=20, verbose_name='Dağılım Stratejisi')),
+                ('day', models.DateField(verbose_name='Gün')),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=8, verbose_name='Tahmini Yük (Saat)')),
+                ('computed_on', models.DateField(verbose_name='Hesaplama Günü')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workload_days', to=settings.AUTH_USER_MODEL, verbose_name='Çalışan')),
+            ],
+            options={
+                'verbose_name': 'Günlük İş Yükü',
+                'verbose_name_plural': 'Günlük İş Yükleri',
+                'ordering': ['user', 'strategy', 'day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='workloadday',
+            constraint=models.UniqueConstraint(fields=('user', 'strategy', 'day'), name='uniq_workload_day'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.28 on 2026-10-16 22:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_workloadday'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient_ids', models.JSONField(blank=True, default=list, verbose_name='Sabit Alıcılar')),
+                ('title', models.CharField(max_length=200, verbose_name='Başlık')),
+                ('message', models.TextField(blank=True, verbose_name='Mesaj')),
+                ('url', models.CharField(blank=True, max_length=500, verbose_name='Yönlendirme URL')),
+                ('level', models.CharField(choices=[('info', 'Bilgi'), ('success', 'Başarılı'), ('warning', 'Uyarı'), ('danger', 'Kritik')], default='info', max_length=10, verbose_name='Seviye')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma')),
+                ('processed_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='İşlenme Zamanı')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_events', to=settings.AUTH_USER_MODEL, verbose_name='İşlemi Yapan')),
+                ('task', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_events', to='core.task', verbose_name='İlgili Görev')),
+            ],
+            options={
+                'verbose_name': 'Bildirim Kuyruğu Kaydı',
+                'verbose_name_plural': 'Bildirim Kuyruğu',
+                'ordering': ['id'],
+            },
+        ),
+    ]
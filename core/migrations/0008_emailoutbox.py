@@ -0,0 +1,33 @@
+# Generated by Django 4.2.28 on 2026-10-16 22:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Konu')),
+                ('body', models.TextField(verbose_name='İçerik')),
+                ('url', models.CharField(blank=True, max_length=500, verbose_name='Görev Linki')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Oluşturulma')),
+                ('sent_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Gönderilme Zamanı')),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='email_events', to=settings.AUTH_USER_MODEL, verbose_name='İşlemi Yapan')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_events', to='core.task', verbose_name='İlgili Görev')),
+            ],
+            options={
+                'verbose_name': 'E-posta Kuyruğu Kaydı',
+                'verbose_name_plural': 'E-posta Kuyruğu',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.28 on 2026-10-16 22:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Notification = apps.get_model('core', 'Notification')
+    NotificationCounter = apps.get_model('core', 'NotificationCounter')
+    unread = dict(
+        Notification.objects.filter(is_read=False).order_by().values('recipient_id')
+        .annotate(n=models.Count('id')).values_list('recipient_id', 'n')
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=uid, unread_count=unread.get(uid, 0)) for uid in CustomUser.objects.values_list('id', flat=True)],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+                ('unread_count', models.IntegerField(default=0, verbose_name='Okunmamış Bildirim')),
+            ],
+            options={
+                'verbose_name': 'Bildirim Sayacı',
+                'verbose_name_plural': 'Bildirim Sayaçları',
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
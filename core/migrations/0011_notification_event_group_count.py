@@ -0,0 +1,28 @@
+# Generated by Django 4.2.28 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_notification_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='event',
+            field=models.CharField(blank=True, max_length=40, verbose_name='Olay Türü'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='group_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='Birleştirilen Olay Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='event',
+            field=models.CharField(blank=True, max_length=40, verbose_name='Olay Türü'),
+        ),
+    ]
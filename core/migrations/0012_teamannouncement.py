@@ -0,0 +1,38 @@
+# Generated by Django 4.2.28 on 2026-10-16 23:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_notification_event_group_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='announcements_read_id',
+            field=models.BigIntegerField(default=0, verbose_name='Son Okunan Duyuru'),
+        ),
+        migrations.CreateModel(
+            name='TeamAnnouncement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(choices=[('team1', 'Yazılım Geliştirme Ekibi'), ('team2', 'Test ve Kalite Ekibi'), ('team3', 'DevOps Ekibi')], max_length=50, verbose_name='Ekip')),
+                ('title', models.CharField(max_length=200, verbose_name='Başlık')),
+                ('message', models.TextField(blank=True, verbose_name='Mesaj')),
+                ('level', models.CharField(choices=[('info', 'Bilgi'), ('success', 'Başarılı'), ('warning', 'Uyarı'), ('danger', 'Kritik')], default='info', max_length=10, verbose_name='Seviye')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma')),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcements', to=settings.AUTH_USER_MODEL, verbose_name='Gönderen')),
+            ],
+            options={
+                'verbose_name': 'Takım Duyurusu',
+                'verbose_name_plural': 'Takım Duyuruları',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['team', '-created_at', '-id'], name='core_teaman_team_e5c081_idx')],
+            },
+        ),
+    ]
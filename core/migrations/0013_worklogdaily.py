@@ -0,0 +1,55 @@
+# Generated by Django 4.2.28 on 2026-10-16 23:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rollup(apps, schema_editor):
+    WorkLog = apps.get_model('core', 'WorkLog')
+    WorkLogDaily = apps.get_model('core', 'WorkLogDaily')
+    rows = (
+        WorkLog.objects.order_by().values('user_id', 'task_id', 'date', 'user__team')
+        .annotate(total=models.Sum('hours')).iterator(chunk_size=2000)
+    )
+    batch = []
+    for row in rows:
+        batch.append(WorkLogDaily(
+            user_id=row['user_id'], task_id=row['task_id'], day=row['date'], team=row['user__team'] or '', hours=row['total'],
+        ))
+        if len(batch) >= 2000:
+            WorkLogDaily.objects.bulk_create(batch)
+            batch = []
+    WorkLogDaily.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_teamannouncement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkLogDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(blank=True, choices=[('team1', 'Yazılım Geliştirme Ekibi'), ('team2', 'Test ve Kalite Ekibi'), ('team3', 'DevOps Ekibi')], default='', max_length=50, verbose_name='Ekip')),
+                ('day', models.DateField(verbose_name='Gün')),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=7, verbose_name='Toplam Süre (Saat)')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='worklog_days', to='core.task', verbose_name='İlgili Görev')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='worklog_days', to=settings.AUTH_USER_MODEL, verbose_name='Çalışan')),
+            ],
+            options={
+                'verbose_name': 'Günlük Efor Özeti',
+                'verbose_name_plural': 'Günlük Efor Özetleri',
+                'ordering': ['-day', 'user'],
+                'indexes': [models.Index(fields=['team', 'day'], name='worklog_daily_team_day'), models.Index(fields=['task', 'user'], name='worklog_daily_task_user')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='worklogdaily',
+            constraint=models.UniqueConstraint(fields=('user', 'task', 'day'), name='uniq_worklog_daily'),
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.28 on 2026-10-16 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_worklogdaily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationcounter',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Sürüm'),
+        ),
+    ]
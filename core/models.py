@@ -32,6 +32,35 @@ class CustomUser(AbstractUser):
         return f"{self.first_name} {self.last_name} ({self.username})"
 
 
+class TaskQuerySet(models.QuerySet):
+    """
+    Görünürlük (RBAC) kurallarını SQL düzeyinde ifade eden sorgu kümesi.
+    İş ortaklığı JOIN + DISTINCT yerine EXISTS alt sorgusuyla kontrol edilir.
+    """
+
+    def _partner_exists(self, user):
+        return models.Exists(Task.partners.through.objects.filter(task_id=models.OuterRef('pk'), customuser_id=user.pk))
+
+    def involving(self, user):
+        """Kullanıcının sorumlu ya da iş ortağı olduğu görevler."""
+        return self.filter(models.Q(assigned_to=user) | self._partner_exists(user))
+
+    def visible_to(self, user):
+        """
+        Kullanıcının görüntüleyebileceği görevler (bkz. `TaskAccess.can_view`):
+        süper kullanıcı her şeyi, yönetici kendi takımına atanmış görevleri, çalışan ise
+        dahil olduğu görevlerle kendi takımına atanmış görevleri görür.
+        """
+        if getattr(user, 'is_superuser', False):
+            return self.all()
+        if getattr(user, 'role', None) == 'manager':
+            return self.filter(assigned_to__team=user.team) if user.team else self.none()
+        condition = models.Q(assigned_to=user) | self._partner_exists(user)
+        if user.team:
+            condition |= models.Q(assigned_to__team=user.team)
+        return self.filter(condition)
+
+
 class Task(models.Model):
     """
     Sistemdeki temel görev/iş birimi. 
@@ -79,6 +108,8 @@ class Task(models.Model):
     # Harcanan süre (spent_hours), WorkLog modeli üzerinden tetiklenen aksiyonlarla dinamik hesaplanır
     spent_hours = models.DecimalField(max_digits=6, decimal_places=2, default=0, verbose_name='Harcanan Süre (Saat)')
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Görev'
         verbose_name_plural = 'Görevler'
@@ -139,6 +170,35 @@ class WorkLog(models.Model):
         return f"{self.user.username} - {self.task.title} ({self.hours} saat)"
 
 
+class WorkLogDaily(models.Model):
+    """
+    Efor kayıtlarının (çalışan, görev, gün) kırılımında özet tablosu.
+    Raporlar ham kayıtları gruplamak yerine buradan okur; satırlar efor yazma yollarıyla
+    (bkz. `core.worklogs`) aynı işlemde artımlı olarak güncellenir. Takım, eforu giren
+    çalışanın giriş anındaki takımıdır.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='worklog_days', verbose_name='Çalışan')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='worklog_days', verbose_name='İlgili Görev')
+    team = models.CharField(max_length=50, choices=CustomUser.TEAM_CHOICES, blank=True, default='', verbose_name='Ekip')
+    day = models.DateField(verbose_name='Gün')
+    hours = models.DecimalField(max_digits=7, decimal_places=2, default=0, verbose_name='Toplam Süre (Saat)')
+
+    class Meta:
+        verbose_name = 'Günlük Efor Özeti'
+        verbose_name_plural = 'Günlük Efor Özetleri'
+        ordering = ['-day', 'user']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'task', 'day'], name='uniq_worklog_daily'),
+        ]
+        indexes = [
+            models.Index(fields=['team', 'day'], name='worklog_daily_team_day'),
+            models.Index(fields=['task', 'user'], name='worklog_daily_task_user'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.task_id} - {self.day} ({self.hours} saat)"
+
+
 class Notification(models.Model):
     """
     Sistem içi anlık bilgilendirme (Inbox) yapısı.
@@ -178,6 +238,9 @@ class Notification(models.Model):
     url = models.CharField(max_length=500, blank=True, verbose_name='Yönlendirme URL')
 
     level = models.CharField(max_length=10, choices=LEVEL_CHOICES, default='info', verbose_name='Seviye')
+    # Aynı görev/kişi/olay türündeki ardışık bildirimler tek satırda birleştirilir
+    event = models.CharField(max_length=40, blank=True, verbose_name='Olay Türü')
+    group_count = models.PositiveIntegerField(default=1, verbose_name='Birleştirilen Olay Sayısı')
     is_read = models.BooleanField(default=False, verbose_name='Okundu mu?')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma')
 
@@ -187,7 +250,167 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['recipient', 'is_read', '-created_at']),
+            # Gelen kutusunun imleç (keyset) sayfalaması için
+            models.Index(fields=['recipient', '-created_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient.username} - {self.title}"
+
+
+class NotificationCounter(models.Model):
+    """
+    Kullanıcının okunmamış bildirim sayısının denormalize tutulduğu satır.
+    Bildirim oluşturma, okundu işaretleme ve silme yolları sayacı ve sürümü `F()` ifadeleriyle
+    atomik olarak günceller; navbar sorgulaması birincil anahtar okumasına iner.
+    Sapmalar `manage.py reconcile_unread_counts` ile onarılır.
+    """
+    user = models.OneToOneField(
+        CustomUser, on_delete=models.CASCADE, primary_key=True,
+        related_name='notification_counter', verbose_name='Kullanıcı'
+    )
+    unread_count = models.IntegerField(default=0, verbose_name='Okunmamış Bildirim')
+    # Takım duyuruları için okuma işareti: bu id'ye kadarki duyurular okunmuş sayılır
+    announcements_read_id = models.BigIntegerField(default=0, verbose_name='Son Okunan Duyuru')
+    # Gelen kutusundaki her değişiklikte artar; canlı akış ve ETag'ler için ucuz değişiklik ölçütü
+    version = models.PositiveBigIntegerField(default=0, verbose_name='Sürüm')
+
+    class Meta:
+        verbose_name = 'Bildirim Sayacı'
+        verbose_name_plural = 'Bildirim Sayaçları'
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_count}"
+
+
+class TeamAnnouncement(models.Model):
+    """
+    Yöneticinin tüm takımına gönderdiği duyuru. Üye başına satır yazılmaz (fan-out-on-read);
+    üyelerin gelen kutusu, okunmamış sayısı ve son bildirimleri okuma anında bu tabloyla
+    birleştirilir. Okunma durumu `NotificationCounter.announcements_read_id` işaretinden türetilir.
+    """
+    team = models.CharField(max_length=50, choices=CustomUser.TEAM_CHOICES, verbose_name='Ekip')
+    author = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='announcements', verbose_name='Gönderen'
+    )
+    title = models.CharField(max_length=200, verbose_name='Başlık')
+    message = models.TextField(blank=True, verbose_name='Mesaj')
+    level = models.CharField(max_length=10, choices=Notification.LEVEL_CHOICES, default='info', verbose_name='Seviye')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma')
+
+    # Gelen kutusundaki bildirimlerle aynı arayüzü paylaşmak için
+    is_announcement = True
+    group_count = 1
+    task_id = None
+    url = ""
+
+    class Meta:
+        verbose_name = 'Takım Duyurusu'
+        verbose_name_plural = 'Takım Duyuruları'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['team', '-created_at', '-id']),
         ]
 
     def __str__(self):
-        return f"{self.recipient.username} - {self.title}"
\ No newline at end of file
+        return f"{self.get_team_display()} - {self.title}"
+
+    @property
+    def actor(self):
+        return self.author
+
+
+class WorkloadDay(models.Model):
+    """
+    Kullanıcı bazında, strateji ve gün kırılımında önceden hesaplanmış iş yükü tablosu.
+    Görev ve efor değişikliklerinde yalnızca etkilenen kullanıcılar için yeniden hesaplanır;
+    dashboard grafikleri tek bir indeksli aralık sorgusuyla okunur.
+    """
+    STRATEGY_CHOICES = (
+        ('balanced', 'Dengeli'),
+        ('priority_weighted', 'Öncelik Bazlı'),
+        ('size_weighted', 'İş Büyüklüğü'),
+        ('deadline_weighted', 'Vade Bazlı'),
+    )
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='workload_days', verbose_name='Çalışan')
+    strategy = models.CharField(max_length=20, choices=STRATEGY_CHOICES, verbose_name='Dağılım Stratejisi')
+    day = models.DateField(verbose_name='Gün')
+    hours = models.DecimalField(max_digits=8, decimal_places=2, default=0, verbose_name='Tahmini Yük (Saat)')
+    # Simülasyon "bugün" referansına bağlı olduğu için hesaplamanın yapıldığı gün saklanır
+    computed_on = models.DateField(verbose_name='Hesaplama Günü')
+
+    class Meta:
+        verbose_name = 'Günlük İş Yükü'
+        verbose_name_plural = 'Günlük İş Yükleri'
+        ordering = ['user', 'strategy', 'day']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'strategy', 'day'], name='uniq_workload_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.day} ({self.hours} saat)"
+
+
+class NotificationOutbox(models.Model):
+    """
+    Bildirim olaylarının kuyruğu (outbox). İstek sırasında yalnızca tek bir olay satırı
+    yazılır; alıcıların çözülmesi ve Notification satırlarının oluşturulması
+    `manage.py run_outbox` çalışanına bırakılır.
+    """
+    task = models.ForeignKey(
+        Task, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='outbox_events', verbose_name='İlgili Görev'
+    )
+    actor = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='outbox_events', verbose_name='İşlemi Yapan'
+    )
+    # Görev silinecekse alıcılar olay anında sabitlenir; boşsa görevin ilgilileri kullanılır
+    recipient_ids = models.JSONField(default=list, blank=True, verbose_name='Sabit Alıcılar')
+
+    title = models.CharField(max_length=200, verbose_name='Başlık')
+    message = models.TextField(blank=True, verbose_name='Mesaj')
+    url = models.CharField(max_length=500, blank=True, verbose_name='Yönlendirme URL')
+    level = models.CharField(max_length=10, choices=Notification.LEVEL_CHOICES, default='info', verbose_name='Seviye')
+    event = models.CharField(max_length=40, blank=True, verbose_name='Olay Türü')
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma')
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name='İşlenme Zamanı')
+
+    class Meta:
+        verbose_name = 'Bildirim Kuyruğu Kaydı'
+        verbose_name_plural = 'Bildirim Kuyruğu'
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.title} ({'işlendi' if self.processed_at else 'bekliyor'})"
+
+
+class EmailOutbox(models.Model):
+    """
+    Gönderilmeyi bekleyen görev e-postaları. Alıcılar gönderim anında görevin ilgililerinden
+    çözülür; aynı alıcı ve görev için kısa aralıkta biriken olaylar tek bir özet e-postada birleştirilir.
+    """
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='email_events', verbose_name='İlgili Görev'
+    )
+    actor = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='email_events', verbose_name='İşlemi Yapan'
+    )
+    subject = models.CharField(max_length=255, verbose_name='Konu')
+    body = models.TextField(verbose_name='İçerik')
+    url = models.CharField(max_length=500, blank=True, verbose_name='Görev Linki')
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Oluşturulma')
+    sent_at = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name='Gönderilme Zamanı')
+
+    class Meta:
+        verbose_name = 'E-posta Kuyruğu Kaydı'
+        verbose_name_plural = 'E-posta Kuyruğu'
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.subject} ({'gönderildi' if self.sent_at else 'bekliyor'})"
@@ -0,0 +1,660 @@
+import asyncio
+import base64
+import binascii
+import json
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Case, CharField, Count, F, Max, OuterRef, Q, Subquery, Value, When, prefetch_related_objects
+from django.db.models.functions import Coalesce, Greatest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import CustomUser, EmailOutbox, Notification, NotificationCounter, NotificationOutbox, Task, TeamAnnouncement
+
+# Aynı alıcı ve görev için bu süre (saniye) içinde biriken e-postalar tek özette birleştirilir
+MAIL_DIGEST_WINDOW = getattr(settings, 'MAIL_DIGEST_WINDOW', 120)
+
+# Aynı (alıcı, görev, işlemi yapan, olay türü) için bu süre (saniye) içindeki okunmamış bildirim
+# yeni satır yerine güncellenir; 0 birleştirmeyi kapatır
+NOTIFICATION_COALESCE_WINDOW = getattr(settings, 'NOTIFICATION_COALESCE_WINDOW', 600)
+
+# Birleştirilen bildirimlerin özet mesajları (olay türüne göre)
+COALESCED_MESSAGES = {
+    "roadmap_toggle": "{actor}, '{task}' görevinde {count} yol haritası adımını güncelledi.",
+    "roadmap_edit": "{actor}, '{task}' görevinde yol haritasını {count} kez düzenledi.",
+    "task_update": "{actor}, '{task}' görevini {count} kez güncelledi.",
+    "worklog_add": "{actor}, '{task}' için {count} efor kaydı girdi.",
+    "timesheet": "{actor}, '{task}' için {count} kez haftalık efor girişi yaptı.",
+    "worklog_edit": "{actor}, '{task}' için {count} efor kaydını güncelledi.",
+    "worklog_delete": "{actor}, '{task}' görevine ait {count} efor kaydını sildi.",
+}
+
+# Saklama süreleri (gün): okunmuş bildirimler ve okunmuş/okunmamış tüm bildirimler için
+NOTIFICATION_RETENTION_READ_DAYS = getattr(settings, 'NOTIFICATION_RETENTION_READ_DAYS', 30)
+NOTIFICATION_RETENTION_DAYS = getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 180)
+
+# Bildirim Merkezi'nde bir sayfada (ve her sonsuz kaydırma adımında) gösterilen bildirim sayısı
+INBOX_PAGE_SIZE = getattr(settings, 'INBOX_PAGE_SIZE', 50)
+
+# Bildirim akışının (SSE) durum kontrol aralığı, kalp atışı aralığı ve bağlantı ömrü (saniye)
+NOTIFICATION_STREAM_INTERVAL = getattr(settings, 'NOTIFICATION_STREAM_INTERVAL', 3)
+NOTIFICATION_STREAM_HEARTBEAT = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT', 15)
+NOTIFICATION_STREAM_LIFETIME = getattr(settings, 'NOTIFICATION_STREAM_LIFETIME', 300)
+
+
+def enqueue_notification(task, *, title, message, url="", actor=None, level="info", recipient_ids=None, event=""):
+    """
+    Bir görev olayını bildirim kuyruğuna tek satır olarak yazar.
+
+    Alıcılar işlem sırasında çözülmez; `process_outbox` görevin oluşturanını, sorumlusunu,
+    ortaklarını, bilgilendirilecek kişilerini ve takım yöneticilerini toplu olarak bulur.
+    Görev silinmek üzereyse `recipient_ids` ile alıcı listesi olay anında sabitlenir.
+    `event` verilirse aynı (alıcı, görev, kişi, olay) için pencere içindeki okunmamış
+    bildirim yeni satır eklenmeden güncellenir (bkz. `COALESCED_MESSAGES`).
+    """
+    return NotificationOutbox.objects.create(
+        task=task, actor=actor, recipient_ids=sorted({uid for uid in recipient_ids or () if uid}),
+        title=title[:160], message=message, url=url, level=level, event=event,
+    )
+
+
+def team_managers(teams):
+    """
+    Takımların yönetici (id, e-posta) listelerini tek sorguda okur.
+
+    Returns:
+        dict: Takım koduna göre [(kullanıcı id, e-posta), ...]
+    """
+    teams = {t for t in teams if t}
+    if not teams:
+        return {}
+    managers = {team: [] for team in teams}
+    for user_id, email, team in CustomUser.objects.filter(role="manager", team__in=teams).order_by("id").values_list("id", "email", "team"):
+        managers[team].append((user_id, email))
+    return managers
+
+
+class RecipientResolver:
+    """
+    Görev olaylarının ilgililerini (oluşturan, sorumlu, ortaklar, bilgilendirilecekler ve
+    sorumlunun takım yöneticileri) id ve e-postalarıyla çözen, sonuçları saklayan nesne.
+
+    Görev tarafındaki tüm kişiler tek bir UNION ALL sorgusuyla, sorumluların takım yöneticileri
+    ikinci bir sorguyla okunur. Aynı nesneyle yapılan tekrar çağrılar sorgu çalıştırmaz;
+    çalışan partileri için parti başına bir nesne kullanılır.
+    """
+
+    def __init__(self):
+        self._resolved = {}
+
+    def resolve(self, task_ids):
+        """
+        Returns:
+            dict: Görev id'sine göre {kullanıcı id: e-posta} sözlüğü.
+        """
+        task_ids = {tid for tid in task_ids if tid}
+        missing = task_ids - set(self._resolved)
+        if missing:
+            self._load(missing)
+        return {tid: self._resolved[tid] for tid in task_ids}
+
+    def _load(self, task_ids):
+        def tagged(queryset, kind, *fields):
+            return queryset.order_by().annotate(kind=Value(kind, output_field=CharField())).values_list(*fields, "kind")
+
+        tasks = Task.objects.filter(pk__in=task_ids)
+        people = tagged(tasks, "creator", "id", "created_by_id", "created_by__email", "created_by__team").union(
+            tagged(tasks, "assignee", "id", "assigned_to_id", "assigned_to__email", "assigned_to__team"),
+            tagged(Task.partners.through.objects.filter(task_id__in=task_ids), "partner", "task_id", "customuser_id", "customuser__email", "customuser__team"),
+            tagged(Task.informees.through.objects.filter(task_id__in=task_ids), "informee", "task_id", "customuser_id", "customuser__email", "customuser__team"),
+            all=True,
+        )
+
+        recipients = {tid: {} for tid in task_ids}
+        assignee_teams = {}
+        for task_id, user_id, email, team, kind in people:
+            if user_id:
+                recipients[task_id][user_id] = email or ""
+            if kind == "assignee" and team:
+                assignee_teams[task_id] = team
+
+        managers = team_managers(assignee_teams.values())
+        for task_id, team in assignee_teams.items():
+            recipients[task_id].update((user_id, email or "") for user_id, email in managers.get(team, ()))
+        self._resolved.update(recipients)
+
+
+def resolve_task_recipients(task_ids, resolver=None):
+    """
+    Görevlerin ilgili kullanıcı id'lerini çözer (bkz. `RecipientResolver`).
+
+    Returns:
+        dict: Görev id'sine göre kullanıcı id kümesi.
+    """
+    resolved = (resolver or RecipientResolver()).resolve(task_ids)
+    return {task_id: set(users) for task_id, users in resolved.items()}
+
+
+def process_outbox(batch_size=500):
+    """
+    Bekleyen kuyruk kayıtlarını partiler halinde işler ve Notification satırlarını toplu ekler.
+    Her parti kendi işleminde (transaction) işlenir; destekleyen veritabanlarında satırlar
+    SKIP LOCKED ile kilitlenerek birden fazla çalışanın aynı olayı işlemesi önlenir.
+
+    Returns:
+        int: İşlenen olay sayısı.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            pending = NotificationOutbox.objects.filter(processed_at__isnull=True).order_by("id")
+            if connection.features.has_select_for_update_skip_locked:
+                pending = pending.select_for_update(skip_locked=True)
+            events = list(pending[:batch_size])
+            if not events:
+                return processed
+
+            related = resolve_task_recipients(
+                {e.task_id for e in events if e.task_id and not e.recipient_ids}, RecipientResolver(),
+            )
+            fixed_ids = {uid for e in events for uid in e.recipient_ids}
+            existing = set(CustomUser.objects.filter(pk__in=fixed_ids).values_list("id", flat=True)) if fixed_ids else set()
+
+            now = timezone.now()
+            groups = _open_notification_groups(events, now)
+            if any(e.event and e.task_id for e in events):
+                # Özet mesajları için işlemi yapan ve görev adları parti başına tek sorguda
+                prefetch_related_objects(events, "actor", "task")
+            notifications, merged = [], {}
+            for event in events:
+                if event.recipient_ids:
+                    user_ids = set(event.recipient_ids) & existing
+                else:
+                    user_ids = related.get(event.task_id, set())
+                for user_id in sorted(user_ids - {event.actor_id}):
+                    key = (user_id, event.task_id, event.actor_id, event.event)
+                    group = groups.get(key) if event.event and event.task_id else None
+                    if group is not None and group.pk:
+                        merged.setdefault(group.pk, (group, []))[1].append(event)
+                        continue
+                    if group is not None:
+                        group.group_count += 1
+                        group.title, group.url, group.level = event.title, event.url, event.level
+                        group.message = _coalesced_message(event, group.group_count)
+                        continue
+                    notification = Notification(
+                        recipient_id=user_id, actor_id=event.actor_id, task_id=event.task_id, event=event.event,
+                        title=event.title, message=event.message, url=event.url, level=event.level,
+                    )
+                    notifications.append(notification)
+                    if event.event and event.task_id:
+                        groups[key] = notification
+            coalesced, reopened = _merge_into_groups(merged.values(), now)
+            notifications += reopened
+            Notification.objects.bulk_create(notifications, batch_size=batch_size)
+            # Birleştirilen bildirimler zaten okunmamış sayıldığından sayaç yalnızca yeni satırlarla artar
+            adjust_unread_counts(Counter(n.recipient_id for n in notifications), touched=coalesced)
+            NotificationOutbox.objects.filter(pk__in=[e.pk for e in events]).update(processed_at=now)
+        processed += len(events)
+
+
+def _open_notification_groups(events, now):
+    """
+    Partideki olayların birleştirilebileceği okunmamış bildirimleri tek sorguda bulur.
+
+    Returns:
+        dict: (alıcı, görev, işlemi yapan, olay türü) anahtarına göre pencere içindeki en yeni bildirim.
+    """
+    keyed = [e for e in events if e.event and e.task_id]
+    if not keyed or NOTIFICATION_COALESCE_WINDOW <= 0:
+        return {}
+    candidates = Notification.objects.filter(
+        is_read=False, created_at__gte=now - timedelta(seconds=NOTIFICATION_COALESCE_WINDOW),
+        task_id__in={e.task_id for e in keyed}, event__in={e.event for e in keyed},
+    ).order_by("created_at", "id")
+    if connection.features.has_select_for_update:
+        candidates = candidates.select_for_update()
+    # Artan sıralamayla okunduğu için her anahtarda en yeni bildirim kalır
+    return {(n.recipient_id, n.task_id, n.actor_id, n.event): n for n in candidates}
+
+
+def _merge_into_groups(merged, now):
+    """
+    Olayları açık bildirim gruplarına koşullu UPDATE ile ekler.
+
+    Güncelleme yalnızca bildirim hâlâ okunmamışsa ve okunduğundan beri başka bir çalışan
+    tarafından büyütülmemişse uygulanır. Araya giren okuma ya da birleştirme yüzünden hiçbir
+    satır etkilenmezse olaylar kaydedilmek üzere yeni bir bildirim olarak döner.
+
+    Returns:
+        tuple: (güncellenen bildirimlerin alıcı id'leri, eklenecek yeni Notification listesi)
+    """
+    touched, reopened = set(), []
+    for group, group_events in merged:
+        last, count = group_events[-1], group.group_count + len(group_events)
+        updated = Notification.objects.filter(pk=group.pk, is_read=False, group_count=group.group_count).update(
+            group_count=count, title=last.title, message=_coalesced_message(last, count), url=last.url,
+            level=last.level, created_at=now,
+        )
+        if updated:
+            touched.add(group.recipient_id)
+            continue
+        count = len(group_events)
+        reopened.append(Notification(
+            recipient_id=group.recipient_id, actor_id=group.actor_id, task_id=group.task_id, event=group.event,
+            title=last.title, message=_coalesced_message(last, count) if count > 1 else last.message,
+            url=last.url, level=last.level, group_count=count,
+        ))
+    return touched, reopened
+
+
+def _coalesced_message(event, count):
+    template = COALESCED_MESSAGES.get(event.event)
+    if template is None:
+        return f"{event.message} (toplam {count} güncelleme)"
+    actor = (event.actor.get_full_name() or event.actor.username) if event.actor else "Sistem"
+    return template.format(actor=actor, task=event.task.title if event.task else "", count=count)
+
+
+def adjust_unread_counts(deltas, touched=()):
+    """
+    Kullanıcıların okunmamış bildirim sayaçlarını `F()` ifadeleriyle atomik olarak değiştirir.
+
+    Eksik sayaç satırları sıfırla açılır (sayaçlar göç sırasında mevcut kullanıcılar için
+    doldurulduğundan satırı olmayan kullanıcının eski bildirimi yoktur). Aynı farkı alan
+    kullanıcılar tek UPDATE ile güncellenir. Sayacı değişen ve `touched` içindeki
+    kullanıcıların sürümü (`version`) de artırılır.
+
+    Args:
+        deltas (dict): Kullanıcı id'sine göre sayaç farkı (ör. {5: 2, 7: -1}).
+        touched (iterable): Sayacı değişmeyen ama gelen kutusu değişen kullanıcılar
+            (okunmuş bildirim silme, birleştirme gibi).
+    """
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+    unchanged = set(touched) - {uid for ids in by_delta.values() for uid in ids}
+    if unchanged:
+        by_delta[0] = sorted(unchanged)
+    if not by_delta:
+        return
+    if any(delta > 0 for delta in by_delta):
+        user_ids = [uid for delta, ids in by_delta.items() if delta > 0 for uid in ids]
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=uid) for uid in user_ids], ignore_conflicts=True,
+        )
+    for delta, user_ids in by_delta.items():
+        NotificationCounter.objects.filter(user_id__in=user_ids).update(
+            unread_count=F("unread_count") + delta, version=F("version") + 1,
+        )
+
+
+def notification_marker(user):
+    """
+    Gelen kutusunun ucuz değişiklik ölçütünü tek sorguda döner: sayaç satırının sürümü ve
+    okunmamış sayısı (birincil anahtar okuması) ile takımın en son duyurusunun id'si ve okuma
+    işaretinden yeni duyuru sayısı (indeksli alt sorgular). Canlı akış ve bildirim uç
+    noktalarının ETag doğrulayıcısı bunu kullanır; bildirim tablosunda toplama yapılmaz.
+    Satır yoksa sayı bir kez hesaplanıp satır oluşturulur.
+    """
+    unread_sq = (
+        team_announcements_for(user).filter(id__gt=OuterRef("announcements_read_id"))
+        .order_by().values("team").annotate(n=Count("id")).values("n")
+    )
+    latest_sq = team_announcements_for(user).order_by("-created_at", "-id").values("id")[:1]
+    row = (
+        NotificationCounter.objects.filter(user_id=user.pk)
+        .annotate(announcements=Coalesce(Subquery(unread_sq), Value(0)), announcement=Subquery(latest_sq))
+        .values_list("version", "unread_count", "announcements", "announcement").first()
+    )
+    if row is None:
+        counted = Notification.objects.filter(recipient=user, is_read=False).count()
+        NotificationCounter.objects.get_or_create(user_id=user.pk, defaults={"unread_count": counted})
+        return notification_marker(user)
+    version, unread, announcements, announcement = row
+    return {"version": version, "unread": max(0, unread) + announcements, "announcement": announcement}
+
+
+def unread_notification_count(user):
+    """
+    Okunmamış bildirim sayısını sayaç satırından (birincil anahtar okuması) döner; takım
+    duyurularından okuma işaretinden yeni olanlar aynı sorguda alt sorguyla eklenir.
+    """
+    return notification_marker(user)["unread"]
+
+
+def reconcile_unread_counts(user_ids=None):
+    """
+    Sayaçları gerçek okunmamış bildirim sayısıyla karşılaştırır; farklı olanları düzeltir.
+
+    Returns:
+        list: (kullanıcı id, sayaçtaki değer, gerçek değer) demetleri; düzeltilen satırlar.
+    """
+    users = CustomUser.objects.order_by("id")
+    if user_ids:
+        users = users.filter(pk__in=user_ids)
+    ids = list(users.values_list("id", flat=True))
+    actual = dict(
+        Notification.objects.filter(recipient_id__in=ids, is_read=False).order_by()
+        .values("recipient_id").annotate(n=Count("id")).values_list("recipient_id", "n")
+    )
+    stored = dict(NotificationCounter.objects.filter(user_id__in=ids).values_list("user_id", "unread_count"))
+
+    # Satırı olmayan kullanıcının sayacı ilk okumada hesaplanır; yalnızca gerçek sayı sıfır değilse sapma sayılır
+    fixed = [(uid, stored.get(uid), actual.get(uid, 0)) for uid in ids if stored.get(uid, 0) != actual.get(uid, 0)]
+    if fixed:
+        # Düzeltme aynı UPDATE içinde yeniden sayılır; okuma ile yazma arasındaki değişiklikler kaybolmaz
+        unread_sq = (
+            Notification.objects.filter(recipient_id=OuterRef("user_id"), is_read=False).order_by()
+            .values("recipient_id").annotate(n=Count("id")).values("n")
+        )
+        with transaction.atomic():
+            NotificationCounter.objects.bulk_create(
+                [NotificationCounter(user_id=uid) for uid, current, _ in fixed if current is None], ignore_conflicts=True,
+            )
+            NotificationCounter.objects.filter(user_id__in=[uid for uid, _, _ in fixed]).update(
+                unread_count=Coalesce(Subquery(unread_sq), Value(0)), version=F("version") + 1,
+            )
+    return fixed
+
+
+def delete_in_batches(queryset, batch_size=500, pause=0.0, columns=(), on_batch=None):
+    """
+    Sorgudaki satırları birincil anahtar sırasıyla küçük partiler halinde siler.
+
+    Her parti kendi kısa işleminde (transaction) `id > son_id` aralığındaki en fazla
+    `batch_size` satırı kilitler ve siler; böylece tablo (SQLite'ta tüm veritabanı) uzun
+    süre kilitli kalmaz. Başlangıçtaki en büyük id üst sınır alınır, çalışma sırasında
+    eklenen satırlara dokunulmaz.
+
+    Args:
+        queryset (QuerySet): Silinecek satırları seçen sorgu.
+        batch_size (int): Parti başına en fazla satır.
+        pause (float): Partiler arasında beklenecek süre (saniye); canlı trafiğe yer açar.
+        columns (tuple): `on_batch`a id ile birlikte aktarılacak alanlar.
+        on_batch (callable): Her partide aynı işlem içinde silinen (id, *columns) demetleriyle çağrılır.
+
+    Returns:
+        int: Silinen satır sayısı.
+    """
+    model = queryset.model
+    upper = queryset.aggregate(upper=Max("id"))["upper"]
+    deleted, last_id = 0, 0
+    while upper is not None:
+        with transaction.atomic():
+            batch = queryset.filter(id__gt=last_id, id__lte=upper).order_by("id")
+            if connection.features.has_select_for_update:
+                batch = batch.select_for_update()
+            rows = list(batch.values_list("id", *columns)[:batch_size])
+            if not rows:
+                break
+            model.objects.filter(pk__in=[row[0] for row in rows]).delete()
+            if on_batch:
+                on_batch(rows)
+        deleted += len(rows)
+        last_id = rows[-1][0]
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def delete_notifications(queryset, batch_size=500, pause=0.0):
+    """
+    Bildirimleri `delete_in_batches` ile partiler halinde siler; her partide silinen
+    okunmamış bildirimler aynı işlemde sayaçlardan düşülür.
+
+    Returns:
+        int: Silinen bildirim sayısı.
+    """
+    return delete_in_batches(
+        queryset, batch_size=batch_size, pause=pause, columns=("recipient_id", "is_read"), on_batch=_release_counters,
+    )
+
+
+def _release_counters(rows):
+    unread = Counter(uid for _, uid, is_read in rows if not is_read)
+    adjust_unread_counts({uid: -n for uid, n in unread.items()}, touched={uid for _, uid, _ in rows})
+
+
+def enqueue_email(task, *, subject, body, url="", actor=None):
+    """
+    Görev e-postasını kuyruğa yazar; gönderim `deliver_queued_emails` ile toplu yapılır.
+    """
+    return EmailOutbox.objects.create(task=task, actor=actor, subject=subject[:255], body=body, url=url)
+
+
+def deliver_queued_emails(window=None, now=None):
+    """
+    Bekleme süresi dolmuş görevlerin e-postalarını tek bir SMTP bağlantısı üzerinden gönderir.
+
+    Bir görevin en eski bekleyen e-postası `window` saniyeden eskiyse görevin bekleyen tüm
+    olayları birlikte ele alınır. Her alıcıya, kendisinin tetiklemediği olaylar için tek
+    bir e-posta gider: olay tekse özgün metin, birden fazlaysa özet (digest) gönderilir.
+
+    Returns:
+        int: Gönderilen e-posta sayısı.
+    """
+    window = MAIL_DIGEST_WINDOW if window is None else window
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        pending = EmailOutbox.objects.filter(sent_at__isnull=True)
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True, of=("self",))
+        ready_tasks = set(
+            pending.filter(created_at__lte=now - timedelta(seconds=window)).values_list("task_id", flat=True)
+        )
+        if not ready_tasks:
+            return 0
+        events = list(pending.filter(task_id__in=ready_tasks).select_related("task").order_by("id"))
+
+        # Satırlar gönderimden önce koşullu UPDATE ile sahiplenilir; satır kilidi olmayan
+        # veritabanlarında (SQLite) başka bir çalışanın araya girip aldığı olaylar gönderilmez
+        event_ids = [e.pk for e in events]
+        claimed = EmailOutbox.objects.filter(pk__in=event_ids, sent_at__isnull=True).update(sent_at=now)
+        if claimed != len(events):
+            mine = set(EmailOutbox.objects.filter(pk__in=event_ids, sent_at=now).values_list("id", flat=True))
+            events = [e for e in events if e.pk in mine]
+            ready_tasks = {e.task_id for e in events}
+
+        recipients = RecipientResolver().resolve(ready_tasks)
+
+        per_recipient = defaultdict(list)
+        for event in events:
+            for user_id, email in recipients.get(event.task_id, {}).items():
+                if user_id != event.actor_id and email:
+                    per_recipient[(email, event.task_id)].append(event)
+
+        messages = [
+            _build_message(address, task_events)
+            for (address, _task_id), task_events in sorted(per_recipient.items())
+        ]
+        if messages:
+            with get_connection(fail_silently=True) as mail_connection:
+                mail_connection.send_messages(messages)
+    return len(messages)
+
+
+def _build_message(address, events):
+    last = events[-1]
+    if len(events) == 1:
+        subject = last.subject
+        body = "\n".join(["Merhaba,", "", last.body, "", f"Görev linki: {last.url}"]) if last.url else last.body
+    else:
+        subject = f"Görev özeti: {last.task.title} ({len(events)} güncelleme)"
+        parts = ["Merhaba,", "", f"'{last.task.title}' görevinde {len(events)} yeni güncelleme var:", ""]
+        for event in events:
+            parts.extend([f"• {event.subject}", event.body, ""])
+        if last.url:
+            parts.append(f"Görev linki: {last.url}")
+        body = "\n".join(parts)
+    return EmailMessage(subject=subject, body=body, from_email=settings.DEFAULT_FROM_EMAIL, to=[address])
+
+
+# ==========================================
+# BİLDİRİM KUTUSU DURUMU VE CANLI AKIŞ (SSE)
+# ==========================================
+
+def team_announcements_for(user):
+    """Kullanıcının takımına gönderilmiş, başkası tarafından yazılmış duyurular."""
+    if not getattr(user, "team", None):
+        return TeamAnnouncement.objects.none()
+    return TeamAnnouncement.objects.filter(team=user.team).exclude(author_id=user.pk)
+
+
+def _announcement_marker(user):
+    return Coalesce(
+        Subquery(NotificationCounter.objects.filter(user_id=user.pk).values("announcements_read_id")[:1]), Value(0),
+    )
+
+
+def mark_announcements_read(user, up_to_id=None):
+    """
+    Kullanıcının duyuru okuma işaretini ilerletir; `up_to_id` verilmezse takımın en son duyurusuna.
+    İşaret yalnızca ileri gider (Greatest), eşzamanlı isteklerde geri alınmaz.
+    """
+    if up_to_id is None:
+        up_to_id = team_announcements_for(user).aggregate(latest=Max("id"))["latest"]
+        if up_to_id is None:
+            return
+    NotificationCounter.objects.get_or_create(
+        user_id=user.pk, defaults={"unread_count": Notification.objects.filter(recipient=user, is_read=False).count()},
+    )
+    NotificationCounter.objects.filter(user_id=user.pk).update(
+        announcements_read_id=Greatest(F("announcements_read_id"), Value(up_to_id)), version=F("version") + 1,
+    )
+
+
+# Aynı zaman damgasında kişisel bildirimler duyurulardan önce sıralanır
+_KIND_RANK = {"n": 1, "a": 0}
+
+
+def encode_notification_cursor(item):
+    """Öğenin (created_at, tür, id) konumunu URL'de taşınabilir opak bir imlece çevirir."""
+    kind = "a" if getattr(item, "is_announcement", False) else "n"
+    raw = f"{item.created_at.isoformat()}|{kind}|{item.id}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_notification_cursor(cursor):
+    """İmleci (created_at, tür, id) üçlüsüne çözer; geçersiz imleçte None döner (ilk sayfa)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        created_raw, kind, pk_raw = raw.rsplit("|", 2)
+        created_at = parse_datetime(created_raw)
+        pk = int(pk_raw)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+    return (created_at, kind, pk) if created_at is not None and kind in _KIND_RANK else None
+
+
+def _after_cursor(position, kind):
+    """Verilen türdeki satırlardan imlecin arkasında kalanları seçen koşul."""
+    created_at, cursor_kind, pk = position
+    older = Q(created_at__lt=created_at)
+    if _KIND_RANK[kind] < _KIND_RANK[cursor_kind]:
+        return older | Q(created_at=created_at)
+    if kind == cursor_kind:
+        return older | Q(created_at=created_at, id__lt=pk)
+    return older
+
+
+def notification_page(user, cursor=None, limit=20):
+    """
+    Kişisel bildirimleri ve takım duyurularını (created_at, tür, id) üzerinde imleç (keyset)
+    ile birlikte sayfalar.
+
+    OFFSET kullanılmaz; iki tablonun her biri kendi `(-created_at, -id)` indeksinde imlecin
+    hemen arkasından en fazla `limit + 1` satır okur, sonuçlar bellekte birleştirilir. Böylece
+    sayfa derinliğinden bağımsız sürede döner. Duyuruların okunma durumu kullanıcının okuma
+    işaretiyle aynı sorguda hesaplanır.
+
+    Returns:
+        tuple: (bildirim/duyuru listesi, sonraki sayfanın imleci ya da None)
+    """
+    position = decode_notification_cursor(cursor)
+    notes = Notification.objects.filter(recipient=user).select_related("actor", "task").order_by("-created_at", "-id")
+    announcements = (
+        team_announcements_for(user).select_related("author")
+        .annotate(is_read=Case(When(id__lte=_announcement_marker(user), then=Value(True)), default=Value(False)))
+        .order_by("-created_at", "-id")
+    )
+    if position:
+        notes = notes.filter(_after_cursor(position, "n"))
+        announcements = announcements.filter(_after_cursor(position, "a"))
+
+    rows = list(notes[:limit + 1])
+    if getattr(user, "team", None):
+        rows += list(announcements[:limit + 1])
+        rows.sort(key=lambda n: (n.created_at, _KIND_RANK["a" if getattr(n, "is_announcement", False) else "n"], n.id), reverse=True)
+    page = rows[:limit]
+    next_cursor = encode_notification_cursor(page[-1]) if len(rows) > limit else None
+    return page, next_cursor
+
+
+def serialize_notifications(notifications):
+    """Bildirimleri açılır menü ve JSON uç noktaları için sözlüklere çevirir."""
+    return [{
+        "id": n.id, "title": n.title, "message": (n.message or "")[:140],
+        "url": n.url or (reverse("task_detail", args=[n.task_id]) if n.task_id else ""),
+        "is_read": n.is_read, "level": n.level, "group_count": n.group_count,
+        "kind": "announcement" if getattr(n, "is_announcement", False) else "notification",
+        "created_at": timezone.localtime(n.created_at).isoformat(),
+        "created_at_display": timezone.localtime(n.created_at).strftime("%d %b %Y %H:%M"),
+        "actor": (n.actor.get_full_name() or n.actor.username) if n.actor else "",
+    } for n in notifications]
+
+
+def latest_notification_items(user, limit):
+    """Açılır menüde gösterilen son bildirimleri JSON'a uygun sözlükler olarak döner."""
+    return serialize_notifications(notification_page(user, limit=limit)[0])
+
+
+async def notification_event_stream(user, limit=20, interval=None, heartbeat=None, lifetime=None):
+    """
+    Kullanıcının bildirim kutusundaki değişiklikleri Server-Sent Events olarak üretir.
+
+    Her turda yalnızca `notification_marker` (sayaç satırının birincil anahtar okuması) sorgulanır;
+    ölçüt değiştiğinde son bildirimler okunur ve okunmamış sayıyla birlikte tek bir
+    `notifications` olayı olarak gönderilir. Bağlantı açılır açılmaz ilk durum da gönderilir.
+    Değişiklik yokken belirli aralıkla yorum satırı (kalp atışı) yazılarak ara sunucuların
+    bağlantıyı kesmesi önlenir. Akış `lifetime` sonunda kapanır ve tarayıcı `retry` süresi
+    sonunda kendiliğinden yeniden bağlanır.
+
+    Ölçüt veritabanından okunduğu için `run_outbox` gibi ayrı süreçlerde üretilen bildirimler
+    de paylaşılan bir önbellek gerekmeden görülür.
+    """
+    interval = interval or NOTIFICATION_STREAM_INTERVAL
+    heartbeat = heartbeat or NOTIFICATION_STREAM_HEARTBEAT
+    lifetime = lifetime or NOTIFICATION_STREAM_LIFETIME
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + lifetime
+    last_marker, idle = None, 0.0
+
+    yield f"retry: {int(interval * 1000)}\n\n"
+    while True:
+        marker = await sync_to_async(notification_marker)(user)
+        if marker != last_marker:
+            items = await sync_to_async(latest_notification_items)(user, limit)
+            payload = json.dumps({"unread": marker["unread"], "items": items}, ensure_ascii=False)
+            yield f"event: notifications\ndata: {payload}\n\n"
+            last_marker, idle = marker, 0.0
+        elif idle >= heartbeat:
+            yield ": ping\n\n"
+            idle = 0.0
+        if loop.time() + interval > deadline:
+            return
+        await asyncio.sleep(interval)
+        idle += interval
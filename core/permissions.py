@@ -0,0 +1,115 @@
+from functools import cached_property
+
+from django.db.models import Exists, F, OuterRef
+
+from .models import Task
+
+
+class TaskAccess:
+    """
+    Bir kullanıcının tek bir görev üzerindeki yetkilerini (RBAC) bir kez çözen nesne.
+
+    Sorumlunun takımı ve kullanıcının iş ortağı olup olmadığı görevle aynı sorguda
+    (bkz. `annotate`) ya da tek bir ek sorguda okunur; her yetki önbelleğe alınmış bir
+    bool olarak hem view'lara hem şablonlara sunulur.
+    """
+
+    def __init__(self, user, task, *, assignee_team, is_partner):
+        self.user = user
+        self.task = task
+        self.assignee_team = assignee_team
+        self.is_partner = bool(is_partner)
+
+    @staticmethod
+    def annotate(queryset, user):
+        """Görev sorgusuna yetki çözümü için gereken alanları ekler."""
+        partner_sq = Task.partners.through.objects.filter(task_id=OuterRef("pk"), customuser_id=user.pk)
+        return queryset.annotate(access_assignee_team=F("assigned_to__team"), access_is_partner=Exists(partner_sq))
+
+    @classmethod
+    def for_task(cls, user, task):
+        """
+        Görev `annotate` ile yüklendiyse ek sorgu yapmaz; aksi halde eksik alanları tek sorguda okur.
+        """
+        if hasattr(task, "access_is_partner"):
+            return cls(user, task, assignee_team=task.access_assignee_team, is_partner=task.access_is_partner)
+        row = cls.annotate(Task.objects.filter(pk=task.pk), user).values("access_assignee_team", "access_is_partner").first()
+        row = row or {"access_assignee_team": None, "access_is_partner": False}
+        return cls(user, task, assignee_team=row["access_assignee_team"], is_partner=row["access_is_partner"])
+
+    # ---- Rol ve üyelik bilgileri ----
+    @cached_property
+    def is_superuser(self):
+        return bool(getattr(self.user, "is_superuser", False))
+
+    @cached_property
+    def is_team_manager(self):
+        return getattr(self.user, "role", None) == "manager" and bool(self.user.team) and self.assignee_team == self.user.team
+
+    @cached_property
+    def is_manager(self):
+        return getattr(self.user, "role", None) == "manager"
+
+    @cached_property
+    def is_assignee(self):
+        return self.task.assigned_to_id == self.user.pk
+
+    @cached_property
+    def is_creator(self):
+        return self.task.created_by_id == self.user.pk
+
+    @cached_property
+    def is_member(self):
+        """Sorumlu ya da iş ortağı."""
+        return self.is_assignee or self.is_partner
+
+    # ---- Yetkiler ----
+    @cached_property
+    def can_view(self):
+        if self.is_superuser:
+            return True
+        if self.is_manager:
+            return self.is_team_manager
+        if self.is_member:
+            return True
+        return bool(self.user.team) and self.assignee_team == self.user.team
+
+    @cached_property
+    def can_edit(self):
+        if self.is_superuser:
+            return True
+        if self.is_manager:
+            return self.is_team_manager
+        return self.is_creator or self.is_member
+
+    @cached_property
+    def can_delete(self):
+        if self.is_superuser:
+            return True
+        if self.is_manager:
+            return self.is_team_manager
+        return self.is_creator
+
+    @cached_property
+    def can_toggle_roadmap(self):
+        if self.is_superuser:
+            return True
+        if self.is_manager:
+            return self.is_team_manager
+        return self.is_creator or self.is_member
+
+    @cached_property
+    def can_edit_roadmap(self):
+        if self.is_superuser:
+            return True
+        if self.is_manager:
+            return self.is_team_manager
+        return self.is_creator or self.is_partner
+
+    @cached_property
+    def can_log_work(self):
+        return self.is_member
+
+    @cached_property
+    def can_view_contributions(self):
+        return self.is_manager or self.is_member
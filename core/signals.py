@@ -0,0 +1,243 @@
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .dashboard import bump_team_versions
+from .models import CustomUser, RoadmapItem, Task, WorkLog
+from .utils import ACTIVE_STATUSES, adjust_worklog_daily, refresh_workload_days
+
+# Değiştiğinde iş yükü projeksiyonunu etkileyen görev alanları
+WORKLOAD_FIELDS = ('assigned_to', 'start_date', 'due_date', 'status', 'planned_hours', 'spent_hours', 'priority', 'size')
+
+# Değiştiğinde takım panolarının çalışan listesini etkileyen kullanıcı alanları
+TEAM_FIELDS = ('role', 'team')
+
+_pending = threading.local()
+
+
+class _PendingBatch:
+    """
+    Bir işlem (transaction) boyunca biriken yenileme isteklerini tutar; işlem sonunda
+    (`on_commit`) tek seferde uygulanır. Aynı toplu iş her istekte kuyruğa yeniden eklenir;
+    ilk çağrı birikenleri uygular, sonrakiler boş geçer.
+    """
+
+    def __init__(self, apply):
+        self.apply, self.user_ids, self.spans = apply, set(), []
+
+    def __call__(self):
+        user_ids, spans = self.user_ids, self.spans
+        self.user_ids, self.spans = set(), []
+        if user_ids:
+            self.apply(user_ids, spans)
+
+
+def _current_batch(name, apply):
+    """
+    İşlemin bekleyen toplu işini döner; yoksa yenisini açar.
+
+    Toplu iş yalnızca kendi geri çağrısı işlemin `on_commit` kuyruğunda durduğu sürece
+    kullanılır. İşlem geri alındığında Django kuyruğu temizler; sonraki işlem yeni bir
+    toplu işle başlar ve geri alınan değişiklikler ona taşınmaz.
+    """
+    batch = getattr(_pending, name, None)
+    if batch is None or not any(entry[1] is batch for entry in transaction.get_connection().run_on_commit):
+        batch = _PendingBatch(apply)
+        setattr(_pending, name, batch)
+    return batch
+
+
+def schedule_workload_refresh(user_ids, spans=None):
+    """
+    Kullanıcıların WorkloadDay satırlarının yenilenmesini işlem sonuna erteler.
+    Aynı işlem içindeki tüm sinyaller tek bir yenilemede birleştirilir; `spans`
+    (değişen görevlerin tarih aralıkları) verilirse yalnızca bu günler yeniden yazılır.
+    """
+    batch = _current_batch("workload", refresh_workload_days)
+    batch.user_ids.update(uid for uid in user_ids if uid)
+    if spans is None:
+        batch.spans = None
+    elif batch.spans is not None:
+        batch.spans.extend(spans)
+    transaction.on_commit(batch)
+
+
+def schedule_dashboard_invalidation(user_ids):
+    """
+    Kullanıcıların takımlarına ait pano önbelleği sürümünü işlem sonunda artırır.
+    Aynı işlemdeki değişiklikler tek bir artırımda birleştirilir.
+    """
+    # Önceki (geri alınmış) işlemden kalan iş yükü toplu işi sürüm artırımında uygulanmasın
+    _current_batch("workload", refresh_workload_days)
+    batch = _current_batch("dashboard", _flush_dashboard_invalidation)
+    batch.user_ids.update(uid for uid in user_ids if uid)
+    transaction.on_commit(batch)
+
+
+def _flush_dashboard_invalidation(user_ids, _spans):
+    # Sürüm, WorkloadDay satırları yeniden yazıldıktan sonra artırılmalı; on_commit kayıt
+    # sırası bunu garanti etmediğinden bekleyen iş yükü yenilemesi önce uygulanır.
+    _pending.workload()
+    bump_team_versions(CustomUser.objects.filter(pk__in=user_ids).values_list("team", flat=True).distinct())
+
+
+def _task_members(task_ids):
+    """Görevlerin sorumlu ve ortak id'leri ile (başlangıç, bitiş) aralıkları."""
+    tasks = list(Task.objects.filter(pk__in=task_ids).values_list("assigned_to_id", "start_date", "due_date"))
+    ids = {assignee for assignee, _, _ in tasks}
+    ids.update(Task.partners.through.objects.filter(task_id__in=task_ids).values_list("customuser_id", flat=True))
+    return ids, [(start, due) for _, start, due in tasks]
+
+
+def _task_member_ids(task_ids):
+    return _task_members(task_ids)[0]
+
+
+@receiver(pre_save, sender=Task)
+def task_capture_previous(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._workload_previous = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not set(update_fields) & set(WORKLOAD_FIELDS):
+        return
+    fields = [f"{name}_id" if name == "assigned_to" else name for name in WORKLOAD_FIELDS]
+    instance._workload_previous = Task.objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    span = (instance.start_date, instance.due_date)
+    if created:
+        schedule_workload_refresh([instance.assigned_to_id], [span])
+        schedule_dashboard_invalidation([instance.assigned_to_id])
+        return
+
+    previous = getattr(instance, "_workload_previous", None)
+    members = _task_member_ids([instance.pk])
+    if previous:
+        changed = any(getattr(instance, field) != value for field, value in previous.items())
+        both_closed = previous["status"] not in ACTIVE_STATUSES and instance.status not in ACTIVE_STATUSES
+        if changed and not both_closed:
+            schedule_workload_refresh(members | {previous["assigned_to_id"]}, [span, (previous["start_date"], previous["due_date"])])
+    schedule_dashboard_invalidation(members | {previous["assigned_to_id"] if previous else None})
+
+
+@receiver(pre_delete, sender=Task)
+def task_capture_members(sender, instance, **kwargs):
+    instance._workload_members = _task_member_ids([instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    members = getattr(instance, "_workload_members", {instance.assigned_to_id})
+    schedule_workload_refresh(members, [(instance.start_date, instance.due_date)])
+    schedule_dashboard_invalidation(members)
+
+
+@receiver(m2m_changed, sender=Task.partners.through)
+def task_partners_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        # Temizlenecek ilişkiler silinmeden önce yakalanır
+        if reverse:
+            instance._workload_cleared = set(instance.partner_tasks.values_list("id", flat=True))
+        else:
+            instance._workload_cleared = set(instance.partners.values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    affected = set(pk_set or ()) | vars(instance).pop("_workload_cleared", set())
+    if reverse:
+        # Kullanıcı tarafından (user.partner_tasks) yapılan değişiklik: pk_set görev id'leridir
+        members, spans = _task_members(affected)
+        members.add(instance.pk)
+        schedule_workload_refresh(members, spans)
+    else:
+        members = _task_member_ids([instance.pk]) | affected
+        if instance.status in ACTIVE_STATUSES:
+            schedule_workload_refresh(members, [(instance.start_date, instance.due_date)])
+    schedule_dashboard_invalidation(members)
+
+
+@receiver(pre_save, sender=WorkLog)
+def worklog_capture_previous(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if raw or not instance.pk:
+        return
+    instance._rollup_previous = WorkLog.objects.filter(pk=instance.pk).values("user_id", "task_id", "date", "hours").first()
+
+
+@receiver(post_save, sender=WorkLog)
+def worklog_rollup_saved(sender, instance, raw=False, **kwargs):
+    # Özet tablo efor kaydıyla aynı işlemde güncellenir (toplu yazmalar için bkz. `core.worklogs`)
+    if raw:
+        return
+    deltas = defaultdict(Decimal)
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous:
+        deltas[(previous["user_id"], previous["task_id"], previous["date"])] -= previous["hours"]
+    deltas[(instance.user_id, instance.task_id, instance.date)] += Decimal(str(instance.hours))
+    adjust_worklog_daily(deltas)
+
+
+@receiver(post_delete, sender=WorkLog)
+def worklog_rollup_deleted(sender, instance, origin=None, **kwargs):
+    # Görev ya da kullanıcı silinirken özet satırları da zincirleme silinir; düşülecek fark yoktur
+    if origin is not None and not isinstance(origin, WorkLog) and getattr(origin, "model", None) is not WorkLog:
+        return
+    adjust_worklog_daily({(instance.user_id, instance.task_id, instance.date): -Decimal(str(instance.hours))})
+
+
+@receiver(post_save, sender=WorkLog)
+@receiver(post_delete, sender=WorkLog)
+def worklog_written(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    members, spans = _task_members([instance.task_id])
+    schedule_workload_refresh(members, spans)
+    schedule_dashboard_invalidation(members)
+
+
+@receiver(post_save, sender=RoadmapItem)
+@receiver(post_delete, sender=RoadmapItem)
+def roadmap_written(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_dashboard_invalidation(_task_member_ids([instance.task_id]))
+
+
+@receiver(pre_save, sender=CustomUser)
+def user_capture_previous(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._team_previous = None
+    if raw or not instance.pk:
+        return
+    # Girişte yalnızca last_login güncellenir; ek sorgu yapılmaz
+    if update_fields is not None and not set(update_fields) & set(TEAM_FIELDS):
+        return
+    instance._team_previous = CustomUser.objects.filter(pk=instance.pk).values(*TEAM_FIELDS).first()
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        # Yeni üye takım panosunun çalışan listesinde görünür
+        transaction.on_commit(lambda: bump_team_versions([instance.team]))
+        return
+    previous = getattr(instance, "_team_previous", None)
+    if previous is None or previous == {name: getattr(instance, name) for name in TEAM_FIELDS}:
+        return
+    # Üye eski ve yeni takımın panolarında farklı görünür; iki takımın sürümü de artırılır
+    transaction.on_commit(lambda: bump_team_versions([previous["team"], instance.team]))
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_team_versions([instance.team]))
@@ -0,0 +1,1174 @@
+from collections import defaultdict
+import csv
+from datetime import date, timedelta
+from decimal import Decimal
+import json
+import os
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection, transaction
+from django.db.models import Q
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import notifications as notifications_module
+from . import signals as signals_module
+from .dashboard import dashboard_cache_stats, team_data_version
+from .models import (
+    CustomUser, EmailOutbox, Notification, NotificationCounter, NotificationOutbox, RoadmapItem, Task, TeamAnnouncement, WorkLog,
+    WorkLogDaily, WorkloadDay,
+)
+from .notifications import (
+    RecipientResolver, adjust_unread_counts, deliver_queued_emails, enqueue_notification, notification_event_stream, notification_marker,
+    process_outbox, reconcile_unread_counts,
+)
+from .permissions import TaskAccess
+from .signals import schedule_workload_refresh
+from .utils import (
+    calculate_team_hours, calculate_workload_distribution, calculate_team_workload, find_workload_drift, get_workload_chart,
+    get_workload_days, refresh_workload_days, team_weekly_hours, _algo_priority, _algo_size, _algo_deadline,
+)
+from .worklogs import import_worklogs, read_worklog_rows, reconcile_spent_hours, reconcile_worklog_daily, record_worklog, record_worklogs
+
+STRATEGIES = ("balanced", "priority_weighted", "size_weighted", "deadline_weighted")
+
+
+def _reference_distribution(user, strategy, view_start, view_end, team_filter=None):
+    """
+    Vektörel motorun karşılaştırıldığı, gün gün ilerleyen skaler referans hesaplama.
+    """
+    tasks = Task.objects.filter(Q(assigned_to=user) | Q(partners=user)).distinct()
+    tasks = tasks.filter(status__in=["baslanmadi", "calisiliyor", "duraklatildi"])
+    if team_filter:
+        tasks = tasks.filter(assigned_to__team=team_filter)
+
+    today = date.today()
+    daily = defaultdict(float)
+    for task in tasks:
+        remaining = float(task.planned_hours) - float(task.spent_hours)
+        if remaining <= 0:
+            continue
+        share = remaining / (1 + task.partners.count())
+        effective_start = max(task.start_date, today)
+        if task.due_date < effective_start:
+            daily[today] += share
+            continue
+        days_total = (task.due_date - effective_start).days + 1
+        if strategy == "priority_weighted":
+            dist = _algo_priority(share, days_total, task.priority)
+        elif strategy == "size_weighted":
+            dist = _algo_size(share, days_total, task.size)
+        elif strategy == "deadline_weighted":
+            dist = _algo_deadline(share, days_total)
+        else:
+            dist = [share / days_total] * days_total
+        for i, hours in enumerate(dist):
+            current_day = effective_start + timedelta(days=i)
+            if view_start <= current_day <= view_end:
+                daily[current_day] += hours
+
+    delta = max(1, min((view_end - view_start).days + 1, 366))
+    return [round(daily.get(view_start + timedelta(days=i), 0), 2) for i in range(delta)]
+
+
+class WorkloadTestMixin:
+    """
+    İş yükü testleri için ortak ekip ve görev kurgusu.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        cls.manager = CustomUser.objects.create_user(username="mgr", password="x", role="manager", team="team1")
+        cls.ali = CustomUser.objects.create_user(username="ali", password="x", role="employee", team="team1")
+        cls.veli = CustomUser.objects.create_user(username="veli", password="x", role="employee", team="team1")
+        cls.ayse = CustomUser.objects.create_user(username="ayse", password="x", role="employee", team="team1")
+
+        specs = [
+            # (öncelik, büyüklük, başlangıç ofseti, bitiş ofseti, planlanan, harcanan, durum, atanan, ortaklar)
+            ("yuksek", 5, -10, 5, "120.00", "47.50", "calisiliyor", cls.ali, [cls.veli, cls.ayse]),
+            ("orta", 3, 2, 40, "35.00", "0", "baslanmadi", cls.ali, []),
+            ("dusuk", 4, -3, 700, "410.25", "12.00", "calisiliyor", cls.veli, [cls.ali]),
+            ("yuksek", 2, -20, -2, "16.00", "4.00", "duraklatildi", cls.ali, []),
+            ("dusuk", 1, 0, 0, "3.50", "0", "baslanmadi", cls.ali, [cls.ayse]),
+            ("orta", 5, 30, 120, "80.00", "10.00", "baslanmadi", cls.ayse, [cls.ali]),
+            ("yuksek", 4, 1, 1, "7.00", "0", "baslanmadi", cls.ali, []),
+            ("orta", 3, -5, 10, "20.00", "25.00", "calisiliyor", cls.ali, []),
+            ("yuksek", 5, -5, 10, "20.00", "0", "tamamlandi", cls.ali, []),
+        ]
+        for priority, size, s_off, d_off, planned, spent, status, assignee, partners in specs:
+            task = Task.objects.create(
+                title=f"{priority}-{size}-{s_off}", priority=priority, size=size, status=status,
+                start_date=cls.today + timedelta(days=s_off), due_date=cls.today + timedelta(days=d_off),
+                planned_hours=Decimal(planned), spent_hours=Decimal(spent),
+                created_by=cls.manager, assigned_to=assignee,
+            )
+            task.partners.set(partners)
+
+    def setUp(self):
+        super().setUp()
+        # Pano önbelleği testler arasında taşınmasın
+        cache.clear()
+
+
+class WorkloadDistributionParityTests(WorkloadTestMixin, TestCase):
+    def assert_parity(self, user, view_start, view_end, team_filter=None):
+        for strategy in STRATEGIES:
+            with self.subTest(strategy=strategy, view_start=view_start, view_end=view_end):
+                result = calculate_workload_distribution(
+                    user, strategy=strategy, view_start=view_start, view_end=view_end, team_filter=team_filter
+                )
+                expected = _reference_distribution(user, strategy, view_start, view_end, team_filter)
+                self.assertEqual(result["data"], expected)
+                self.assertEqual(len(result["labels"]), len(expected))
+                self.assertEqual(result["strategy"], strategy)
+
+    def test_default_ranges_match_reference(self):
+        for user in (self.ali, self.veli, self.ayse):
+            self.assert_parity(user, self.today, self.today + timedelta(days=6))
+            self.assert_parity(user, self.today, self.today + timedelta(days=29))
+            self.assert_parity(user, self.today, self.today + timedelta(days=364))
+
+    def test_custom_ranges_match_reference(self):
+        self.assert_parity(self.ali, self.today - timedelta(days=15), self.today + timedelta(days=15))
+        self.assert_parity(self.ali, self.today + timedelta(days=100), self.today + timedelta(days=200))
+        self.assert_parity(self.veli, self.today - timedelta(days=30), self.today - timedelta(days=1))
+        self.assert_parity(self.veli, self.today, self.today + timedelta(days=2000))
+
+    def test_team_filter_matches_reference(self):
+        self.assert_parity(self.ali, self.today, self.today + timedelta(days=29), team_filter="team1")
+        self.assert_parity(self.ali, self.today, self.today + timedelta(days=29), team_filter="team2")
+
+    def test_overdue_remaining_lands_on_today(self):
+        data = calculate_workload_distribution(
+            self.ali, view_start=self.today, view_end=self.today + timedelta(days=6)
+        )["data"]
+        # 16 - 4 saatlik gecikmiş görev ile bugün biten 3.5 / 2 saatlik görev bugüne yığılır
+        self.assertGreaterEqual(data[0], 12.0 + 1.75)
+
+    def test_very_long_task_uses_window_only(self):
+        # Önek önbelleği sınırını aşan (yüzyılı aşkın) görevde de sonuç referansla örtüşmeli
+        user = CustomUser.objects.create_user(username="uzun", password="x", role="employee", team="team1")
+        task = Task.objects.create(
+            title="uzun", priority="orta", size=3, status="calisiliyor",
+            start_date=self.today, due_date=self.today + timedelta(days=45000),
+            planned_hours=Decimal("9999.00"), spent_hours=Decimal("0"),
+            created_by=self.manager, assigned_to=user,
+        )
+        week = (self.today, self.today + timedelta(days=6))
+        for strategy in STRATEGIES:
+            data = calculate_workload_distribution(user, strategy=strategy, view_start=week[0], view_end=week[1])["data"]
+            share = float(task.planned_hours)
+            if strategy == "deadline_weighted":
+                total = sum((i + 1) ** 1.5 for i in range(45001))
+                expected = [round(((i + 1) ** 1.5 / total) * share, 2) for i in range(7)]
+            else:
+                expected = _reference_distribution(user, strategy, *week)
+            self.assertEqual(data, expected)
+
+
+class ViewRangeGuardTests(TestCase):
+    def test_custom_range_is_ordered_and_capped(self):
+        from django.test import RequestFactory
+        from .utils import MAX_VIEW_DAYS
+        from .views import _resolve_view_range
+
+        today = date.today()
+        request = RequestFactory().get("/", {"range": "custom", "start": "2031-01-01", "end": "2020-01-01"})
+        view_start, view_end = _resolve_view_range(request, today, "custom")
+        self.assertEqual(view_start, date(2020, 1, 1))
+        self.assertEqual((view_end - view_start).days + 1, MAX_VIEW_DAYS)
+
+        # Takvimin sonuna yakın aralıklar date.max'ı aşmadan kırpılır
+        request = RequestFactory().get("/", {"range": "custom", "start": "9999-06-01", "end": "9999-12-31"})
+        self.assertEqual(_resolve_view_range(request, today, "custom"), (date(9999, 6, 1), date.max))
+
+    def test_dashboards_survive_end_of_calendar_ranges(self):
+        user = CustomUser.objects.create_user(username="ali", password="x", role="manager", team="team1")
+        self.client.force_login(user)
+        params = {"range": "custom", "start": "9999-06-01", "end": "9999-12-31"}
+        for name in ("manager_dashboard", "employee_dashboard"):
+            for ajax in ({}, {"ajax": "true"}):
+                with self.subTest(view=name, ajax=bool(ajax)):
+                    self.assertEqual(self.client.get(reverse(name), {**params, **ajax}).status_code, 200)
+
+
+class TeamWorkloadTests(WorkloadTestMixin, TestCase):
+    def test_rows_match_individual_distribution(self):
+        view_start, view_end = self.today - timedelta(days=3), self.today + timedelta(days=60)
+        for strategy in STRATEGIES:
+            team_load = calculate_team_workload("team1", strategy=strategy, view_start=view_start, view_end=view_end)
+            self.assertEqual(team_load["matrix"].shape, (len(team_load["user_ids"]), 64))
+            for user in (self.ali, self.veli, self.ayse):
+                with self.subTest(strategy=strategy, user=user.username):
+                    expected = calculate_workload_distribution(
+                        user, strategy=strategy, view_start=view_start, view_end=view_end, team_filter="team1"
+                    )
+                    self.assertEqual(team_load["data"][user.id], expected["data"])
+                    self.assertEqual(team_load["labels"], expected["labels"])
+
+    def test_loads_team_in_two_queries(self):
+        with self.assertNumQueries(2):
+            calculate_team_workload("team1", strategy="deadline_weighted")
+
+
+class TeamHoursTests(WorkloadTestMixin, TestCase):
+    def _reference_hours(self, user):
+        # Eski kullanıcı başına döngünün birebir karşılığı
+        user_tasks = Task.objects.filter(Q(assigned_to=user) | Q(partners=user), assigned_to__team="team1").distinct()
+        planned = sum(float(t.planned_hours) / (1 + t.partners.count()) for t in user_tasks if t.planned_hours)
+        spent = sum(float(w.hours) for w in WorkLog.objects.filter(task__in=user_tasks, user=user))
+        return round(planned, 2), round(spent, 2)
+
+    def test_matches_per_user_totals(self):
+        task = Task.objects.filter(assigned_to=self.ali).first()
+        WorkLog.objects.create(task=task, user=self.veli, hours=Decimal("3.25"), description="ortak")
+        WorkLog.objects.create(task=task, user=self.ali, hours=Decimal("1.50"), description="sorumlu")
+        solo = Task.objects.filter(assigned_to=self.ali, partners__isnull=True).first()
+        # Üyesi olmadığı göreve girilmiş efor toplama katılmaz
+        WorkLog.objects.create(task=solo, user=self.ayse, hours=Decimal("9.00"), description="yabancı")
+
+        users = [self.ali, self.veli, self.ayse]
+        hours = calculate_team_hours("team1", [u.id for u in users])
+        for user in users:
+            planned, spent = hours[user.id]
+            self.assertEqual((round(planned, 2), round(spent, 2)), self._reference_hours(user))
+
+    def test_aggregate_chart_query_count_is_flat(self):
+        self.client.force_login(self.manager)
+        url = reverse("manager_dashboard")
+        self.client.get(url, {"ajax": "true"})  # oturum ısınması
+        cache.clear()
+        with CaptureQueriesContext(connection) as small_team:
+            self.client.get(url, {"ajax": "true"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(10):
+                member = CustomUser.objects.create_user(username=f"uye{i}", password="x", role="employee", team="team1")
+                task = Task.objects.create(
+                    title=f"ek-{i}", priority="orta", size=2, status="calisiliyor",
+                    start_date=self.today, due_date=self.today + timedelta(days=5),
+                    planned_hours=Decimal("10.00"), created_by=self.manager, assigned_to=member,
+                )
+                task.partners.set([self.ali])
+                WorkLog.objects.create(task=task, user=member, hours=Decimal("1.00"), description="test")
+
+        with CaptureQueriesContext(connection) as large_team:
+            response = self.client.get(url, {"ajax": "true"})
+        self.assertEqual(len(large_team), len(small_team))
+        self.assertEqual(len(response.json()["labels"]), 13)
+        with self.assertNumQueries(3):
+            calculate_team_hours("team1", [self.ali.id, self.veli.id])
+
+
+class DashboardViewTests(WorkloadTestMixin, TestCase):
+    def test_manager_dashboard_modes(self):
+        self.client.force_login(self.manager)
+        self.assertEqual(self.client.get(reverse("manager_dashboard")).status_code, 200)
+        response = self.client.get(reverse("manager_dashboard"), {"user_id": self.ali.id, "ajax": "true", "range": "week"})
+        self.assertEqual(response.json()["mode"], "individual")
+        self.assertEqual(len(response.json()["data"]), 7)
+        response = self.client.get(reverse("manager_dashboard"), {"ajax": "true"})
+        self.assertEqual(response.json()["mode"], "aggregate")
+
+    def test_manager_snapshot_matches_panel_queries(self):
+        self.client.force_login(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("manager_dashboard"))
+        self.assertEqual(len([q for q in queries.captured_queries if '"completed_steps"' in q["sql"]]), 1)
+
+        today = response.context["today"]
+        team_tasks = Task.objects.filter(assigned_to__team="team1").exclude(status__in=["tamamlandi", "iptal"])
+        self.assertEqual(
+            {t.id for t in response.context["today_tasks"]},
+            set(team_tasks.filter(start_date__lte=today, due_date__gte=today).values_list("id", flat=True)),
+        )
+        delayed = team_tasks.filter(Q(due_date__lt=today) | Q(status="baslanmadi", due_date__range=[today, today + timedelta(days=3)]))
+        self.assertEqual({t.id for t in response.context["delayed_tasks"]}, set(delayed.values_list("id", flat=True)))
+        groups = {g["member"].id: {t.id for t in g["tasks"]} for g in response.context["team_task_groups"]}
+        self.assertEqual(groups[self.ayse.id], set(team_tasks.filter(Q(assigned_to=self.ayse) | Q(partners=self.ayse)).values_list("id", flat=True)))
+        self.assertEqual(len(response.context["tasks"]), Task.objects.filter(assigned_to__team="team1").count())
+
+        response = self.client.get(reverse("manager_dashboard"), {"user_id": self.veli.id})
+        self.assertEqual(
+            {t.id for t in response.context["tasks"]},
+            set(Task.objects.filter(Q(assigned_to=self.veli) | Q(partners=self.veli)).values_list("id", flat=True)),
+        )
+
+    def test_employee_dashboard(self):
+        self.client.force_login(self.ali)
+        self.assertEqual(self.client.get(reverse("employee_dashboard")).status_code, 200)
+        response = self.client.get(reverse("employee_dashboard"), {"ajax": "true", "strategy": "size_weighted"})
+        self.assertEqual(response.json()["strategy"], "size_weighted")
+
+    def test_employee_snapshot_runs_task_query_once(self):
+        self.client.force_login(self.ali)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("employee_dashboard"))
+        heavy = [q for q in queries.captured_queries if '"completed_steps"' in q["sql"]]
+        self.assertEqual(len(heavy), 1)
+
+        snapshot = response.context["tasks"]
+        self.assertEqual(response.context["task_count"], len(snapshot))
+        open_tasks = [t for t in snapshot if t.status not in ("tamamlandi", "iptal")]
+        self.assertEqual(
+            [t.id for t in response.context["today_tasks"]],
+            [t.id for t in open_tasks if t.start_date <= response.context["today"] <= t.due_date],
+        )
+        self.assertEqual(response.context["urgent_task"], response.context["alerts"][0]["task"])
+        self.assertTrue(all(a["task"].due_date < response.context["today"] or a["task"].status == "baslanmadi" for a in response.context["alerts"]))
+
+    def test_ajax_payload_carries_every_strategy(self):
+        self.client.force_login(self.ali)
+        payload = self.client.get(reverse("employee_dashboard"), {"ajax": "true", "range": "week"}).json()
+        self.assertEqual(sorted(payload["series"]), sorted(STRATEGIES))
+        self.assertEqual(payload["series"]["balanced"], payload["data"])
+
+        self.client.force_login(self.manager)
+        payload = self.client.get(
+            reverse("manager_dashboard"), {"user_id": self.ali.id, "ajax": "true", "strategy": "priority_weighted"}
+        ).json()
+        self.assertEqual(payload["series"]["priority_weighted"], payload["data"])
+
+
+class WorkloadDayTests(WorkloadTestMixin, TestCase):
+    def test_materialized_rows_match_on_the_fly(self):
+        refresh_workload_days([self.manager.id, self.ali.id, self.veli.id, self.ayse.id])
+        self.assertEqual(find_workload_drift(), [])
+
+        view_start, view_end = self.today, self.today + timedelta(days=29)
+        with self.assertNumQueries(1):
+            chart = get_workload_days(self.ali, "deadline_weighted", view_start, view_end)
+        expected = calculate_workload_distribution(self.ali, strategy="deadline_weighted", view_start=view_start, view_end=view_end)
+        self.assertEqual(chart, expected)
+
+    def test_task_and_partner_changes_refresh_affected_users(self):
+        call_command("rebuild_workload", stdout=StringIO())
+        task = Task.objects.filter(assigned_to=self.ali, status="baslanmadi").first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.due_date = self.today + timedelta(days=3)
+            task.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            task.partners.add(self.veli)
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkLog.objects.create(task=task, user=self.ali, hours=Decimal("2.0"), description="test")
+            task.spent_hours = Decimal("2.0")
+            task.save(update_fields=["spent_hours"])
+
+        self.assertEqual(find_workload_drift(), [])
+        call_command("rebuild_workload", "--check", stdout=StringIO())
+
+    def test_task_change_rewrites_only_its_date_range(self):
+        call_command("rebuild_workload", stdout=StringIO())
+        task = Task.objects.get(title="orta-3-2")
+        rows = WorkloadDay.objects.filter(user=self.ali, strategy="balanced")
+        inside, outside = (rows.get(day=self.today + timedelta(days=n)).pk for n in (10, 300))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.due_date = self.today + timedelta(days=20)
+            task.save()
+        self.assertFalse(rows.filter(pk=inside).exists())
+        self.assertTrue(rows.filter(pk=outside).exists())
+        self.assertEqual(find_workload_drift(), [])
+
+    def test_stale_rows_fall_back_and_refresh(self):
+        WorkloadDay.objects.create(
+            user=self.ali, strategy="balanced", day=self.today, hours=Decimal("99"),
+            computed_on=self.today - timedelta(days=1),
+        )
+        chart = get_workload_chart(self.ali, "balanced", self.today, self.today + timedelta(days=6))
+        expected = calculate_workload_distribution(self.ali, view_start=self.today, view_end=self.today + timedelta(days=6))
+        self.assertEqual(chart["data"], expected["data"])
+        self.assertFalse(WorkloadDay.objects.filter(computed_on__lt=self.today).exists())
+
+
+class DashboardCacheTests(WorkloadTestMixin, TestCase):
+    def test_repeat_loads_are_served_from_cache(self):
+        self.client.force_login(self.manager)
+        url = reverse("manager_dashboard")
+        params = {"ajax": "true", "user_id": self.ali.id}
+        first = self.client.get(url, params).json()
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, params).json()
+        self.assertEqual(first, second)
+        self.assertFalse([q for q in queries.captured_queries if "core_task" in q["sql"]])
+        self.assertEqual(dashboard_cache_stats(), {"hits": 1, "misses": 1})
+
+        # Farklı strateji ayrı bir anahtardır
+        self.client.get(url, {**params, "strategy": "deadline_weighted"})
+        self.assertEqual(dashboard_cache_stats()["misses"], 2)
+
+    def test_team_writes_invalidate_cached_responses(self):
+        self.client.force_login(self.ali)
+        url = reverse("employee_dashboard")
+        before = self.client.get(url).context["total_completed_steps_agg"]
+        task = Task.objects.filter(assigned_to=self.ali).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RoadmapItem.objects.create(task=task, order=1, description="adım", is_completed=True)
+        self.assertEqual(self.client.get(url).context["total_completed_steps_agg"], before + 1)
+
+        # Ortak olunan, başka kullanıcıya atanmış göreve girilen efor da geçersizleştirir
+        shared = Task.objects.filter(assigned_to=self.veli, partners=self.ali).first()
+        self.client.force_login(self.manager)
+        payload = self.client.get(reverse("manager_dashboard"), {"ajax": "true"}).json()
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkLog.objects.create(task=shared, user=self.ali, hours=Decimal("4.00"), description="test")
+        updated = self.client.get(reverse("manager_dashboard"), {"ajax": "true"}).json()
+        self.assertNotEqual(payload["spent"], updated["spent"])
+
+    def test_teamless_users_and_team_moves_bump_versions(self):
+        loner = CustomUser.objects.create_user(username="yalniz", password="x", role="employee")
+        self.client.force_login(loner)
+        version = team_data_version(None)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(
+                title="tek", priority="orta", size=2, status="calisiliyor", start_date=self.today, due_date=self.today,
+                planned_hours=Decimal("5.00"), created_by=self.manager, assigned_to=loner,
+            )
+        self.assertNotEqual(team_data_version(None), version)
+
+        # Takım değişikliği hem eski hem yeni takımın panosunu geçersizleştirir
+        self.client.force_login(self.manager)
+        employees = self.client.get(reverse("manager_dashboard")).context["employees"]
+        self.assertNotIn(loner, employees)
+        versions = (team_data_version(None), team_data_version("team1"))
+        loner.team = "team1"
+        with self.captureOnCommitCallbacks(execute=True):
+            loner.save()
+        self.assertNotEqual(team_data_version(None), versions[0])
+        self.assertNotEqual(team_data_version("team1"), versions[1])
+        self.assertIn(loner, self.client.get(reverse("manager_dashboard")).context["employees"])
+
+    def test_versions_are_bumped_after_workload_rows_are_rewritten(self):
+        task = Task.objects.filter(assigned_to=self.veli, status="calisiliyor").first()
+        seen = []
+
+        def bump(teams):
+            seen.append(WorkloadDay.objects.filter(user=self.manager).exists())
+
+        with mock.patch.object(signals_module, "bump_team_versions", bump):
+            # Önce yalnızca panoyu etkileyen değişiklik, ardından iş yükünü de etkileyen ortak eklemesi
+            with self.captureOnCommitCallbacks(execute=True):
+                RoadmapItem.objects.create(task=task, order=1, description="adım")
+                task.partners.add(self.manager)
+        self.assertEqual(seen, [True])
+
+
+class ConditionalGetTests(WorkloadTestMixin, TestCase):
+    def assert_revalidates(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        not_modified = self.client.get(url, params or {}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+        return etag
+
+    def test_notification_endpoints_return_304_until_inbox_changes(self):
+        self.client.force_login(self.ali)
+        for name in ("notifications_unread_count", "notifications_latest_api"):
+            url = reverse(name)
+            etag = self.assert_revalidates(url)
+            enqueue_notification(None, title="yeni", message="", recipient_ids=[self.ali.pk])
+            process_outbox()
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+            etag = self.assert_revalidates(url)
+            note = Notification.objects.filter(recipient=self.ali, is_read=False).latest("id")
+            self.client.post(reverse("notification_mark_read", args=[note.pk]), HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_latest_api_304_reads_only_the_counter_row(self):
+        self.client.force_login(self.ali)
+        url = reverse("notifications_latest_api")
+        etag = self.assert_revalidates(url)
+        # Oturum, kullanıcı ve sayaç satırı; bildirim tablosunda toplama yapılmaz
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(len(queries), 3)
+        self.assertFalse(any('"core_notification"' in q["sql"] for q in queries.captured_queries))
+
+    def test_dashboard_ajax_revalidates_against_team_version(self):
+        self.client.force_login(self.manager)
+        url = reverse("manager_dashboard")
+        etag = self.assert_revalidates(url, {"ajax": "true"})
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkLog.objects.create(task=Task.objects.filter(assigned_to=self.ali).first(), user=self.ali, hours=Decimal("1.00"), description="test")
+        self.assertEqual(self.client.get(url, {"ajax": "true"}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.client.force_login(self.ali)
+        self.assert_revalidates(reverse("employee_dashboard"), {"ajax": "true", "range": "week"})
+
+
+class TaskAccessTests(WorkloadTestMixin, TestCase):
+    def test_capabilities_resolve_without_extra_queries(self):
+        other_mgr = CustomUser.objects.create_user(username="mgr2", password="x", role="manager", team="team2")
+        outsider = CustomUser.objects.create_user(username="dis", password="x", role="employee", team="team2")
+        shared = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+
+        expected = {
+            # kullanıcı: (görme, düzenleme, silme, adım işaretleme, yol haritası düzenleme, efor girme)
+            "mgr": (True, True, True, True, True, False),
+            "ali": (True, True, False, True, False, True),
+            "veli": (True, True, False, True, True, True),
+            "mgr2": (False, False, False, False, False, False),
+            "dis": (False, False, False, False, False, False),
+        }
+        for user in (self.manager, self.ali, self.veli, other_mgr, outsider):
+            with self.subTest(user=user.username):
+                task = TaskAccess.annotate(Task.objects.all(), user).get(pk=shared.pk)
+                with self.assertNumQueries(0):
+                    access = TaskAccess.for_task(user, task)
+                    flags = (access.can_view, access.can_edit, access.can_delete,
+                             access.can_toggle_roadmap, access.can_edit_roadmap, access.can_log_work)
+                self.assertEqual(flags, expected[user.username])
+                with self.assertNumQueries(1):
+                    self.assertEqual(TaskAccess.for_task(user, shared).can_edit_roadmap, expected[user.username][4])
+
+    def test_visible_to_matches_access_policy(self):
+        other_mgr = CustomUser.objects.create_user(username="mgr2", password="x", role="manager", team="team2")
+        outsider = CustomUser.objects.create_user(username="dis", password="x", role="employee", team="team2")
+        admin = CustomUser.objects.create_superuser(username="kok", password="x")
+        foreign = Task.objects.create(
+            title="dış", priority="orta", size=2, status="calisiliyor", start_date=self.today, due_date=self.today,
+            planned_hours=Decimal("5.00"), created_by=other_mgr, assigned_to=outsider,
+        )
+        foreign.partners.set([self.ali])
+
+        tasks = list(Task.objects.all())
+        for user in (self.manager, self.ali, self.ayse, other_mgr, outsider, admin):
+            with self.subTest(user=user.username):
+                queryset = Task.objects.visible_to(user)
+                self.assertNotIn("DISTINCT", str(queryset.query))
+                expected = {t.pk for t in tasks if TaskAccess.for_task(user, t).can_view}
+                self.assertEqual(set(queryset.values_list("pk", flat=True)), expected)
+        self.assertEqual(
+            set(Task.objects.involving(self.ali).values_list("pk", flat=True)),
+            set(Task.objects.filter(Q(assigned_to=self.ali) | Q(partners=self.ali)).values_list("pk", flat=True)),
+        )
+
+    def test_superuser_manager_dashboard_stays_on_own_team(self):
+        boss = CustomUser.objects.create_superuser(username="patron", password="x", role="manager", team="team1")
+        outsider = CustomUser.objects.create_user(username="dis", password="x", role="employee", team="team2")
+        Task.objects.create(
+            title="dış", priority="orta", size=2, status="calisiliyor", start_date=self.today, due_date=self.today,
+            planned_hours=Decimal("5.00"), created_by=boss, assigned_to=outsider,
+        )
+        self.client.force_login(boss)
+        titles = {t.title for t in self.client.get(reverse("manager_dashboard")).context["tasks"]}
+        self.assertEqual(titles, set(Task.objects.filter(assigned_to__team="team1").values_list("title", flat=True)))
+
+    def test_task_history_matches_baseline_scopes(self):
+        boss = CustomUser.objects.create_superuser(username="patron", password="x", role="manager", team="team1")
+        loner = CustomUser.objects.create_user(username="yalniz", password="x", role="manager")
+        Task.objects.create(
+            title="dış", priority="orta", size=2, status="calisiliyor", start_date=self.today, due_date=self.today,
+            planned_hours=Decimal("5.00"), created_by=boss, assigned_to=loner,
+        ).partners.set([loner])
+        year = {"year": self.today.year}
+        self.client.force_login(boss)
+        titles = {t.title for t in self.client.get(reverse("task_history"), year).context["tasks"]}
+        self.assertNotIn("dış", titles)
+        self.client.force_login(loner)
+        self.assertEqual([t.title for t in self.client.get(reverse("task_history"), year).context["tasks"]], ["dış"])
+
+    def test_task_detail_uses_access(self):
+        shared = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+        self.client.force_login(self.veli)
+        response = self.client.get(reverse("task_detail", args=[shared.pk]))
+        self.assertTrue(response.context["access"].can_log_work)
+        self.assertContains(response, "addWorkLogModal")
+
+        outsider = CustomUser.objects.create_user(username="dis", password="x", role="employee", team="team2")
+        self.client.force_login(outsider)
+        self.assertRedirects(self.client.get(reverse("task_detail", args=[shared.pk])), reverse("home"), fetch_redirect_response=False)
+
+
+class NotificationOutboxTests(WorkloadTestMixin, TestCase):
+    def test_write_enqueues_one_event_and_worker_fans_out(self):
+        task = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+        informee = CustomUser.objects.create_user(username="bilgi", password="x", role="employee", team="team2")
+        task.informees.set([informee])
+
+        self.client.force_login(self.veli)
+        self.client.post(reverse("task_detail", args=[task.pk]), {
+            "worklog_submit": "1", "date": self.today.isoformat(), "hours": "1.5", "description": "test",
+        })
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+        out = StringIO()
+        call_command("run_outbox", "--once", stdout=out)
+        self.assertIn("1 bildirim", out.getvalue())
+        recipients = set(Notification.objects.values_list("recipient__username", flat=True))
+        self.assertEqual(recipients, {"mgr", "ali", "ayse", "bilgi"})
+        self.assertFalse(NotificationOutbox.objects.filter(processed_at__isnull=True).exists())
+
+        call_command("run_outbox", "--once", stdout=StringIO())
+        self.assertEqual(Notification.objects.count(), 4)
+
+    def test_deleted_task_uses_recipients_captured_at_enqueue(self):
+        task = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+        self.client.force_login(self.manager)
+        self.client.get(reverse("delete_task", args=[task.pk]))
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+        call_command("run_outbox", "--once", stdout=StringIO())
+        notes = Notification.objects.all()
+        self.assertEqual({n.recipient.username for n in notes}, {"ali", "veli", "ayse"})
+        self.assertTrue(all(n.task_id is None for n in notes))
+
+    def test_email_bursts_coalesce_into_one_digest_per_recipient(self):
+        for user in (self.manager, self.ali, self.veli, self.ayse):
+            CustomUser.objects.filter(pk=user.pk).update(email=f"{user.username}@ornek.com")
+        task = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+        item = RoadmapItem.objects.create(task=task, order=1, description="adım")
+
+        self.client.force_login(self.ali)
+        for _ in range(3):
+            self.client.post(reverse("roadmap_toggle", args=[task.pk, item.pk]))
+        self.assertEqual(EmailOutbox.objects.count(), 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Pencere dolmadan gönderilmez
+        self.assertEqual(deliver_queued_emails(window=120), 0)
+        later = timezone.now() + timedelta(seconds=121)
+        sent = deliver_queued_emails(window=120, now=later)
+        self.assertEqual(sent, 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["ayse@ornek.com", "mgr@ornek.com", "veli@ornek.com"])
+        self.assertTrue(all("3 güncelleme" in m.subject for m in mail.outbox))
+        self.assertEqual(deliver_queued_emails(window=0, now=later), 0)
+
+        self.client.force_login(self.veli)
+        self.client.post(reverse("roadmap_toggle", args=[task.pk, item.pk]))
+        deliver_queued_emails(window=0, now=later)
+        single = [m for m in mail.outbox[3:] if m.to == ["ali@ornek.com"]][0]
+        self.assertIn("İşlemi yapan", single.body)
+        self.assertIn("Görev linki: http://testserver/", single.body)
+
+
+class RecipientResolverTests(WorkloadTestMixin, TestCase):
+    def test_single_union_query_memoized_and_manager_changes_seen(self):
+        task = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+        informee = CustomUser.objects.create_user(username="bilgi", password="x", email="b@ornek.com", role="employee", team="team2")
+        task.informees.set([informee])
+        expected = {task.created_by_id, self.ali.pk, self.veli.pk, self.ayse.pk, informee.pk, self.manager.pk}
+
+        resolver = RecipientResolver()
+        with self.assertNumQueries(2):  # UNION ALL + takım yöneticileri
+            resolved = resolver.resolve([task.pk])[task.pk]
+        self.assertEqual(set(resolved), expected)
+        self.assertEqual(resolved[informee.pk], "b@ornek.com")
+        with self.assertNumQueries(0):
+            resolver.resolve([task.pk])
+
+        # Rol değişikliği (sinyal olmadan yapılan toplu güncelleme dahil) sonraki çözümlemede görülür
+        other = Task.objects.exclude(partners=self.veli).exclude(assigned_to=self.veli).filter(assigned_to__team="team1").first()
+        CustomUser.objects.filter(pk=self.veli.pk).update(role="manager")
+        self.assertIn(self.veli.pk, RecipientResolver().resolve([other.pk])[other.pk])
+        CustomUser.objects.filter(pk=self.veli.pk).update(role="employee")
+        self.assertNotIn(self.veli.pk, RecipientResolver().resolve([other.pk])[other.pk])
+
+        # Yalnızca last_login güncellemesi önceki değeri okumaz
+        with self.assertNumQueries(1):
+            self.ali.save(update_fields=["last_login"])
+
+
+class NotificationCoalescingTests(WorkloadTestMixin, TestCase):
+    def test_roadmap_burst_collapses_into_one_row_per_recipient(self):
+        task = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+        items = [RoadmapItem.objects.create(task=task, order=i, description=f"adım {i}") for i in range(1, 6)]
+        self.client.force_login(self.ali)
+
+        for item in items[:2]:
+            self.client.post(reverse("roadmap_toggle", args=[task.pk, item.pk]))
+        process_outbox()
+        for item in items[2:]:
+            self.client.post(reverse("roadmap_toggle", args=[task.pk, item.pk]))
+        process_outbox()
+
+        notes = Notification.objects.filter(recipient=self.veli)
+        self.assertEqual(notes.count(), 1)
+        self.assertEqual(notes[0].group_count, 5)
+        self.assertIn("5 yol haritası adımını", notes[0].message)
+        self.assertEqual(NotificationCounter.objects.get(user=self.veli).unread_count, 1)
+
+        # Okunan bildirim birleştirilmez; yeni olay yeni satır açar
+        notes.update(is_read=True)
+        self.client.post(reverse("roadmap_toggle", args=[task.pk, items[0].pk]))
+        process_outbox()
+        self.assertEqual(Notification.objects.filter(recipient=self.veli).count(), 2)
+
+        # Farklı olay türü ayrı satırdır
+        self.client.post(reverse("task_detail", args=[task.pk]), {
+            "worklog_submit": "1", "date": self.today.isoformat(), "hours": "1", "description": "test",
+        })
+        process_outbox()
+        self.assertEqual(
+            sorted(Notification.objects.filter(recipient=self.veli).values_list("event", flat=True)),
+            ["roadmap_toggle", "roadmap_toggle", "worklog_add"],
+        )
+
+
+    def test_group_read_after_lookup_is_not_overwritten(self):
+        task = Task.objects.filter(assigned_to=self.ali, partners=self.veli).first()
+        enqueue_notification(task, title="t", message="m", actor=self.ali, event="roadmap_toggle")
+        process_outbox()
+        note = Notification.objects.get(recipient=self.veli)
+
+        def read_after_lookup(events, now):
+            groups = open_groups(events, now)
+            # Çalışan grupları okuduktan sonra kullanıcı bildirimi okundu işaretler
+            Notification.objects.filter(pk=note.pk).update(is_read=True)
+            adjust_unread_counts({self.veli.pk: -1})
+            return groups
+
+        open_groups = notifications_module._open_notification_groups
+        enqueue_notification(task, title="t2", message="m2", actor=self.ali, event="roadmap_toggle")
+        with mock.patch.object(notifications_module, "_open_notification_groups", read_after_lookup):
+            process_outbox()
+        note.refresh_from_db()
+        self.assertEqual((note.is_read, note.group_count, note.title), (True, 1, "t"))
+        fresh = Notification.objects.get(recipient=self.veli, is_read=False)
+        self.assertEqual((fresh.title, fresh.group_count), ("t2", 1))
+        self.assertEqual(NotificationCounter.objects.get(user=self.veli).unread_count, 1)
+
+
+class UnreadCounterTests(WorkloadTestMixin, TestCase):
+    def unread(self, user):
+        return NotificationCounter.objects.get(user=user).unread_count
+
+    def test_write_paths_keep_counter_in_sync(self):
+        for _ in range(3):
+            enqueue_notification(None, title="olay", message="", recipient_ids=[self.ali.pk, self.veli.pk])
+        process_outbox()
+        self.assertEqual((self.unread(self.ali), self.unread(self.veli)), (3, 3))
+
+        self.client.force_login(self.ali)
+        first, second, third = Notification.objects.filter(recipient=self.ali).order_by("id")
+        self.client.post(reverse("notification_mark_read", args=[first.pk]))
+        self.client.post(reverse("notification_mark_read", args=[first.pk]))
+        self.assertEqual(self.unread(self.ali), 2)
+        self.client.post(reverse("notification_delete", args=[second.pk]))
+        self.assertEqual(self.unread(self.ali), 1)
+        self.client.post(reverse("notifications_mark_all_read"))
+        self.assertEqual(self.unread(self.ali), 0)
+
+        self.client.force_login(self.veli)
+        self.client.post(reverse("notifications_delete_all"))
+        self.assertEqual(self.unread(self.veli), 0)
+
+        # Oturum + kullanıcı + sayaç satırı; bildirim tablosu sayılmaz
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("notifications_unread_count"))
+        self.assertEqual(response.json(), {"unread": 0})
+
+    def test_reconcile_repairs_drift(self):
+        Notification.objects.create(recipient=self.ali, title="doğrudan", message="")
+        NotificationCounter.objects.create(user=self.veli, unread_count=7)
+        fixed = reconcile_unread_counts()
+        self.assertEqual({uid for uid, _, _ in fixed}, {self.ali.pk, self.veli.pk})
+        self.assertEqual((self.unread(self.ali), self.unread(self.veli)), (1, 0))
+
+        out = StringIO()
+        call_command("reconcile_unread_counts", stdout=out)
+        self.assertIn("tutarlı", out.getvalue())
+
+
+class NotificationPruneTests(WorkloadTestMixin, TestCase):
+    def test_prune_applies_both_policies_in_batches(self):
+        now = timezone.now()
+        ages = {"yeni-okunmus": (2, True), "eski-okunmus": (40, True), "eski-okunmamis": (40, False), "cok-eski": (200, False)}
+        for title, (days, is_read) in ages.items():
+            for i in range(3):
+                note = Notification.objects.create(recipient=self.ali, title=f"{title}-{i}", is_read=is_read)
+                Notification.objects.filter(pk=note.pk).update(created_at=now - timedelta(days=days))
+        for i in range(4):
+            TeamAnnouncement.objects.create(team="team1", author=self.manager, title=f"duyuru-{i}")
+        TeamAnnouncement.objects.exclude(title="duyuru-3").update(created_at=now - timedelta(days=200))
+        reconcile_unread_counts()
+
+        out = StringIO()
+        call_command("prune_notifications", "--dry-run", stdout=out)
+        self.assertIn("Toplam 9 bildirim silinecek", out.getvalue())
+        self.assertEqual(Notification.objects.count(), 12)
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("prune_notifications", "--batch-size", "2", "--pause", "0", stdout=out)
+        self.assertIn("30 günden eski okunmuş: 3 bildirim", out.getvalue())
+        self.assertIn("180 günden eski: 3 bildirim", out.getvalue())
+        deletes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('DELETE FROM "core_notification"')]
+        self.assertTrue(deletes and all(" IN (" in sql for sql in deletes))
+        self.assertIn("180 günden eski takım duyurusu: 3", out.getvalue())
+        announcement_deletes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith('DELETE FROM "core_teamannouncement"')]
+        self.assertEqual(len(announcement_deletes), 2)
+        self.assertEqual(list(TeamAnnouncement.objects.values_list("title", flat=True)), ["duyuru-3"])
+
+        remaining = sorted({t.rsplit("-", 1)[0] for t in Notification.objects.values_list("title", flat=True)})
+        self.assertEqual(remaining, ["eski-okunmamis", "yeni-okunmus"])
+        self.assertEqual(NotificationCounter.objects.get(user=self.ali).unread_count, 3)
+
+
+class NotificationPaginationTests(WorkloadTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        Notification.objects.bulk_create([Notification(recipient=self.ali, title=f"n{i}") for i in range(7)])
+        # Aynı zaman damgasını paylaşan kayıtlar id ile ayrışmalı
+        same = timezone.now() - timedelta(hours=1)
+        Notification.objects.filter(title__in=["n2", "n3", "n4"]).update(created_at=same)
+        self.expected = list(
+            Notification.objects.filter(recipient=self.ali).order_by("-created_at", "-id").values_list("title", flat=True)
+        )
+        self.client.force_login(self.ali)
+
+    def test_latest_api_walks_all_pages_with_cursor(self):
+        url = reverse("notifications_latest_api")
+        titles, cursor, pages = [], "", 0
+        while True:
+            data = self.client.get(url, {"limit": 3, "cursor": cursor}).json()
+            titles += [item["title"] for item in data["items"]]
+            pages += 1
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(titles, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_inbox_ajax_returns_next_page_and_bad_cursor_falls_back(self):
+        page = self.client.get(reverse("notifications_inbox"))
+        self.assertIsNone(page.context["next_cursor"])
+        self.assertEqual([n.title for n in page.context["notifications"]], self.expected)
+
+        cursor = self.client.get(reverse("notifications_latest_api"), {"limit": 2}).json()["next_cursor"]
+        data = self.client.get(reverse("notifications_inbox"), {"cursor": cursor}, HTTP_X_REQUESTED_WITH="XMLHttpRequest").json()
+        self.assertIn(self.expected[2], data["html"])
+        self.assertNotIn(f">{self.expected[1]}<", data["html"])
+        self.assertIsNone(data["next_cursor"])
+
+        bad = self.client.get(reverse("notifications_inbox"), {"cursor": "bozuk!"})
+        self.assertEqual(len(bad.context["notifications"]), 7)
+
+
+class TeamAnnouncementTests(WorkloadTestMixin, TestCase):
+    def announce(self, title):
+        self.client.force_login(self.manager)
+        self.client.post(reverse("team_announcement_create"), {"title": title, "message": "", "level": "info"})
+        return TeamAnnouncement.objects.get(title=title)
+
+    def unread(self, user):
+        self.client.force_login(user)
+        return self.client.get(reverse("notifications_unread_count")).json()["unread"]
+
+    def test_announcement_is_one_row_merged_at_read_time(self):
+        outsider = CustomUser.objects.create_user(username="dis", password="x", role="employee", team="team2")
+        first = self.announce("Bakım çalışması")
+        self.assertEqual(TeamAnnouncement.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual((self.unread(self.ali), self.unread(self.veli)), (1, 1))
+        self.assertEqual((self.unread(self.manager), self.unread(outsider)), (0, 0))
+
+        self.client.force_login(self.ali)
+        with self.assertNumQueries(3):
+            self.client.get(reverse("notifications_unread_count"))
+        items = self.client.get(reverse("notifications_latest_api")).json()["items"]
+        self.assertEqual([(i["kind"], i["is_read"]) for i in items], [("announcement", False)])
+
+        self.client.post(reverse("announcement_mark_read", args=[first.pk]))
+        self.assertEqual((self.unread(self.ali), self.unread(self.veli)), (0, 1))
+
+        self.announce("İkinci duyuru")
+        self.assertEqual(self.unread(self.ali), 1)
+        self.client.force_login(self.ali)
+        self.client.post(reverse("notifications_mark_all_read"))
+        self.assertEqual(self.unread(self.ali), 0)
+
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.post(reverse("announcement_mark_read", args=[first.pk])).status_code, 404)
+        self.client.force_login(self.ali)
+        self.assertEqual(self.client.post(reverse("team_announcement_create"), {"title": "x", "level": "info"}).status_code, 403)
+
+    def test_inbox_pages_merge_both_sources_in_order(self):
+        now = timezone.now()
+        for i in range(4):
+            note = Notification.objects.create(recipient=self.ali, title=f"kişisel-{i}")
+            Notification.objects.filter(pk=note.pk).update(created_at=now - timedelta(minutes=2 * i))
+            ann = TeamAnnouncement.objects.create(team="team1", author=self.manager, title=f"duyuru-{i}")
+            TeamAnnouncement.objects.filter(pk=ann.pk).update(created_at=now - timedelta(minutes=2 * i + 1))
+        # Aynı anda oluşturulmuş iki kayıt: kişisel bildirim önce gelir
+        TeamAnnouncement.objects.filter(title="duyuru-0").update(created_at=now)
+
+        self.client.force_login(self.ali)
+        titles, cursor = [], ""
+        while True:
+            data = self.client.get(reverse("notifications_latest_api"), {"limit": 3, "cursor": cursor}).json()
+            titles += [item["title"] for item in data["items"]]
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(titles, [
+            "kişisel-0", "duyuru-0", "kişisel-1", "duyuru-1", "kişisel-2", "duyuru-2", "kişisel-3", "duyuru-3",
+        ])
+
+
+class NotificationStreamTests(WorkloadTestMixin, TestCase):
+    def test_stream_pushes_initial_state_and_changes(self):
+        async def read_events():
+            stream = notification_event_stream(self.ali, interval=0.01, heartbeat=60, lifetime=5)
+            chunks = [await stream.__anext__(), await stream.__anext__()]
+            await sync_to_async(self._notify)(self.ali, "Yeni")
+            chunks.append(await stream.__anext__())
+            await stream.aclose()
+            return chunks
+
+        retry, first, second = async_to_sync(read_events)()
+        self.assertTrue(retry.startswith("retry:"))
+        events = [json.loads(c.split("data: ", 1)[1]) for c in (first, second)]
+        self.assertTrue(first.startswith("event: notifications"))
+        self.assertEqual([e["unread"] for e in events], [0, 1])
+        self.assertEqual(events[1]["items"][0]["title"], "Yeni")
+
+    def _notify(self, user, title):
+        enqueue_notification(None, title=title, message="m", recipient_ids=[user.pk])
+        process_outbox()
+
+    def test_marker_is_a_single_query_and_changes_with_the_inbox(self):
+        self._notify(self.ali, "Okunmuş")
+        Notification.objects.filter(recipient=self.ali).update(is_read=True)
+        adjust_unread_counts({self.ali.pk: -1})
+        before = notification_marker(self.ali)
+        with self.assertNumQueries(1):
+            self.assertEqual(notification_marker(self.ali), before)
+        # Okunmuş bildirimin silinmesi okunmamış sayıyı değiştirmez ama ölçütü değiştirir
+        self.client.force_login(self.ali)
+        self.client.post(reverse("notifications_delete_read"))
+        after = notification_marker(self.ali)
+        self.assertEqual(after["unread"], before["unread"])
+        self.assertNotEqual(after, before)
+
+    def test_stream_is_disabled_under_wsgi(self):
+        self.client.force_login(self.ali)
+        self.assertEqual(self.client.get(reverse("notifications_stream")).status_code, 204)
+
+
+class SpentHoursTests(WorkloadTestMixin, TestCase):
+    def test_worklog_views_apply_deltas_and_reconcile_repairs_drift(self):
+        task = Task.objects.get(title="orta-3-2")
+        self.client.force_login(self.ali)
+        form = {"worklog_submit": "1", "hours": "2.50", "date": self.today.isoformat(), "description": "analiz"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("task_detail", args=[task.pk]), form)
+        log = WorkLog.objects.get(task=task)
+        self.assertEqual(Task.objects.get(pk=task.pk).spent_hours, Decimal("2.50"))
+
+        # Araya giren eşzamanlı bir giriş düzenlemede ezilmemeli
+        record_worklog(WorkLog(task=task, user=self.ali, hours=Decimal("1.25"), date=self.today, description="ek"))
+        self.client.post(reverse("edit_worklog", args=[log.pk]), {"hours": "4", "date": self.today.isoformat(), "description": "analiz"})
+        self.assertEqual(Task.objects.get(pk=task.pk).spent_hours, Decimal("5.25"))
+        self.client.post(reverse("delete_worklog", args=[log.pk]))
+        self.assertEqual(Task.objects.get(pk=task.pk).spent_hours, Decimal("1.25"))
+
+        # Kurgudaki görevlerin harcanan süreleri efor kaydı olmadan girildi; onarım hepsini toplama çeker
+        out = StringIO()
+        call_command("reconcile_spent_hours", "--check", "--chunk-size", "2", stdout=out)
+        self.assertIn("uyuşmuyor", out.getvalue())
+        drifted = reconcile_spent_hours(chunk_size=2)
+        self.assertNotIn(task.pk, [pk for pk, _, _ in drifted])
+        self.assertEqual(Task.objects.get(pk=drifted[0][0]).spent_hours, Decimal("0"))
+        self.assertEqual(reconcile_spent_hours(chunk_size=2), [])
+
+
+class WorkLogImportTests(WorkloadTestMixin, TestCase):
+    def test_command_imports_valid_rows_in_batches_without_notifications(self):
+        task = Task.objects.get(title="orta-3-2")
+        future = (self.today + timedelta(days=3)).isoformat()
+        lines = ["task,user,hours,date,description"]
+        lines += [f"{task.pk},ali,1.5,{self.today - timedelta(days=i)},geçmiş {i}" for i in range(5)]
+        lines += [f"{task.pk},ali,2,{future},gelecek", f"{task.pk},kimse,2,{self.today},yok", f"999999,ali,2,{self.today},yok"]
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+        self.addCleanup(os.remove, path)
+
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("import_worklogs", path, "--batch-size", "2", stdout=out)
+        self.assertIn("5 efor kaydı içe aktarıldı", out.getvalue())
+        self.assertIn("Satır 7: date: Gelecek bir tarihe", out.getvalue())
+        self.assertIn("3 satır hatalı", out.getvalue())
+        self.assertEqual(WorkLog.objects.filter(task=task).count(), 5)
+        self.assertEqual(Task.objects.get(pk=task.pk).spent_hours, Decimal("7.50"))
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertFalse(EmailOutbox.objects.exists())
+
+        rows = read_worklog_rows(StringIO(f'{{"task": {task.pk}, "user": "veli", "hours": 3, "date": "{self.today}", "description": "j"}}\nbozuk\n'), "jsonl")
+        result = import_worklogs(rows, dry_run=True)
+        self.assertEqual((result["created"], result["failed"]), (1, 1))
+        self.assertEqual(result["errors"], [(2, "Satır çözümlenemedi.")])
+        self.assertEqual(WorkLog.objects.filter(task=task).count(), 5)
+
+    def test_admin_upload(self):
+        task = Task.objects.get(title="orta-3-2")
+        admin_user = CustomUser.objects.create_superuser(username="root", password="x", email="root@ornek.com")
+        self.client.force_login(admin_user)
+        self.assertContains(self.client.get(reverse("admin:core_worklog_changelist")), reverse("admin:core_worklog_import"))
+        upload = SimpleUploadedFile("eski.jsonl", f'{{"task": {task.pk}, "user": "ali", "hours": "4.25", "date": "{self.today}", "description": "x"}}\n'.encode())
+        response = self.client.post(reverse("admin:core_worklog_import"), {"file": upload})
+        self.assertRedirects(response, reverse("admin:core_worklog_changelist"))
+        self.assertEqual(Task.objects.get(pk=task.pk).spent_hours, Decimal("4.25"))
+
+
+class TimesheetTests(WorkloadTestMixin, TestCase):
+    def test_grid_saves_in_one_post_with_one_summary_per_task(self):
+        first, second = Task.objects.get(title="orta-3-2"), Task.objects.get(title="yuksek-5--10")
+        monday = self.today - timedelta(days=self.today.weekday() + 7)
+        cell = lambda task, offset: f"h-{task.pk}-{monday + timedelta(days=offset):%Y%m%d}"
+        self.client.force_login(self.ali)
+        response = self.client.get(reverse("timesheet"), {"week": monday.isoformat()})
+        self.assertContains(response, cell(first, 0))
+        self.assertNotContains(response, f"h-{Task.objects.get(title='yuksek-5--5').pk}-")  # kapalı görev listelenmez
+
+        data = {"week": monday.isoformat(), cell(first, 0): "2", cell(first, 1): "3.5", cell(second, 2): "1.25", f"d-{second.pk}": "test"}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("timesheet"), data)
+        self.assertRedirects(response, f"{reverse('timesheet')}?week={monday.isoformat()}")
+        self.assertEqual(WorkLog.objects.filter(user=self.ali).count(), 3)
+        self.assertEqual(Task.objects.get(pk=first.pk).spent_hours, Decimal("5.50"))
+        self.assertEqual(Task.objects.get(pk=second.pk).spent_hours, Decimal("48.75"))
+        self.assertEqual(WorkLog.objects.get(task=second).description, "test")
+        self.assertEqual(
+            sorted(NotificationOutbox.objects.values_list("task_id", "event")), sorted([(first.pk, "timesheet"), (second.pk, "timesheet")]),
+        )
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+
+        data = {"week": monday.isoformat(), cell(first, 3): "20", cell(second, 3): "5"}
+        response = self.client.post(reverse("timesheet"), data)
+        self.assertContains(response, "24 saati aşamaz")
+        self.assertEqual(WorkLog.objects.filter(user=self.ali).count(), 3)
+
+
+class WorkLogDailyTests(WorkloadTestMixin, TestCase):
+    def _rollup(self, task):
+        return sorted(WorkLogDaily.objects.filter(task=task).values_list("user__username", "day", "hours", "team"))
+
+    def test_write_paths_keep_rollup_in_sync(self):
+        task = Task.objects.get(title="yuksek-5--10")
+        yesterday = self.today - timedelta(days=1)
+        log = record_worklog(WorkLog(task=task, user=self.ali, hours=Decimal("2.00"), date=self.today, description="a"))
+        WorkLog.objects.create(task=task, user=self.ali, hours=Decimal("1.50"), date=self.today, description="b")
+        record_worklogs([WorkLog(task=task, user=self.veli, hours=Decimal("4.00"), date=yesterday, description="c")])
+        self.assertEqual(self._rollup(task), [("ali", self.today, Decimal("3.50"), "team1"), ("veli", yesterday, Decimal("4.00"), "team1")])
+
+        # Tarihi değişen kayıt eski günden düşülüp yeni güne eklenir
+        self.client.force_login(self.ali)
+        self.client.post(reverse("edit_worklog", args=[log.pk]), {"hours": "3", "date": yesterday.isoformat(), "description": "a"})
+        self.assertEqual(self._rollup(task), [
+            ("ali", yesterday, Decimal("3.00"), "team1"), ("ali", self.today, Decimal("1.50"), "team1"), ("veli", yesterday, Decimal("4.00"), "team1"),
+        ])
+        self.client.post(reverse("delete_worklog", args=[log.pk]))
+        self.assertEqual(self._rollup(task), [("ali", self.today, Decimal("1.50"), "team1"), ("veli", yesterday, Decimal("4.00"), "team1")])
+
+        response = self.client.get(reverse("task_detail", args=[task.pk]))
+        self.assertEqual([(r["user_id"], r["hours"]) for r in response.context["contribution_rows"]], [(self.veli.pk, 4.0), (self.ali.pk, 1.5)])
+        monday = self.today - timedelta(days=self.today.weekday())
+        report = team_weekly_hours("team1", yesterday, self.today)
+        self.assertEqual(sum(report[self.ali.pk].values()), 1.5)
+        self.assertIn(monday, report[self.ali.pk])
+
+        # Yöneticinin haftalık rapor indirmesi aynı özetten beslenir
+        self.assertEqual(self.client.get(reverse("team_weekly_report")).status_code, 403)
+        self.client.force_login(self.manager)
+        response = self.client.get(reverse("team_weekly_report"), {"weeks": "2"})
+        rows = list(csv.reader(response.content.decode("utf-8-sig").splitlines()))
+        self.assertEqual(rows[0][-2:], [f"{monday:%d.%m.%Y}", "Toplam"])
+        totals = {row[0]: float(row[-1]) for row in rows[1:]}
+        self.assertEqual(totals["ali"], 1.5)
+        self.assertEqual(totals["veli"], 4.0)
+
+        # Görev silinirken zincirleme silinen kayıtlar özet satırı yeniden açmaz
+        task.delete()
+        self.assertFalse(WorkLogDaily.objects.exists())
+
+    def test_reconcile_rebuilds_drifted_rows(self):
+        task = Task.objects.get(title="orta-3-2")
+        record_worklog(WorkLog(task=task, user=self.ali, hours=Decimal("2.00"), date=self.today, description="a"))
+        WorkLogDaily.objects.filter(task=task).update(hours=Decimal("9.00"))
+        WorkLogDaily.objects.create(user=self.veli, task=task, day=self.today, hours=Decimal("1.00"))
+
+        self.assertEqual(len(reconcile_worklog_daily(chunk_size=3, repair=False)), 2)
+        out = StringIO()
+        call_command("reconcile_spent_hours", stdout=out)
+        self.assertIn("2 günlük efor özeti satırı düzeltildi", out.getvalue())
+        self.assertEqual(self._rollup(task), [("ali", self.today, Decimal("2.00"), "team1")])
+        self.assertEqual(reconcile_worklog_daily(), [])
+
+
+class WorkloadRefreshRollbackTests(TransactionTestCase):
+    def test_rolled_back_changes_are_not_refreshed_later(self):
+        ali = CustomUser.objects.create_user(username="ali", password="x", role="employee", team="team1")
+        veli = CustomUser.objects.create_user(username="veli", password="x", role="employee", team="team1")
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            schedule_workload_refresh([ali.pk])
+            raise RuntimeError
+        with transaction.atomic():
+            schedule_workload_refresh([veli.pk])
+        self.assertEqual(set(WorkloadDay.objects.values_list("user_id", flat=True).distinct()), {veli.pk})
+
+
+class ConcurrentSpentHoursTests(TransactionTestCase):
+    def test_concurrent_worklog_writes_lose_no_updates(self):
+        user = CustomUser.objects.create_user(username="ali", password="x", role="employee", team="team1")
+        today = date.today()
+        task = Task.objects.create(
+            title="eşzamanlı", size=3, start_date=today, due_date=today, planned_hours=Decimal("100"), created_by=user, assigned_to=user,
+        )
+        threads, writes, errors = 4, 10, []
+
+        def worker(n):
+            try:
+                for i in range(writes):
+                    log = WorkLog(task_id=task.pk, user_id=user.pk, hours=Decimal("0.25") * n, date=today, description=f"{n}-{i}")
+                    committed = []
+                    for _ in range(200):
+                        try:
+                            with transaction.atomic():
+                                transaction.on_commit(lambda: committed.append(True))
+                                record_worklog(log)
+                            break
+                        except OperationalError:
+                            # Kayıt işlendiyse hata işlem sonrası iş yükü yenilemesindendir; tekrar yazılmaz
+                            if committed:
+                                break
+                            # SQLite tek yazıcıya izin verir; kilitli işlem tümüyle geri alınıp yeniden denenir
+                            log.pk = None
+                            threading.Event().wait(0.005)
+                    else:
+                        errors.append(n)
+            except Exception as exc:  # noqa: BLE001 - iş parçacığındaki hata ana testte raporlanır
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(1, threads + 1)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(WorkLog.objects.filter(task=task).count(), threads * writes)
+        expected = sum(Decimal("0.25") * n * writes for n in range(1, threads + 1))
+        self.assertEqual(Task.objects.get(pk=task.pk).spent_hours, expected)
+        self.assertEqual(reconcile_spent_hours(repair=False), [])
@@ -26,6 +26,9 @@ urlpatterns = [
     path("notifications/", views.notifications_inbox, name="notifications_inbox"),
     path("notifications/<int:pk>/read/", views.notification_mark_read, name="notification_mark_read"),
     path("notifications/read-all/", views.notifications_mark_all_read, name="notifications_mark_all_read"),
+    # Takım duyuruları (fan-out-on-read)
+    path("announcements/new/", views.team_announcement_create, name="team_announcement_create"),
+    path("announcements/<int:pk>/read/", views.announcement_mark_read, name="announcement_mark_read"),
 
     # Navbar için mini API
     path("notifications/unread-count/", views.notifications_unread_count, name="notifications_unread_count"),
@@ -34,6 +37,8 @@ urlpatterns = [
     
     # ✅ Dropdown preview API
     path("notifications/api/latest/", views.notifications_latest_api, name="notifications_latest_api"),
+    # Canlı bildirim akışı (SSE, ASGI altında)
+    path("notifications/stream/", views.notifications_stream, name="notifications_stream"),
     path("notifications/<int:pk>/delete/", views.notification_delete, name="notification_delete"),
     path("tasks/<int:task_pk>/roadmap/<int:item_pk>/toggle/", views.roadmap_toggle, name="roadmap_toggle"),
     
@@ -46,4 +51,6 @@ urlpatterns = [
 
     path('worklog/<int:pk>/edit/', views.edit_worklog, name='edit_worklog'),
     path('worklog/<int:pk>/delete/', views.delete_worklog, name='delete_worklog'),
+    path('timesheet/', views.timesheet, name='timesheet'),
+    path('reports/weekly-hours/', views.team_weekly_report, name='team_weekly_report'),
 ]
\ No newline at end of file
@@ -1,7 +1,22 @@
-from datetime import date, timedelta
 from collections import defaultdict
-from django.db.models import Q
-from .models import Task
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncWeek
+
+from .models import CustomUser, Task, WorkLogDaily, WorkloadDay
+
+# Özel tarih aralıklarında hesaplama maliyetini sınırlayan üst limit (gün)
+MAX_VIEW_DAYS = 366
+
+# İş yükü simülasyonuna dahil edilen (kapanmamış) görev durumları
+ACTIVE_STATUSES = ['baslanmadi', 'calisiliyor', 'duraklatildi']
+
+# Desteklenen dağılım stratejileri; bilinmeyen değerler 'balanced' kabul edilir
+STRATEGIES = [code for code, _label in WorkloadDay.STRATEGY_CHOICES]
 
 def calculate_workload_distribution(user, strategy='balanced', view_start=None, view_end=None, team_filter=None):
     """
@@ -18,73 +33,524 @@ def calculate_workload_distribution(user, strategy='balanced', view_start=None,
         
     Returns:
         dict: Grafik render süreçleri (Chart.js vb.) için formatlanmış 'labels', 'data' ve 'strategy' sözlüğü.
+        'series' anahtarı, tek taramada hesaplanan dört stratejinin serilerini birlikte taşır.
     """
-    
-    base_query = Q(assigned_to=user) | Q(partners=user)
-    tasks = Task.objects.filter(base_query).distinct()
+
+    tasks = Task.objects.involving(user)
 
     if team_filter:
         tasks = tasks.filter(assigned_to__team=team_filter)
-    
-    tasks = tasks.filter(status__in=['baslanmadi', 'calisiliyor', 'duraklatildi'])
-    
+
     today = date.today()
     view_start = view_start or today
     view_end = view_end or (view_start + timedelta(days=14))
 
-    daily_workload = defaultdict(float)
+    # Güvenlik ve performans için analiz limitlerini sabitleme
+    delta = max(1, min((view_end - view_start).days + 1, MAX_VIEW_DAYS))
+
+    rows = []
+    for task, partner_ids in _load_active_tasks(tasks):
+        share = _remaining_share(task, partner_ids)
+        if share is not None:
+            rows.append((share, task['start_date'], task['due_date'], task['priority'], task['size'], 0))
+
+    calendars = _distribute_strategies(rows, STRATEGIES, today, view_start, delta)
+    series = {name: _round_series(calendar[0]) for name, calendar in calendars.items()}
+
+    return {
+        'labels': _calendar_labels(view_start, delta),
+        'data': series.get(strategy, series['balanced']),
+        'strategy': strategy,
+        'series': series,
+    }
+
+
+def calculate_team_workload(team, strategy='balanced', view_start=None, view_end=None):
+    """
+    Bir takımın tüm üyelerinin iş yükü dağılımını tek geçişte hesaplar.
+
+    Takımın aktif görevleri ve iş ortağı listeleri iki sorguda yüklenir; her görevin
+    kalan eforu sorumlu ve ortaklar arasında bölünerek kullanıcı × gün matrisine
+    işlenir. Tekil (individual) grafik, toplu görünüm ve ileride eklenecek ekip ısı
+    haritası aynı hesaplamadan beslenebilir.
+
+    Args:
+        team (str): Takım kodu (ör. 'team1').
+        strategy (str): Dağılım stratejisi.
+        view_start (date, optional): Analiz başlangıç tarihi. Varsayılan: Bugün.
+        view_end (date, optional): Analiz bitiş tarihi. Varsayılan: Bugünden 14 gün sonrası.
+
+    Returns:
+        dict: 'labels', 'strategy', 'user_ids', `user_ids` sırasıyla satırları oluşan
+        'matrix' (np.ndarray) ve kullanıcı id'sine göre yuvarlanmış 'data' serileri.
+        'matrices' tüm stratejilerin matrislerini taşır (bkz. `team_member_series`).
+    """
+    tasks = Task.objects.filter(assigned_to__team=team)
 
-    for task in tasks:
-        total_remaining = float(task.planned_hours) - float(task.spent_hours)
-        if total_remaining <= 0:
+    today = date.today()
+    view_start = view_start or today
+    view_end = view_end or (view_start + timedelta(days=14))
+    delta = max(1, min((view_end - view_start).days + 1, MAX_VIEW_DAYS))
+
+    user_index = {}
+    rows = []
+    for task, partner_ids in _load_active_tasks(tasks):
+        share = _remaining_share(task, partner_ids)
+        if share is None:
             continue
-            
-        # Görev yükünü, sorumlu ve ortakların sayısına eşit böler (Çift efor sayımını engeller)
-        person_count = 1 + task.partners.count()
-        my_share = total_remaining / person_count
+        for member_id in [task['assigned_to_id'], *partner_ids]:
+            owner = user_index.setdefault(member_id, len(user_index))
+            rows.append((share, task['start_date'], task['due_date'], task['priority'], task['size'], owner))
 
-        effective_start = max(task.start_date, today) 
-        
-        # Gecikmiş görevlerin kalan tüm eforu, simülasyonda bugünün yükü olarak kabul edilir
-        if task.due_date < effective_start:
-            daily_workload[today] += my_share
+    matrices = _distribute_strategies(rows, STRATEGIES, today, view_start, delta, n_owners=len(user_index))
+    matrix = matrices.get(strategy, matrices['balanced'])
+    user_ids = list(user_index)
+
+    return {
+        'labels': _calendar_labels(view_start, delta),
+        'strategy': strategy,
+        'user_ids': user_ids,
+        'matrix': matrix,
+        'matrices': matrices,
+        'data': {uid: _round_series(matrix[idx]) for idx, uid in enumerate(user_ids)},
+    }
+
+
+def team_member_series(team_workload, user_id):
+    """
+    `calculate_team_workload` sonucundan bir üyenin tüm strateji serilerini çıkarır.
+    Takımda aktif görevi olmayan üyeler için sıfır serisi döner.
+    """
+    if user_id not in team_workload['user_ids']:
+        zeros = [0.0] * len(team_workload['labels'])
+        return {name: list(zeros) for name in team_workload['matrices']}
+    idx = team_workload['user_ids'].index(user_id)
+    return {name: _round_series(matrix[idx]) for name, matrix in team_workload['matrices'].items()}
+
+
+def calculate_team_hours(team, user_ids):
+    """
+    Takım üyelerinin planlanan pay ve harcanan efor toplamlarını sabit sayıda sorguda hesaplar.
+
+    Kullanıcı başına görev sorgusu ve görev başına `partners.count()` yerine takımın
+    görevleri, iş ortağı ara tablosu ve (kullanıcı, görev) bazında gruplanmış efor
+    toplamları (`WorkLogDaily` özet tablosundan) birer kez okunur; üye sayısı artsa da
+    sorgu sayısı üçte kalır.
+
+    Args:
+        team (str): Takım kodu (ör. 'team1').
+        user_ids (list[int]): Toplamı istenen kullanıcı id'leri.
+
+    Returns:
+        dict: Kullanıcı id'sine göre `(planlanan, harcanan)` float ikilileri. Görev
+        planı ortaklarla bölünür; harcanan yalnızca kullanıcının üyesi olduğu
+        görevlere kendi girdiği eforlardır.
+    """
+    tasks = Task.objects.filter(assigned_to__team=team)
+    task_rows = list(tasks.values('id', 'assigned_to_id', 'planned_hours'))
+    totals = {uid: [0.0, Decimal('0')] for uid in user_ids}
+    if not task_rows:
+        return {uid: (0.0, 0.0) for uid in user_ids}
+
+    members = defaultdict(set)
+    for task in task_rows:
+        members[task['id']].add(task['assigned_to_id'])
+    partner_counts = defaultdict(int)
+    through = Task.partners.through.objects.filter(task_id__in=tasks.values('id'))
+    for task_id, user_id in through.values_list('task_id', 'customuser_id'):
+        members[task_id].add(user_id)
+        partner_counts[task_id] += 1
+
+    for task in task_rows:
+        if not task['planned_hours']:
             continue
+        share = float(task['planned_hours']) / (1 + partner_counts[task['id']])
+        for member_id in members[task['id']]:
+            if member_id in totals:
+                totals[member_id][0] += share
 
-        days_total = (task.due_date - effective_start).days + 1
-        
-        if days_total <= 0:
-            daily_workload[today] += my_share
+    worklogs = (
+        WorkLogDaily.objects.filter(task__assigned_to__team=team, user_id__in=user_ids)
+        .order_by().values('user_id', 'task_id').annotate(total=Sum('hours'))
+    )
+    for row in worklogs:
+        if row['user_id'] in members.get(row['task_id'], ()):
+            totals[row['user_id']][1] += row['total'] or 0
+
+    return {uid: (planned, float(spent)) for uid, (planned, spent) in totals.items()}
+
+
+def adjust_worklog_daily(deltas):
+    """
+    Günlük efor özet tablosuna (WorkLogDaily) verilen farkları atomik olarak ekler.
+
+    Eksik satırlar yalnızca pozitif farklar için, eforu giren çalışanın güncel takımıyla
+    açılır; farklar `F()` ifadesiyle uygulanır ve sıfıra düşen satırlar silinir. Çağıran
+    efor yazma işlemiyle aynı işlemde (transaction) çalıştırılmalıdır.
+
+    Args:
+        deltas (dict): {(kullanıcı id, görev id, gün): Decimal fark}.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    created = [key for key, delta in deltas.items() if delta > 0]
+    if created:
+        teams = dict(CustomUser.objects.filter(id__in={uid for uid, _, _ in created}).values_list('id', 'team'))
+        WorkLogDaily.objects.bulk_create(
+            [WorkLogDaily(user_id=uid, task_id=task_id, day=day, team=teams.get(uid) or '') for uid, task_id, day in created],
+            ignore_conflicts=True,
+        )
+    for (uid, task_id, day), delta in deltas.items():
+        WorkLogDaily.objects.filter(user_id=uid, task_id=task_id, day=day).update(hours=F('hours') + delta)
+    emptied = Q()
+    for uid, task_id, day in (key for key, delta in deltas.items() if delta < 0):
+        emptied |= Q(user_id=uid, task_id=task_id, day=day)
+    if emptied:
+        WorkLogDaily.objects.filter(emptied, hours__lte=0).delete()
+
+
+def team_weekly_hours(team, view_start, view_end):
+    """
+    Takımın haftalık, kişi bazında efor toplamlarını özet tablodan tek sorguda okur.
+
+    Returns:
+        dict: {kullanıcı id: {hafta başı (pazartesi): float saat}}
+    """
+    rows = (
+        WorkLogDaily.objects.filter(team=team, day__range=(view_start, view_end))
+        .annotate(week=TruncWeek('day')).order_by()
+        .values('user_id', 'week').annotate(total=Sum('hours'))
+    )
+    report = defaultdict(dict)
+    for row in rows:
+        report[row['user_id']][row['week']] = float(row['total'])
+    return dict(report)
+
+
+def refresh_workload_days(user_ids, spans=None):
+    """
+    Verilen kullanıcıların WorkloadDay satırlarını dört stratejinin tamamıyla yeniden hesaplar.
+
+    Bir görev yalnızca kendi (başlangıç, bitiş) aralığındaki günlere yük bindirdiğinden
+    `spans` verilirse yalnızca bu aralıkların kapsadığı günler silinip yeniden yazılır.
+    Bugüne ait eksiksiz satırı olmayan kullanıcılar (gün dönümü, ilk hesap) ve `spans`
+    verilmeyen çağrılar için bugünden itibaren MAX_VIEW_DAYS günün tamamı yenilenir.
+
+    Args:
+        user_ids (iterable): Yenilenecek kullanıcı id'leri.
+        spans (list, optional): Değişen görevlerin (başlangıç, bitiş) tarih ikilileri.
+    """
+    user_ids = set(CustomUser.objects.filter(id__in=[uid for uid in user_ids if uid]).values_list('id', flat=True))
+    if not user_ids:
+        return
+
+    today = date.today()
+    horizon = today + timedelta(days=MAX_VIEW_DAYS - 1)
+    full = user_ids
+    if spans is not None:
+        complete = set(
+            WorkloadDay.objects.filter(user_id__in=user_ids, computed_on=today).order_by()
+            .values('user_id').annotate(n=Count('id')).filter(n=len(STRATEGIES) * MAX_VIEW_DAYS)
+            .values_list('user_id', flat=True)
+        )
+        full = user_ids - complete
+        window = _touched_window(spans, today, horizon)
+        if complete and window:
+            _write_workload_days(complete, today, *window)
+    if full:
+        _write_workload_days(full, today, today, horizon, replace_all=True)
+
+
+def _touched_window(spans, today, horizon):
+    """
+    Görev aralıklarının simülasyonda yük bindirebileceği günleri kapsayan tek pencere.
+    Geçmişte başlayan görevler bugünden, gecikmiş görevler bugüne yazıldığı için sınırlar bugüne çekilir.
+    """
+    if not spans:
+        return None
+    lo = max(today, min(start for start, _ in spans))
+    hi = min(horizon, max(max(due for _, due in spans), today))
+    return (lo, hi) if lo <= hi else None
+
+
+def _write_workload_days(user_ids, today, view_start, view_end, replace_all=False):
+    """
+    Kullanıcıların [view_start, view_end] aralığındaki satırlarını tek işlemde yeniden yazar.
+    Görevleri tek seferde yüklenir; `replace_all` ise aralık dışındaki (eski) satırlar da silinir.
+    """
+    owner_index = {uid: idx for idx, uid in enumerate(sorted(user_ids))}
+    tasks = Task.objects.filter(Q(assigned_to__in=user_ids) | Q(partners__in=user_ids)).distinct()
+
+    rows = []
+    for task, partner_ids in _load_active_tasks(tasks):
+        share = _remaining_share(task, partner_ids)
+        if share is None:
             continue
+        for member_id in [task['assigned_to_id'], *partner_ids]:
+            if member_id in owner_index:
+                rows.append((share, task['start_date'], task['due_date'], task['priority'], task['size'], owner_index[member_id]))
+
+    delta = (view_end - view_start).days + 1
+    days = [view_start + timedelta(days=i) for i in range(delta)]
+    matrices = _distribute_strategies(rows, STRATEGIES, today, view_start, delta, n_owners=len(owner_index))
+    objs = []
+    for strategy, matrix in matrices.items():
+        for uid, idx in owner_index.items():
+            objs.extend(
+                WorkloadDay(user_id=uid, strategy=strategy, day=day, hours=hours, computed_on=today)
+                for day, hours in zip(days, _round_series(matrix[idx]))
+            )
+
+    stale = WorkloadDay.objects.filter(user_id__in=user_ids)
+    if not replace_all:
+        stale = stale.filter(day__range=(view_start, view_end))
+    with transaction.atomic():
+        stale.delete()
+        WorkloadDay.objects.bulk_create(objs, batch_size=2000)
+
+
+def get_workload_days(user, strategy, view_start, view_end):
+    """
+    Önceden hesaplanmış iş yükünü, dört stratejiyle birlikte tek bir indeksli aralık
+    sorgusuyla okur. Aralık tablonun kapsamı dışındaysa veya satırlar bugüne ait
+    değilse None döner.
+    """
+    delta = max(1, min((view_end - view_start).days + 1, MAX_VIEW_DAYS))
+    rows = (
+        WorkloadDay.objects
+        .filter(user=user, computed_on=date.today(),
+                day__range=(view_start, view_start + timedelta(days=delta - 1)))
+        .order_by('strategy', 'day')
+        .values_list('strategy', 'hours')
+    )
+    series = {name: [] for name in STRATEGIES}
+    for name, hours in rows:
+        series[name].append(float(hours))
+    if any(len(values) != delta for values in series.values()):
+        return None
+    return {
+        'labels': _calendar_labels(view_start, delta),
+        'data': series.get(strategy, series['balanced']),
+        'strategy': strategy,
+        'series': series,
+    }
+
+
+def get_workload_chart(user, strategy='balanced', view_start=None, view_end=None):
+    """
+    Dashboard grafiği için iş yükünü önce WorkloadDay tablosundan okur.
+    Tablo eskimişse (gün dönümü) kullanıcı için yenilenir; kapsam dışındaki özel
+    aralıklar anlık `calculate_workload_distribution` hesabına düşer.
+    """
+    today = date.today()
+    view_start = view_start or today
+    view_end = view_end or (view_start + timedelta(days=14))
+
+    chart = get_workload_days(user, strategy, view_start, view_end)
+    if chart is None and today <= view_start and view_end < today + timedelta(days=MAX_VIEW_DAYS):
+        refresh_workload_days([user.id])
+        chart = get_workload_days(user, strategy, view_start, view_end)
+    return chart or calculate_workload_distribution(user, strategy=strategy, view_start=view_start, view_end=view_end)
+
+
+def find_workload_drift(user_ids=None):
+    """
+    WorkloadDay tablosunu anlık `calculate_workload_distribution` sonucuyla karşılaştırır.
+
+    Returns:
+        list: (kullanıcı id, strateji, gün, tablodaki değer, beklenen değer) demetleri.
+    """
+    users = CustomUser.objects.all().order_by('id')
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+
+    today = date.today()
+    view_end = today + timedelta(days=MAX_VIEW_DAYS - 1)
+    drift = []
+    for user in users:
+        stored_rows = WorkloadDay.objects.filter(user=user, computed_on=today).values_list('strategy', 'day', 'hours')
+        stored = {(strategy, day): float(hours) for strategy, day, hours in stored_rows}
+        expected = calculate_workload_distribution(user, view_start=today, view_end=view_end)
+        for strategy, values in expected['series'].items():
+            for i, value in enumerate(values):
+                day = today + timedelta(days=i)
+                if stored.get((strategy, day)) != value:
+                    drift.append((user.id, strategy, day, stored.get((strategy, day)), value))
+    return drift
+
+
+def _load_active_tasks(tasks):
+    """
+    Aktif görevleri ve iş ortağı id'lerini iki sorguda yükler.
+    Görev başına `partners.count()` sorgusu yerine ara tablo tek seferde okunur.
+    """
+    tasks = tasks.filter(status__in=ACTIVE_STATUSES)
+    task_rows = list(tasks.values(
+        'id', 'assigned_to_id', 'planned_hours', 'spent_hours', 'start_date', 'due_date', 'priority', 'size'
+    ))
+    if not task_rows:
+        return []
+
+    partner_map = defaultdict(list)
+    through = Task.partners.through.objects.filter(task_id__in=tasks.values('id'))
+    for task_id, user_id in through.values_list('task_id', 'customuser_id'):
+        partner_map[task_id].append(user_id)
+
+    return [(task, partner_map.get(task['id'], [])) for task in task_rows]
+
+
+def _remaining_share(task, partner_ids):
+    total_remaining = float(task['planned_hours']) - float(task['spent_hours'])
+    if total_remaining <= 0:
+        return None
+    # Görev yükünü, sorumlu ve ortakların sayısına eşit böler (Çift efor sayımını engeller)
+    return total_remaining / (1 + len(partner_ids))
+
 
-        # Stratejiye uygun dağılım matrisinin oluşturulması
-        if strategy == 'priority_weighted':
-            distribution = _algo_priority(my_share, days_total, task.priority)
-        elif strategy == 'size_weighted':
-            distribution = _algo_size(my_share, days_total, task.size)
-        elif strategy == 'deadline_weighted':
-            distribution = _algo_deadline(my_share, days_total)
+def _calendar_labels(view_start, delta):
+    return [(view_start + timedelta(days=i)).strftime("%d %b") for i in range(delta)]
+
+
+def _round_series(series):
+    return [round(float(v), 2) for v in series]
+
+
+def _distribute_strategies(rows, strategies, today, view_start, delta, n_owners=1):
+    """
+    Görev paylarını float64 takvim matrislerine (sahip × gün) vektörel olarak dağıtır.
+
+    Her stratejinin normalizasyon toplamı kapalı formda hesaplanır; böylece görevin
+    tüm süresi yerine yalnızca analiz penceresine düşen günler üretilir ve maliyet
+    görev uzunluğuyla değil, görünüm uzunluğuyla ölçeklenir. Gün ofsetleri, pencere
+    kırpma ve hedef indeksler stratejiden bağımsız olduğu için bir kez hesaplanır ve
+    istenen tüm stratejiler aynı taramada üretilir. Toplama sırası görev sırasını
+    korur; skaler `_algo_*` döngüsüyle birebir aynı sonuç elde edilir.
+
+    Args:
+        rows (list): (pay, başlangıç, bitiş, öncelik, büyüklük, sahip satırı) demetleri.
+        strategies (list): Hesaplanacak dağılım stratejileri.
+        today (date): Simülasyonun referans günü.
+        view_start (date): Takvimin ilk günü.
+        delta (int): Takvimdeki gün sayısı.
+        n_owners (int): Takvim matrisindeki satır (kullanıcı) sayısı.
+
+    Returns:
+        dict: Strateji adına göre (n_owners, delta) boyutunda günlük saat matrisleri.
+    """
+    calendars = {strategy: np.zeros((n_owners, delta), dtype=np.float64) for strategy in strategies}
+    if not rows:
+        return calendars
+
+    shares = np.array([r[0] for r in rows], dtype=np.float64)
+    # Geçmişte başlayan görevler simülasyonda bugünden itibaren ele alınır
+    starts = np.array([(max(r[1], today) - today).days for r in rows], dtype=np.int64)
+    days = np.array([(r[2] - today).days for r in rows], dtype=np.int64) - starts + 1
+
+    # Gecikmiş görevlerin kalan tüm eforu, simülasyonda bugünün yükü olarak kabul edilir
+    overdue = days <= 0
+    starts[overdue] = 0
+    days[overdue] = 1
+
+    # Her görevin süresi analiz penceresine (bugüne göre ofset) kırpılır
+    window_lo = (view_start - today).days
+    window_hi = window_lo + delta - 1
+    first = np.maximum(starts, window_lo)
+    last = np.minimum(starts + days - 1, window_hi)
+    counts = np.maximum(last - first + 1, 0)
+
+    task_idx = np.repeat(np.arange(len(rows)), counts)
+    if task_idx.size == 0:
+        return calendars
+    first_pos = np.cumsum(counts) - counts
+    i = np.arange(task_idx.size, dtype=np.int64) - first_pos[task_idx] + (first - starts)[task_idx]
+    n = days[task_idx]
+
+    owners = np.array([r[5] for r in rows], dtype=np.int64)
+    target = (owners[task_idx], starts[task_idx] + i - window_lo)
+    task_shares = shares[task_idx]
+
+    for strategy, calendar in calendars.items():
+        weights = _strategy_weights(strategy, i, n, rows, task_idx)
+        if weights is None:
+            values = task_shares / n
         else:
-            distribution = [my_share / days_total] * days_total
+            totals = _strategy_totals(strategy, days, rows)
+            values = (weights / totals[task_idx]) * task_shares
+        np.add.at(calendar, target, values)
+    return calendars
 
-        # Hesaplanmış matrisi analiz takvimine (view aralığına) işler
-        for i, hours in enumerate(distribution):
-            current_day = effective_start + timedelta(days=i)
-            
-            if view_start <= current_day <= view_end:
-                daily_workload[current_day] += hours
 
-    # Güvenlik ve performans için analiz limitlerini sabitleme
-    delta = max(1, min((view_end - view_start).days + 1, 366))
-    
-    labels = []
-    data = []
-    
-    for i in range(delta):
-        day = view_start + timedelta(days=i)
-        labels.append(day.strftime("%d %b"))
-        data.append(round(daily_workload.get(day, 0), 2))
-        
-    return {'labels': labels, 'data': data, 'strategy': strategy}
+def _strategy_weights(strategy, i, n, rows, task_idx):
+    """
+    `_algo_*` fonksiyonlarının ağırlık formüllerini düzleştirilmiş gün dizisi üzerinde uygular.
+    `i` görev içindeki gün sırasını, `n` ise görevin toplam gün sayısını tutar.
+    Dengeli (balanced) dağılımda ağırlık gerekmediği için None döner.
+    """
+    if strategy == 'priority_weighted':
+        priority = np.array([r[3] for r in rows], dtype=object)[task_idx]
+        weights = np.ones(i.size, dtype=np.float64)
+        high = priority == 'yuksek'
+        low = priority == 'dusuk'
+        weights[high] = n[high] - i[high]
+        weights[low] = i[low] + 1
+        return weights
+    if strategy == 'size_weighted':
+        large = np.array([r[4] >= 4 for r in rows], dtype=bool)[task_idx]
+        return np.where(large & (i < n / 3.0), 1.5, 1.0)
+    if strategy == 'deadline_weighted':
+        return (i + 1).astype(np.float64) ** 1.5
+    return None
+
+
+def _strategy_totals(strategy, days, rows):
+    """
+    Her görevin ağırlık toplamını, günleri tek tek üretmeden kapalı formda hesaplar.
+
+    - Öncelik: Aritmetik seri n(n+1)/2 (orta öncelikte n).
+    - Büyüklük: İlk ceil(n/3) gün 1.5, kalanı 1.0 ağırlıklı parçalı sabit toplam.
+    - Vade: Önbelleğe alınmış i^1.5 önek (prefix) toplamı.
+    """
+    if strategy == 'priority_weighted':
+        linear = np.array([r[3] in ('yuksek', 'dusuk') for r in rows], dtype=bool)
+        return np.where(linear, days * (days + 1) // 2, days).astype(np.float64)
+    if strategy == 'size_weighted':
+        large = np.array([r[4] >= 4 for r in rows], dtype=bool)
+        heavy_days = (days + 2) // 3
+        return np.where(large, 1.5 * heavy_days + (days - heavy_days), days.astype(np.float64))
+    return _deadline_prefix_sums(days)
+
+
+# Vade stratejisi için sum(i^1.5, i=1..n) önek toplamları; P[0] = 0
+_DEADLINE_PREFIX_LIMIT = 40000
+_deadline_prefix = np.zeros(1, dtype=np.float64)
+
+
+def _deadline_prefix_sums(days):
+    """
+    sum(i^1.5, i=1..n) değerlerini önbellekteki önek dizisinden okur.
+    Önbellek ihtiyaç oldukça büyütülür; sınırı aşan (yüzyılı aşkın) süreler için
+    Euler-Maclaurin açılımı kullanılır, böylece bellek kullanımı sabit kalır.
+    """
+    global _deadline_prefix
+
+    needed = min(int(days.max()), _DEADLINE_PREFIX_LIMIT)
+    if needed >= _deadline_prefix.size:
+        size = min(max(needed + 1, 2 * _deadline_prefix.size), _DEADLINE_PREFIX_LIMIT + 1)
+        terms = np.arange(1, size, dtype=np.float64) ** 1.5
+        _deadline_prefix = np.concatenate(([0.0], np.cumsum(terms)))
+
+    prefix = _deadline_prefix
+    totals = np.empty(days.size, dtype=np.float64)
+    cached = days <= _DEADLINE_PREFIX_LIMIT
+    totals[cached] = prefix[days[cached]]
+
+    n = days[~cached].astype(np.float64)
+    # zeta(-3/2) + 2/5 n^2.5 + 1/2 n^1.5 + 1/8 n^0.5 + 1/1920 n^-1.5
+    totals[~cached] = (
+        -0.025485201889833 + 0.4 * n ** 2.5 + 0.5 * n ** 1.5 + 0.125 * n ** 0.5 + n ** -1.5 / 1920.0
+    )
+    return totals
 
 
 def _algo_priority(hours, days, priority):
@@ -1,76 +1,49 @@
+import csv
+import hashlib
 from collections import defaultdict
 from datetime import date, timedelta, datetime
 from decimal import Decimal, InvalidOperation
 
-from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
-from django.db.models import Sum, Q, Value, DecimalField, Count, OuterRef, Subquery
+from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.db.models import Sum, Q, Value, DecimalField, Count
 from django.db.models.functions import Coalesce
-from django.http import JsonResponse, HttpResponseForbidden
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.views.decorators.http import require_GET, require_POST
 
-from .models import Task, RoadmapItem, CustomUser, WorkLog, Notification
-from .forms import TaskForm, WorkLogForm, RoadmapEditForm
-from .utils import calculate_workload_distribution
+from .models import Task, RoadmapItem, CustomUser, WorkLog, WorkLogDaily, Notification
+from .dashboard import EmployeeDashboardSnapshot, TeamDashboardSnapshot, cached_dashboard, team_data_version
+from .forms import TaskForm, WorkLogForm, RoadmapEditForm, TeamAnnouncementForm, TimesheetForm
+from .notifications import (
+    INBOX_PAGE_SIZE, RecipientResolver, adjust_unread_counts, delete_notifications, enqueue_email, enqueue_notification, mark_announcements_read,
+    notification_event_stream, notification_marker, notification_page, serialize_notifications, team_announcements_for,
+    unread_notification_count,
+)
+from .permissions import TaskAccess
+from .utils import (
+    ACTIVE_STATUSES, calculate_team_hours, calculate_team_workload, get_workload_chart, team_member_series, team_weekly_hours, MAX_VIEW_DAYS,
+)
+from .worklogs import change_worklog, record_worklog, record_worklogs, remove_worklog
 
 
 # =========================================================
 # YETKİLENDİRME (RBAC) YARDIMCI FONKSİYONLARI
 # =========================================================
-def _user_can_view_task(user, task):
-    if getattr(user, "is_superuser", False):
-        return True
-    if getattr(user, "role", None) == "manager":
-        return bool(user.team) and task.assigned_to.team == user.team
-    if task.assigned_to_id == user.id:
-        return True
-    if task.partners.filter(id=user.id).exists():
-        return True
-    if user.team and task.assigned_to.team == user.team:
-        return True
-    return False
-
-def _user_can_edit_task(user, task):
-    if getattr(user, "is_superuser", False):
-        return True
-    if getattr(user, "role", None) == "manager":
-        return bool(user.team) and task.assigned_to.team == user.team
-    if task.created_by_id == user.id:
-        return True
-    return task.assigned_to_id == user.id or task.partners.filter(id=user.id).exists()
-
-def _user_can_delete_task(user, task):
-    if getattr(user, "is_superuser", False):
-        return True
-    if getattr(user, "role", None) == "manager":
-        return bool(user.team) and task.assigned_to.team == user.team
-    return task.created_by_id == user.id
-
-def _user_can_toggle_roadmap(user, task):
-    if getattr(user, "is_superuser", False):
-        return True
-    if getattr(user, "role", None) == "manager":
-        return bool(user.team) and task.assigned_to.team == user.team
-    if task.created_by_id == user.id or task.assigned_to_id == user.id:
-        return True
-    if task.partners.filter(id=user.id).exists():
-        return True
-    return False
-
-def _user_can_edit_roadmap(user, task):
-    if getattr(user, "is_superuser", False):
-        return True
-    if getattr(user, "role", None) == "manager":
-        return bool(user.team) and task.assigned_to.team == user.team
-    if task.created_by_id == user.id or task.partners.filter(id=user.id).exists():
-        return True
-    return False
+def _get_task_with_access(request, pk):
+    """
+    Görevi, kullanıcının yetkilerini çözmek için gereken alanlarla tek sorguda yükler.
+    """
+    task = get_object_or_404(TaskAccess.annotate(Task.objects.all(), request.user), pk=pk)
+    return task, TaskAccess.for_task(request.user, task)
 
 
 # =========================================================
@@ -79,153 +52,112 @@ def _user_can_edit_roadmap(user, task):
 def _is_ajax(request):
     return request.headers.get("x-requested-with") == "XMLHttpRequest"
 
-def _notify(recipients, *, title, message, url="", actor=None, level="info", task=None):
-    if not recipients:
-        return
-    uniq_ids = set()
-    objs = []
-    for u in recipients:
-        if not u or (actor and u.id == actor.id) or u.id in uniq_ids:
-            continue
-        uniq_ids.add(u.id)
-        objs.append(Notification(
-            recipient=u, actor=actor, task=task,
-            title=title[:160], message=message, url=url, level=level
-        ))
-    if objs:
-        Notification.objects.bulk_create(objs)
-
-def _task_related_users(task):
-    users = []
-    if getattr(task, "created_by", None):
-        users.append(task.created_by)
-    if getattr(task, "assigned_to", None):
-        users.append(task.assigned_to)
-    users.extend(list(task.partners.all()))
-    users.extend(list(task.informees.all()))
-    
-    if getattr(task, "assigned_to", None) and getattr(task.assigned_to, "team", None):
-        managers = CustomUser.objects.filter(role="manager", team=task.assigned_to.team)
-        users.extend(list(managers))
-        
-    uniq = {u.id: u for u in users if u and u.id}
-    return list(uniq.values())
+def _conditional_json(request, validator, build):
+    """
+    Ucuz bir doğrulayıcıdan (validator) ETag üretir; istemcinin If-None-Match başlığı
+    eşleşirse gövde hiç üretilmeden 304 döner, aksi halde `build()` sonucunu JSON olarak yollar.
+    """
+    etag = quote_etag(hashlib.md5(repr(validator).encode("utf-8")).hexdigest())
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(build())
+    response["ETag"] = etag
+    # Tarayıcı yanıtı saklar ama her istekte sunucuya doğrulatır
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 def _send_task_event_mail(request, task, *, subject, actor, body_lines):
-    users = _task_related_users(task)
-    actor_id = actor.id if actor else None
-    recipient_list = sorted({u.email for u in users if u.email and u.id != actor_id})
-
-    if not recipient_list:
-        return
-
+    # E-posta kuyruğa yazılır; alıcılar ve özet birleştirme `run_outbox` çalışanında yapılır
     actor_name = (actor.get_full_name() or actor.username) if actor else "Sistem"
-    task_url = request.build_absolute_uri(reverse("task_detail", args=[task.pk]))
-
     msg = "\n".join([
-        "Merhaba,", "",
         f"Görev: {task.title}",
         f"İşlemi yapan: {actor_name}",
-        *body_lines, "",
-        f"Görev linki: {task_url}",
+        *body_lines,
     ])
-
-    send_mail(
-        subject=subject, message=msg,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=recipient_list, fail_silently=True,
+    enqueue_email(
+        task, subject=subject, body=msg, actor=actor,
+        url=request.build_absolute_uri(reverse("task_detail", args=[task.pk])),
     )
 
 
 # =========================================================
 # ANA YÖNLENDİRİCİLER VE DASHBOARD'LAR
 # =========================================================
-@login_required
-def home(request):
-    if request.user.role == "manager":
-        return redirect("manager_dashboard")
-    return redirect("employee_dashboard")
-
-@login_required
-def employee_dashboard(request):
-    today = timezone.now().date()
-    strategy = request.GET.get("strategy", "balanced")
-    date_range = request.GET.get("range", "month")
-    start_str = request.GET.get("start")
-    end_str = request.GET.get("end")
-
+def _resolve_view_range(request, today, date_range):
+    """
+    Dashboard grafiklerinin analiz aralığını GET parametrelerinden çözer.
+    Özel aralıklar sıralanır ve MAX_VIEW_DAYS ile sınırlandırılır; böylece istemci
+    tarafından gönderilen çok uzun aralıklar hesaplama maliyetini büyütemez. Üst sınır
+    `date.max` aşılmayacak şekilde hesaplanır (ör. `start=9999-06-01`).
+    """
     view_start = today
     view_end = today + timedelta(days=29)
 
+    start_str = request.GET.get("start")
+    end_str = request.GET.get("end")
     if date_range == "custom" and start_str and end_str:
         try:
             view_start = datetime.strptime(start_str, "%Y-%m-%d").date()
             view_end = datetime.strptime(end_str, "%Y-%m-%d").date()
         except ValueError:
             pass
+        if view_end < view_start:
+            view_start, view_end = view_end, view_start
+        view_end = min(view_end, view_start + timedelta(days=min(MAX_VIEW_DAYS - 1, (date.max - view_start).days)))
     elif date_range == "week":
         view_end = view_start + timedelta(days=6)
     elif date_range == "year":
         view_end = view_start + timedelta(days=364)
+    return view_start, view_end
 
-    if request.GET.get("ajax") == "true":
-        chart_data = calculate_workload_distribution(request.user, strategy=strategy, view_start=view_start, view_end=view_end)
-        return JsonResponse({"labels": chart_data["labels"], "data": chart_data["data"], "strategy": strategy})
-
-    # Alt sorgu: Kullanıcının ilgili göreve harcadığı kişisel efor toplamını getirir (şişmeyi önler)
-    user_contrib_sq = (
-        WorkLog.objects
-        .filter(task=OuterRef("pk"), user=request.user)
-        .values("task")
-        .annotate(total=Sum("hours"))
-        .values("total")[:1]
-    )
+@login_required
+def home(request):
+    if request.user.role == "manager":
+        return redirect("manager_dashboard")
+    return redirect("employee_dashboard")
 
-    tasks = (
-        Task.objects.filter(Q(assigned_to=request.user) | Q(partners=request.user))
-        .distinct()
-        .annotate(
-            user_contribution=Coalesce(
-                Subquery(user_contrib_sq, output_field=DecimalField(max_digits=6, decimal_places=2)),
-                Value(0, output_field=DecimalField(max_digits=6, decimal_places=2)),
-            ),
-            total_steps=Count("roadmap", distinct=True),
-            completed_steps=Count("roadmap", filter=Q(roadmap__is_completed=True), distinct=True),
-        ).order_by("due_date")
-    )
+@login_required
+def employee_dashboard(request):
+    today = timezone.now().date()
+    strategy = request.GET.get("strategy", "balanced")
+    date_range = request.GET.get("range", "month")
+    view_start, view_end = _resolve_view_range(request, today, date_range)
 
-    alerts = []
-    total_remaining_hours = 0.0
-    total_completed_steps_agg = 0
+    cache_params = (today, strategy, date_range, view_start, view_end)
 
-    for task in tasks:
-        total_completed_steps_agg += int(task.completed_steps or 0)
-        if task.status not in ["tamamlandi", "iptal"]:
-            spent = float(task.spent_hours or 0)
-            planned = float(task.planned_hours or 0)
-            total_remaining_hours += max(0.0, planned - spent)
+    if request.GET.get("ajax") == "true":
+        def build_payload():
+            chart_data = get_workload_chart(request.user, strategy=strategy, view_start=view_start, view_end=view_end)
+            return {"labels": chart_data["labels"], "data": chart_data["data"], "strategy": strategy, "series": chart_data["series"]}
 
-        if task.status in ["tamamlandi", "iptal"]:
-            continue
-        if task.due_date < today:
-            alerts.append({"task": task, "type": "danger", "msg": "GECİKMİŞ GÖREV!"})
-            continue
-        if task.status == "baslanmadi" and (task.due_date - today).days <= 2:
-            alerts.append({"task": task, "type": "warning", "msg": "VADE YAKLAŞIYOR! (Henüz başlanmadı)"})
+        validator = ("employee", request.user.pk, team_data_version(request.user.team), cache_params)
+        return _conditional_json(request, validator, lambda: cached_dashboard(request.user, "employee-ajax", cache_params, build_payload))
 
-    urgent_task = alerts[0]["task"] if alerts else tasks.exclude(status__in=["tamamlandi", "iptal"]).first()
+    context = cached_dashboard(
+        request.user, "employee", cache_params,
+        lambda: _employee_dashboard_context(request.user, today, strategy, date_range, view_start, view_end),
+    )
 
-    today_tasks = tasks.filter(start_date__lte=today, due_date__gte=today).exclude(status__in=["tamamlandi", "iptal"])
     modal_key = f"today_modal_shown_{request.user.id}_{today.isoformat()}"
     show_today_modal = False
-    if today_tasks.exists() and not request.session.get(modal_key, False):
+    if context["today_tasks"] and not request.session.get(modal_key, False):
         show_today_modal = True
         request.session[modal_key] = True
 
+    context = {**context, "show_today_modal": show_today_modal}
+    return render(request, "dashboard_employee.html", context)
+
+
+def _employee_dashboard_context(user, today, strategy, date_range, view_start, view_end):
+    """
+    Çalışan panosunun önbelleğe alınabilen bağlamını kurar (oturuma bağlı alanlar hariç).
+    """
+    snapshot = EmployeeDashboardSnapshot.for_user(user, today)
+
     team_task_groups = []
-    if request.user.team:
-        team_members = CustomUser.objects.filter(team=request.user.team, role="employee").order_by("first_name", "last_name")
-        team_tasks_qs = Task.objects.filter(assigned_to__team=request.user.team).exclude(status__in=["tamamlandi", "iptal"]).select_related("assigned_to").order_by("assigned_to__first_name", "due_date")
+    if user.team:
+        team_members = CustomUser.objects.filter(team=user.team, role="employee").order_by("first_name", "last_name")
+        team_tasks_qs = Task.objects.filter(assigned_to__team=user.team).exclude(status__in=["tamamlandi", "iptal"]).select_related("assigned_to").order_by("assigned_to__first_name", "due_date")
         
         grouped = defaultdict(list)
         for t in team_tasks_qs:
@@ -242,18 +174,18 @@ def employee_dashboard(request):
                 "due_soon": sum(1 for x in m_tasks if 0 <= (x.due_date - today).days <= 2),
             })
 
-    chart_data = calculate_workload_distribution(request.user, strategy=strategy, view_start=view_start, view_end=view_end)
+    chart_data = get_workload_chart(user, strategy=strategy, view_start=view_start, view_end=view_end)
 
-    context = {
-        "tasks": tasks, "today_tasks": today_tasks, "alerts": alerts, "page_title": "Görevlerim ve Ekip Takibi",
-        "chart_labels": chart_data["labels"], "chart_data": chart_data["data"],
+    return {
+        "tasks": snapshot.tasks, "task_count": snapshot.count, "today_tasks": snapshot.today_tasks,
+        "focus_tasks": snapshot.focus_tasks, "alerts": snapshot.alerts, "page_title": "Görevlerim ve Ekip Takibi",
+        "chart_labels": chart_data["labels"], "chart_data": chart_data["data"], "chart_series": chart_data["series"],
         "current_strategy": strategy, "current_range": date_range,
         "start_date_val": view_start.strftime("%Y-%m-%d"), "end_date_val": view_end.strftime("%Y-%m-%d"),
-        "today": today, "show_today_modal": show_today_modal, "team_task_groups": team_task_groups,
-        "total_remaining_hours": round(total_remaining_hours, 1), "total_completed_steps_agg": total_completed_steps_agg,
-        "urgent_task": urgent_task,
+        "today": today, "team_task_groups": team_task_groups,
+        "total_remaining_hours": round(snapshot.total_remaining_hours, 1), "total_completed_steps_agg": snapshot.total_completed_steps,
+        "urgent_task": snapshot.urgent_task,
     }
-    return render(request, "dashboard_employee.html", context)
 
 @login_required
 def manager_dashboard(request):
@@ -275,121 +207,55 @@ def manager_dashboard(request):
     selected_user_id = request.GET.get("user_id", "all")
     strategy = request.GET.get("strategy", "balanced")
     date_range = request.GET.get("range", "month")
-    start_str = request.GET.get("start")
-    end_str = request.GET.get("end")
+    view_start, view_end = _resolve_view_range(request, today, date_range)
 
-    view_start = today
-    view_end = today + timedelta(days=29)
+    target_user = None
+    if selected_user_id and selected_user_id != "all":
+        target_user = get_object_or_404(CustomUser, id=selected_user_id, team=team)
 
-    if date_range == "custom" and start_str and end_str:
-        try:
-            view_start = datetime.strptime(start_str, "%Y-%m-%d").date()
-            view_end = datetime.strptime(end_str, "%Y-%m-%d").date()
-        except ValueError:
-            pass
-    elif date_range == "week":
-        view_end = view_start + timedelta(days=6)
-    elif date_range == "year":
-        view_end = view_start + timedelta(days=364)
+    cache_params = (today, selected_user_id, strategy, date_range, view_start, view_end)
 
-    employees = CustomUser.objects.filter(team=team).exclude(Q(role="manager") | Q(is_superuser=True)).order_by("first_name", "last_name")
+    if request.GET.get("ajax") == "true":
+        def build_payload():
+            data = _manager_dashboard_context(team, today, target_user, strategy, date_range, view_start, view_end)
+            return _manager_ajax_payload(request, data, target_user, strategy)
 
-    team_tasks_qs = Task.objects.filter(assigned_to__team=team).exclude(status__in=["tamamlandi", "iptal"]).select_related("assigned_to").prefetch_related("partners").order_by("due_date")
-    
-    assigned_map = defaultdict(list)
-    partner_map = defaultdict(list)
-    for t in team_tasks_qs:
-        assigned_map[t.assigned_to_id].append(t)
-        for p in t.partners.all():
-            if getattr(p, "team", None) == team and getattr(p, "role", None) != "manager" and p.id != t.assigned_to_id:
-                partner_map[p.id].append(t)
+        validator = ("manager", request.user.pk, team_data_version(team), cache_params)
+        return _conditional_json(request, validator, lambda: cached_dashboard(request.user, "manager-ajax", cache_params, build_payload))
 
-    team_task_groups = []
-    for member in employees:
-        combined = assigned_map.get(member.id, []) + partner_map.get(member.id, [])
-        uniq = {x.id: x for x in combined}
-        m_tasks = sorted(uniq.values(), key=lambda x: x.due_date)
-        team_task_groups.append({
-            "member": member, "tasks": m_tasks, "count": len(m_tasks),
-            "next_due": m_tasks[0].due_date if m_tasks else None,
-            "overdue": sum(1 for x in m_tasks if x.due_date < today),
-            "due_soon": sum(1 for x in m_tasks if 0 <= (x.due_date - today).days <= 2),
-        })
+    context = cached_dashboard(
+        request.user, "manager", cache_params,
+        lambda: _manager_dashboard_context(team, today, target_user, strategy, date_range, view_start, view_end),
+    )
 
-    today_tasks = Task.objects.filter(assigned_to__team=team, start_date__lte=today, due_date__gte=today).exclude(status__in=["tamamlandi", "iptal"]).select_related("assigned_to").order_by("due_date")
     modal_key = f"today_team_modal_shown_{request.user.id}_{today.isoformat()}"
     show_today_modal = False
-    if today_tasks.exists() and not request.session.get(modal_key, False):
+    if context["today_tasks"] and not request.session.get(modal_key, False):
         show_today_modal = True
         request.session[modal_key] = True
 
-    delayed_tasks = Task.objects.filter(assigned_to__team=team).filter(
-        (Q(due_date__lt=today) & ~Q(status__in=["tamamlandi", "iptal"])) |
-        (Q(status="baslanmadi") & Q(due_date__range=[today, today + timedelta(days=3)]))
-    ).select_related("assigned_to").distinct().order_by("due_date")
-
-    def attach_progress(task_list):
-        for t in task_list:
-            planned = float(t.planned_hours or 0)
-            spent = float(t.spent_hours or 0)
-            raw = int(round((spent / planned) * 100)) if planned > 0 else 0
-            t.progress_pct_raw = raw
-            t.progress_pct_bar = max(0, min(raw, 100))
-
-    target_user = None
-    tasks_qs = Task.objects.none()
-
-    if selected_user_id and selected_user_id != "all":
-        target_user = get_object_or_404(CustomUser, id=selected_user_id, team=team)
-        tasks_qs = (
-            Task.objects.filter(assigned_to__team=team)
-            .filter(Q(assigned_to=target_user) | Q(partners=target_user))
-            .distinct().select_related("assigned_to")
-            .annotate(
-                total_steps=Count("roadmap", distinct=True),
-                completed_steps=Count("roadmap", filter=Q(roadmap__is_completed=True), distinct=True),
-            ).order_by("due_date")
-        )
-    else:
-        tasks_qs = (
-            Task.objects.filter(assigned_to__team=team)
-            .select_related("assigned_to")
-            .annotate(
-                total_steps=Count("roadmap", distinct=True),
-                completed_steps=Count("roadmap", filter=Q(roadmap__is_completed=True), distinct=True),
-            ).order_by("due_date")
-        )
-
-    tasks_list = list(tasks_qs)
-    attach_progress(tasks_list)
-    
-    tasks_active = [t for t in tasks_list if t.status not in ["tamamlandi", "iptal"]]
-    active_tasks_count = len(tasks_active)
-    total_remaining_hours = sum(max(0.0, float(t.planned_hours or 0) - float(t.spent_hours or 0)) for t in tasks_active)
-    total_completed_steps_agg = sum(int(getattr(t, "completed_steps", 0) or 0) for t in tasks_list)
-
-    selection_delayed = sorted([t for t in tasks_active if t.due_date and ((t.due_date < today) or (t.status == "baslanmadi" and 0 <= (t.due_date - today).days <= 3))], key=lambda x: x.due_date)
-    urgent_task = selection_delayed[0] if selection_delayed else (sorted(tasks_active, key=lambda x: x.due_date or today)[0] if tasks_active else None)
+    context = {**context, "show_today_modal": show_today_modal}
+    return render(request, "dashboard_manager.html", context)
 
-    def _is_focus_task(t):
-        if t.status in ["tamamlandi", "iptal"]: return False
-        if t.status == "calisiliyor" or t.priority == "yuksek": return True
-        if t.due_date and (t.due_date < today or 0 <= (t.due_date - today).days <= 2): return True
-        return False
 
-    focus_tasks_list = [t for t in tasks_list if _is_focus_task(t)]
+def _manager_dashboard_context(team, today, target_user, strategy, date_range, view_start, view_end):
+    """
+    Yönetici panosunun önbelleğe alınabilen bağlamını kurar (oturuma bağlı alanlar hariç).
+    """
+    employees = list(CustomUser.objects.filter(team=team).exclude(Q(role="manager") | Q(is_superuser=True)).order_by("first_name", "last_name"))
+    snapshot = TeamDashboardSnapshot.for_team(Task.objects.filter(assigned_to__team=team), employees, today, target_user=target_user)
 
     if target_user:
-        workload = calculate_workload_distribution(target_user, strategy=strategy, view_start=view_start, view_end=view_end, team_filter=team)
-        chart_context = {"type": "individual", "labels": workload["labels"], "data": workload["data"], "user": target_user}
-        selected_user_id_for_template = int(selected_user_id)
+        team_workload = calculate_team_workload(team, strategy=strategy, view_start=view_start, view_end=view_end)
+        user_series = team_member_series(team_workload, target_user.id)
+        user_data = user_series.get(strategy, user_series["balanced"])
+        chart_context = {"type": "individual", "labels": team_workload["labels"], "data": user_data, "series": user_series, "user": target_user}
+        selected_user_id_for_template = target_user.id
     else:
         employee_names, planned_data, spent_data = [], [], []
+        team_hours = calculate_team_hours(team, [u.id for u in employees])
         for u in employees:
-            user_tasks = Task.objects.filter(Q(assigned_to=u) | Q(partners=u), assigned_to__team=team).distinct()
-            u_total_planned = sum((float(t.planned_hours) / (1 + t.partners.count())) for t in user_tasks if t.planned_hours)
-            
-            u_total_spent = float(WorkLog.objects.filter(task__in=user_tasks, user=u).aggregate(total=Coalesce(Sum("hours"), Value(0, output_field=DecimalField())))["total"] or 0)
+            u_total_planned, u_total_spent = team_hours[u.id]
 
             if u_total_planned > 0 or u_total_spent > 0:
                 employee_names.append(u.get_full_name() or u.username)
@@ -399,39 +265,45 @@ def manager_dashboard(request):
         chart_context = {"type": "aggregate", "labels": employee_names, "planned": planned_data, "spent": spent_data}
         selected_user_id_for_template = None
 
-    if request.GET.get("ajax") == "true":
-        table_rows_all_html = render_to_string("partials/manager_tasks_rows.html", {"tasks": tasks_list, "today": today}, request=request)
-        table_rows_focus_html = render_to_string("partials/manager_tasks_rows.html", {"tasks": focus_tasks_list, "today": today}, request=request)
-        
-        kpi_payload = {
-            "active_count": active_tasks_count,
-            "remaining_hours": round(total_remaining_hours, 1),
-            "completed_steps": total_completed_steps_agg,
-            "urgent_due": urgent_task.due_date.strftime("%d %b") if urgent_task and urgent_task.due_date else "",
-            "urgent_title": urgent_task.title if urgent_task else "",
-        }
-
-        if target_user:
-            return JsonResponse({
-                "mode": "individual", "user_id": str(selected_user_id), "user_name": target_user.get_full_name() or target_user.username,
-                "strategy": strategy, "labels": chart_context["labels"], "data": chart_context["data"],
-                "table_rows_all_html": table_rows_all_html, "table_rows_focus_html": table_rows_focus_html, "kpi": kpi_payload,
-            })
-        return JsonResponse({
-            "mode": "aggregate", "user_id": "all", "labels": chart_context["labels"], "planned": chart_context.get("planned", []), "spent": chart_context.get("spent", []),
-            "table_rows_all_html": table_rows_all_html, "table_rows_focus_html": table_rows_focus_html, "kpi": kpi_payload,
-        })
-
-    context = {
-        "page_title": "Ekip Yönetim Paneli", "today": today, "team_task_groups": team_task_groups,
-        "today_tasks": today_tasks, "show_today_modal": show_today_modal, "delayed_tasks": delayed_tasks,
+    return {
+        "page_title": "Ekip Yönetim Paneli", "today": today, "team_task_groups": snapshot.member_groups,
+        "today_tasks": snapshot.today_tasks, "delayed_tasks": snapshot.delayed_tasks,
         "employees": employees, "selected_user_id": selected_user_id_for_template,
         "current_strategy": strategy, "current_range": date_range, "start_date_val": view_start.strftime("%Y-%m-%d"),
         "end_date_val": view_end.strftime("%Y-%m-%d"), "chart_context": chart_context,
-        "tasks": tasks_list, "active_tasks_count": active_tasks_count, "total_remaining_hours": round(total_remaining_hours, 1),
-        "total_completed_steps_agg": total_completed_steps_agg, "urgent_task": urgent_task, "focus_tasks": focus_tasks_list,
+        "tasks": snapshot.tasks, "active_tasks_count": len(snapshot.active_tasks), "total_remaining_hours": round(snapshot.total_remaining_hours, 1),
+        "total_completed_steps_agg": snapshot.total_completed_steps, "urgent_task": snapshot.urgent_task, "focus_tasks": snapshot.focus_tasks,
+    }
+
+
+def _manager_ajax_payload(request, data, target_user, strategy):
+    """
+    Yönetici panosunun AJAX yanıtını (grafik, tablo satırları ve KPI'lar) bağlamdan üretir.
+    """
+    today = data["today"]
+    chart_context = data["chart_context"]
+    urgent_task = data["urgent_task"]
+    table_rows_all_html = render_to_string("partials/manager_tasks_rows.html", {"tasks": data["tasks"], "today": today}, request=request)
+    table_rows_focus_html = render_to_string("partials/manager_tasks_rows.html", {"tasks": data["focus_tasks"], "today": today}, request=request)
+
+    kpi_payload = {
+        "active_count": data["active_tasks_count"],
+        "remaining_hours": data["total_remaining_hours"],
+        "completed_steps": data["total_completed_steps_agg"],
+        "urgent_due": urgent_task.due_date.strftime("%d %b") if urgent_task and urgent_task.due_date else "",
+        "urgent_title": urgent_task.title if urgent_task else "",
+    }
+
+    if target_user:
+        return {
+            "mode": "individual", "user_id": str(target_user.id), "user_name": target_user.get_full_name() or target_user.username,
+            "strategy": strategy, "labels": chart_context["labels"], "data": chart_context["data"], "series": chart_context["series"],
+            "table_rows_all_html": table_rows_all_html, "table_rows_focus_html": table_rows_focus_html, "kpi": kpi_payload,
+        }
+    return {
+        "mode": "aggregate", "user_id": "all", "labels": chart_context["labels"], "planned": chart_context.get("planned", []), "spent": chart_context.get("spent", []),
+        "table_rows_all_html": table_rows_all_html, "table_rows_focus_html": table_rows_focus_html, "kpi": kpi_payload,
     }
-    return render(request, "dashboard_manager.html", context)
 
 
 # =========================================================
@@ -446,35 +318,37 @@ def roadmap_toggle_complete(request, item_id):
 @login_required
 @require_POST
 def roadmap_toggle(request, task_pk, item_pk):
-    task = get_object_or_404(Task, pk=task_pk)
-    if not _user_can_view_task(request.user, task): return HttpResponseForbidden("Bu görevi görme yetkiniz yok.")
-    if not _user_can_toggle_roadmap(request.user, task): return HttpResponseForbidden("Roadmap güncelleme yetkiniz yok.")
+    task, access = _get_task_with_access(request, task_pk)
+    if not access.can_view: return HttpResponseForbidden("Bu görevi görme yetkiniz yok.")
+    if not access.can_toggle_roadmap: return HttpResponseForbidden("Roadmap güncelleme yetkiniz yok.")
 
-    item = get_object_or_404(RoadmapItem, pk=item_pk, task_id=task_pk)
-    item.is_completed = not item.is_completed
-    item.save(update_fields=["is_completed"])
-    
-    actor_name = request.user.get_full_name() or request.user.username
-    status_text = "tamamladı ✅" if item.is_completed else "geri aldı ⏳"
-    
-    _send_task_event_mail(
-        request, task, subject=f"{actor_name} Adım {item.order}'ü {status_text}: {task.title}",
-        actor=request.user, body_lines=[f"Adım: {item.order} - {item.description}"]
-    )
+    # Adım güncellemesi ve kuyruğa yazılan olaylar birlikte kalıcı olur ya da birlikte geri alınır
+    with transaction.atomic():
+        item = get_object_or_404(RoadmapItem, pk=item_pk, task_id=task_pk)
+        item.is_completed = not item.is_completed
+        item.save(update_fields=["is_completed"])
 
-    _notify(
-        _task_related_users(task), title="Yol haritası güncellendi",
-        message=f"{actor_name}, '{task.title}' görevinde Adım {item.order}'ü {status_text}: {item.description}",
-        url=reverse("task_detail", args=[task.pk]), actor=request.user, level="info", task=task,
-    )
+        actor_name = request.user.get_full_name() or request.user.username
+        status_text = "tamamladı ✅" if item.is_completed else "geri aldı ⏳"
+
+        _send_task_event_mail(
+            request, task, subject=f"{actor_name} Adım {item.order}'ü {status_text}: {task.title}",
+            actor=request.user, body_lines=[f"Adım: {item.order} - {item.description}"]
+        )
+
+        enqueue_notification(
+            task, title="Yol haritası güncellendi",
+            message=f"{actor_name}, '{task.title}' görevinde Adım {item.order}'ü {status_text}: {item.description}",
+            url=reverse("task_detail", args=[task.pk]), actor=request.user, level="info", event="roadmap_toggle",
+        )
     return redirect("task_detail", pk=task.pk)
 
 @login_required
 @require_POST
 def roadmap_edit(request, task_pk):
-    task = get_object_or_404(Task, pk=task_pk)
-    if not _user_can_view_task(request.user, task): return HttpResponseForbidden("Bu görevi görme yetkiniz yok.")
-    if not _user_can_edit_roadmap(request.user, task): return HttpResponseForbidden("Yol haritasını düzenleme yetkiniz yok.")
+    task, access = _get_task_with_access(request, task_pk)
+    if not access.can_view: return HttpResponseForbidden("Bu görevi görme yetkiniz yok.")
+    if not access.can_edit_roadmap: return HttpResponseForbidden("Yol haritasını düzenleme yetkiniz yok.")
 
     form = RoadmapEditForm(request.POST)
     if not form.is_valid():
@@ -483,70 +357,67 @@ def roadmap_edit(request, task_pk):
 
     raw_text = form.cleaned_data["roadmap_text"]
     lines = [ln.strip() for ln in raw_text.splitlines() if ln.strip()]
-    existing_by_order = {it.order: it for it in task.roadmap.all().order_by("order")}
-
-    max_order_new = len(lines)
-    for idx, line in enumerate(lines, start=1):
-        desc, dur = line, None
-        if "|" in line:
-            left, right = line.split("|", 1)
-            desc, right = left.strip(), right.strip()
-            if right:
-                try: dur = Decimal(right)
-                except (InvalidOperation, ValueError): dur = None
-
-        if idx in existing_by_order:
-            it = existing_by_order[idx]
-            it.description = desc[:300]
-            it.estimated_duration = dur
-            it.save(update_fields=["description", "estimated_duration"])
-        else:
-            RoadmapItem.objects.create(task=task, order=idx, description=desc[:300], estimated_duration=dur, is_completed=False)
-
-    task.roadmap.filter(order__gt=max_order_new).delete()
 
-    actor_name = request.user.get_full_name() or request.user.username
-    _notify(
-        _task_related_users(task), title="Yol haritası düzenlendi",
-        message=f"{actor_name}, '{task.title}' görevinde yol haritasını düzenledi.",
-        url=reverse("task_detail", args=[task.pk]), actor=request.user, level="info", task=task,
-    )
+    with transaction.atomic():
+        existing_by_order = {it.order: it for it in task.roadmap.all().order_by("order")}
+        max_order_new = len(lines)
+        for idx, line in enumerate(lines, start=1):
+            desc, dur = line, None
+            if "|" in line:
+                left, right = line.split("|", 1)
+                desc, right = left.strip(), right.strip()
+                if right:
+                    try: dur = Decimal(right)
+                    except (InvalidOperation, ValueError): dur = None
+
+            if idx in existing_by_order:
+                it = existing_by_order[idx]
+                it.description = desc[:300]
+                it.estimated_duration = dur
+                it.save(update_fields=["description", "estimated_duration"])
+            else:
+                RoadmapItem.objects.create(task=task, order=idx, description=desc[:300], estimated_duration=dur, is_completed=False)
+
+        task.roadmap.filter(order__gt=max_order_new).delete()
+
+        actor_name = request.user.get_full_name() or request.user.username
+        enqueue_notification(
+            task, title="Yol haritası düzenlendi",
+            message=f"{actor_name}, '{task.title}' görevinde yol haritasını düzenledi.",
+            url=reverse("task_detail", args=[task.pk]), actor=request.user, level="info", event="roadmap_edit",
+        )
 
     messages.success(request, "Yol haritası güncellendi.")
     return redirect("task_detail", pk=task.pk)
 
 @login_required
 def task_detail(request, pk):
-    task = get_object_or_404(Task, pk=pk)
-    if not _user_can_view_task(request.user, task):
+    task, access = _get_task_with_access(request, pk)
+    if not access.can_view:
         messages.error(request, "Bu görevi görüntüleme yetkiniz yok.")
         return redirect("home")
 
     today = timezone.now().date()
 
     if request.method == "POST" and "worklog_submit" in request.POST:
-        if task.assigned_to == request.user or task.partners.filter(id=request.user.id).exists():
+        if access.can_log_work:
             log_form = WorkLogForm(request.POST)
             if log_form.is_valid():
                 work_log = log_form.save(commit=False)
                 work_log.task = task
                 work_log.user = request.user
-                work_log.save()
-
-                task.spent_hours = WorkLog.objects.filter(task=task).aggregate(total=Sum("hours")).get("total") or 0
-                task.save(update_fields=["spent_hours"])
-
                 actor_name = request.user.get_full_name() or request.user.username
-                _send_task_event_mail(
-                    request, task, subject=f"{actor_name} {work_log.hours} saat efor girdi: {task.title}",
-                    actor=request.user, body_lines=[f"Tarih: {work_log.date}", f"Süre: {work_log.hours} saat", f"Açıklama: {work_log.description}"]
-                )
-
-                _notify(
-                    _task_related_users(task), title="Efor girişi yapıldı",
-                    message=f"{actor_name}, '{task.title}' için {work_log.hours} saat efor girdi.",
-                    url=reverse("task_detail", args=[task.pk]), actor=request.user, level="info", task=task
-                )
+                with transaction.atomic():
+                    record_worklog(work_log)
+                    enqueue_notification(
+                        task, title="Efor girişi yapıldı",
+                        message=f"{actor_name}, '{task.title}' için {work_log.hours} saat efor girdi.",
+                        url=reverse("task_detail", args=[task.pk]), actor=request.user, level="info", event="worklog_add"
+                    )
+                    _send_task_event_mail(
+                        request, task, subject=f"{actor_name} {work_log.hours} saat efor girdi: {task.title}",
+                        actor=request.user, body_lines=[f"Tarih: {work_log.date}", f"Süre: {work_log.hours} saat", f"Açıklama: {work_log.description}"]
+                    )
                 messages.success(request, "Çalışma kaydınız başarıyla eklendi.")
                 return redirect("task_detail", pk=task.pk)
             messages.error(request, "Efor kaydı hatalı. Lütfen alanları kontrol edin.")
@@ -561,8 +432,9 @@ def task_detail(request, pk):
     completed_steps_count = task.roadmap.filter(is_completed=True).count()
     total_spent_float = float(task.spent_hours or 0)
 
+    # Katkı dağılımı ham efor kayıtları yerine günlük özet tablodan okunur
     contrib_qs = (
-        WorkLog.objects.filter(task=task)
+        WorkLogDaily.objects.filter(task=task)
         .values("user_id", "user__first_name", "user__last_name", "user__username")
         .annotate(total=Coalesce(Sum("hours"), Value(0, output_field=DecimalField(max_digits=8, decimal_places=2))))
         .order_by("-total")
@@ -581,8 +453,7 @@ def task_detail(request, pk):
     context = {
         "task": task, "page_title": f"Görev Detayı: {task.title}", "today": today,
         "log_form": log_form, "work_logs": work_logs,
-        "can_toggle_roadmap": _user_can_toggle_roadmap(request.user, task),
-        "can_edit_roadmap": _user_can_edit_roadmap(request.user, task),
+        "access": access,
         "total_steps_count": total_steps_real if total_steps_real > 0 else 1,
         "total_steps_real": total_steps_real, "completed_steps_count": completed_steps_count,
         "contribution_rows": contribution_rows, "total_spent": round(total_spent_float, 2),
@@ -594,31 +465,30 @@ def create_task(request):
     if request.method == "POST":
         form = TaskForm(request.POST, user=request.user)
         if form.is_valid():
-            task = form.save(commit=False)
-            task.created_by = request.user
-            if request.user.role == "employee":
-                task.assigned_to = request.user
-            task.save()
-            form.save_m2m()
-
-            roadmap_text = form.cleaned_data.get("roadmap_summary")
-            if roadmap_text:
-                for i, step in enumerate(roadmap_text.split("\n"), 1):
-                    if step.strip(): RoadmapItem.objects.create(task=task, order=i, description=step.strip())
-
-            emails = [u.email for u in _task_related_users(task) if u.email]
-            if emails:
-                send_mail(
-                    f"Yeni Görev: {task.title}", f"Merhaba, '{task.title}' başlıklı görevde isminiz geçmektedir.",
-                    settings.DEFAULT_FROM_EMAIL, emails, fail_silently=True,
+            with transaction.atomic():
+                task = form.save(commit=False)
+                task.created_by = request.user
+                if request.user.role == "employee":
+                    task.assigned_to = request.user
+                task.save()
+                form.save_m2m()
+
+                roadmap_text = form.cleaned_data.get("roadmap_summary")
+                if roadmap_text:
+                    for i, step in enumerate(roadmap_text.split("\n"), 1):
+                        if step.strip(): RoadmapItem.objects.create(task=task, order=i, description=step.strip())
+
+                enqueue_email(
+                    task, subject=f"Yeni Görev: {task.title}", body=f"'{task.title}' başlıklı görevde isminiz geçmektedir.",
+                    url=request.build_absolute_uri(reverse("task_detail", args=[task.pk])), actor=request.user,
                 )
 
-            actor_name = request.user.get_full_name() or request.user.username
-            _notify(
-                _task_related_users(task), title="Yeni görev atandı 🚀",
-                message=f"{actor_name}, '{task.title}' görevini oluşturdu.",
-                url=reverse("task_detail", args=[task.pk]), actor=request.user, level="success", task=task
-            )
+                actor_name = request.user.get_full_name() or request.user.username
+                enqueue_notification(
+                    task, title="Yeni görev atandı 🚀",
+                    message=f"{actor_name}, '{task.title}' görevini oluşturdu.",
+                    url=reverse("task_detail", args=[task.pk]), actor=request.user, level="success", event="task_create"
+                )
             messages.success(request, "Görev başarıyla oluşturuldu!")
             return redirect("home")
     else:
@@ -627,8 +497,8 @@ def create_task(request):
 
 @login_required
 def update_task(request, pk):
-    task = get_object_or_404(Task, pk=pk)
-    if not _user_can_edit_task(request.user, task):
+    task, access = _get_task_with_access(request, pk)
+    if not access.can_edit:
         messages.error(request, "Bu görevi düzenleme yetkiniz yok!")
         return redirect("home")
 
@@ -644,13 +514,6 @@ def update_task(request, pk):
             if old_roadmap_text.replace('\r', '') != new_roadmap_text.replace('\r', ''):
                 changed_fields.append('roadmap')
 
-            task = form.save()
-
-            if 'roadmap' in changed_fields:
-                task.roadmap.all().delete()
-                for i, step in enumerate(new_roadmap_text.split("\n"), 1):
-                    if step.strip(): RoadmapItem.objects.create(task=task, order=i, description=step.strip())
-
             if changed_fields:
                 field_labels = {'title': 'Başlık', 'description': 'Açıklama', 'status': 'Durum', 'priority': 'Öncelik', 'due_date': 'Bitiş Tarihi', 'start_date': 'Başlangıç Tarihi', 'assigned_to': 'Atanan Kişi', 'partners': 'Ortaklar', 'size': 'İş Büyüklüğü', 'roadmap': 'Yol Haritası'}
                 changes_txt = ", ".join([field_labels.get(f, f) for f in changed_fields])
@@ -659,11 +522,22 @@ def update_task(request, pk):
                 msg = "Detaylar güncellendi."
 
             actor_name = request.user.get_full_name() or request.user.username
-            _notify(
-                _task_related_users(task), title="Görev güncellendi 📝",
-                message=f"{actor_name}, '{task.title}' görevini güncelledi. {msg}",
-                url=reverse("task_detail", args=[task.pk]), actor=request.user, level="warning", task=task
-            )
+            with transaction.atomic():
+                # spent_hours efor kayıtlarıyla artımlı tutulur; formdaki (okunduğu andaki) değer geri yazılmaz
+                task = form.save(commit=False)
+                task.save(update_fields=[f.name for f in Task._meta.concrete_fields if not f.primary_key and f.name != "spent_hours"])
+                form.save_m2m()
+
+                if 'roadmap' in changed_fields:
+                    task.roadmap.all().delete()
+                    for i, step in enumerate(new_roadmap_text.split("\n"), 1):
+                        if step.strip(): RoadmapItem.objects.create(task=task, order=i, description=step.strip())
+
+                enqueue_notification(
+                    task, title="Görev güncellendi 📝",
+                    message=f"{actor_name}, '{task.title}' görevini güncelledi. {msg}",
+                    url=reverse("task_detail", args=[task.pk]), actor=request.user, level="warning", event="task_update"
+                )
             messages.success(request, "Görev başarıyla güncellendi.")
             return redirect("task_detail", pk=task.pk)
     else:
@@ -673,15 +547,17 @@ def update_task(request, pk):
 
 @login_required
 def delete_task(request, pk):
-    task = get_object_or_404(Task, pk=pk)
-    if _user_can_delete_task(request.user, task):
+    task, access = _get_task_with_access(request, pk)
+    if access.can_delete:
         actor_name = request.user.get_full_name() or request.user.username
-        _notify(
-            _task_related_users(task), title="Görev Silindi 🗑️",
-            message=f"'{task.title}' görevi, {actor_name} tarafından silindi.",
-            url="", actor=request.user, level="danger", task=None
-        )
-        task.delete()
+        # Görev ilişkileri silineceği için alıcılar olay anında sabitlenir
+        with transaction.atomic():
+            enqueue_notification(
+                task, title="Görev Silindi 🗑️",
+                message=f"'{task.title}' görevi, {actor_name} tarafından silindi.",
+                url="", actor=request.user, level="danger", recipient_ids=RecipientResolver().resolve([task.pk])[task.pk], event="task_delete",
+            )
+            task.delete()
         messages.success(request, "Görev başarıyla silindi ve ilgililere bildirildi.")
     else:
         messages.error(request, "Bu görevi silme yetkiniz bulunmamaktadır.")
@@ -693,12 +569,13 @@ def task_history(request):
     try: selected_year = int(request.GET.get('year', current_year))
     except ValueError: selected_year = current_year
 
+    # Takımlı yönetici takımının tüm görevlerini, diğerleri yalnızca dahil oldukları görevleri listeler
     if request.user.role == 'manager' and request.user.team:
         tasks = Task.objects.filter(assigned_to__team=request.user.team)
     else:
-        tasks = Task.objects.filter(Q(assigned_to=request.user) | Q(partners=request.user))
-    
-    tasks = tasks.filter(due_date__year=selected_year).distinct().order_by('-due_date')
+        tasks = Task.objects.involving(request.user)
+
+    tasks = tasks.filter(due_date__year=selected_year).order_by('-due_date')
 
     total_count = tasks.count()
     completed_count = tasks.filter(status='tamamlandi').count()
@@ -729,24 +606,21 @@ def edit_worklog(request, pk):
         form = WorkLogForm(request.POST, instance=log)
         
         if form.is_valid():
-            work_log = form.save()
-            task.spent_hours = WorkLog.objects.filter(task=task).aggregate(total=Sum("hours"))["total"] or 0
-            task.save(update_fields=["spent_hours"])
-            
             actor_name = request.user.get_full_name() or request.user.username
-            
-            # E-posta Bildirimi
-            _send_task_event_mail(
-                request, task, subject=f"{actor_name} efor kaydını güncelledi: {task.title}",
-                actor=request.user, body_lines=[f"Eski Süre: {old_hours} saat", f"Yeni Süre: {work_log.hours} saat", f"Açıklama: {work_log.description}"]
-            )
-
-            # Sistem İçi Bildirim
-            _notify(
-                _task_related_users(task), title="Efor kaydı güncellendi",
-                message=f"{actor_name}, '{task.title}' için girdiği eforu {old_hours} saatten {work_log.hours} saate güncelledi.",
-                url=reverse("task_detail", args=[task.pk]), actor=request.user, level="warning", task=task,
-            )
+            with transaction.atomic():
+                work_log = form.save(commit=False)
+                change_worklog(work_log)
+                # Sistem İçi Bildirim (kuyruğa, değişiklikle aynı işlemde yazılır)
+                enqueue_notification(
+                    task, title="Efor kaydı güncellendi",
+                    message=f"{actor_name}, '{task.title}' için girdiği eforu {old_hours} saatten {work_log.hours} saate güncelledi.",
+                    url=reverse("task_detail", args=[task.pk]), actor=request.user, level="warning", event="worklog_edit",
+                )
+                # E-posta Bildirimi (kuyruğa, aynı işlemde)
+                _send_task_event_mail(
+                    request, task, subject=f"{actor_name} efor kaydını güncelledi: {task.title}",
+                    actor=request.user, body_lines=[f"Eski Süre: {old_hours} saat", f"Yeni Süre: {work_log.hours} saat", f"Açıklama: {work_log.description}"]
+                )
 
             messages.success(request, "Efor kaydı başarıyla güncellendi.")
             return redirect("task_detail", pk=task.pk)
@@ -766,87 +640,235 @@ def delete_worklog(request, pk):
         return redirect("task_detail", pk=task.pk)
         
     deleted_hours = log.hours 
-    log.delete()
-    
-    task.spent_hours = WorkLog.objects.filter(task=task).aggregate(total=Sum("hours"))["total"] or 0
-    task.save(update_fields=["spent_hours"])
-    
     actor_name = request.user.get_full_name() or request.user.username
-    
-    # E-posta Bildirimi
-    _send_task_event_mail(
-        request, task, subject=f"{actor_name} efor kaydını sildi: {task.title}",
-        actor=request.user, body_lines=[f"Silinen Süre: {deleted_hours} saat", "İlgili efor kaydı sistemden tamamen kaldırılmıştır."]
-    )
-
-    # Sistem İçi Bildirim
-    _notify(
-        _task_related_users(task), title="Efor kaydı silindi",
-        message=f"{actor_name}, '{task.title}' görevine ait {deleted_hours} saatlik efor kaydını sildi.",
-        url=reverse("task_detail", args=[task.pk]), actor=request.user, level="danger", task=task,
-    )
+    with transaction.atomic():
+        remove_worklog(log)
+        # Sistem İçi Bildirim (kuyruğa, değişiklikle aynı işlemde yazılır)
+        enqueue_notification(
+            task, title="Efor kaydı silindi",
+            message=f"{actor_name}, '{task.title}' görevine ait {deleted_hours} saatlik efor kaydını sildi.",
+            url=reverse("task_detail", args=[task.pk]), actor=request.user, level="danger", event="worklog_delete",
+        )
+        # E-posta Bildirimi (kuyruğa, aynı işlemde)
+        _send_task_event_mail(
+            request, task, subject=f"{actor_name} efor kaydını sildi: {task.title}",
+            actor=request.user, body_lines=[f"Silinen Süre: {deleted_hours} saat", "İlgili efor kaydı sistemden tamamen kaldırılmıştır."]
+        )
     
     messages.success(request, "Efor kaydı başarıyla silindi.")
     return redirect("task_detail", pk=task.pk)
 
+@login_required
+def timesheet(request):
+    """
+    Haftalık zaman çizelgesi: kullanıcı aktif görevleri için (görev × gün) saat tablosunu
+    doldurur; tüm hücreler tek POST'ta, tek işlemde (transaction) kaydedilir. Görev başına
+    tek özet bildirim ve e-posta üretilir.
+    """
+    today = timezone.now().date()
+    try:
+        anchor = datetime.strptime(request.POST.get("week") or request.GET.get("week") or "", "%Y-%m-%d").date()
+    except ValueError:
+        anchor = today
+    week_start = anchor - timedelta(days=anchor.weekday())
+    days = [week_start + timedelta(days=i) for i in range(7)]
+
+    # Yalnızca sorumlu/ortak olunan görevler listelenir (TaskAccess.can_log_work)
+    tasks = Task.objects.involving(request.user).filter(status__in=ACTIVE_STATUSES).order_by("due_date", "pk")
+    logged = {
+        (task_id, day): total for task_id, day, total in
+        WorkLogDaily.objects.filter(user=request.user, task__in=tasks, day__range=(days[0], days[-1])).order_by()
+        .values("task_id", "day").annotate(total=Sum("hours")).values_list("task_id", "day", "total")
+    }
+    form = TimesheetForm(request.POST or None, tasks=tasks, days=days, logged=logged)
+
+    if request.method == "POST" and form.is_valid():
+        week_url = f"{reverse('timesheet')}?week={week_start:%Y-%m-%d}"
+        entries = form.entries()
+        if not entries:
+            messages.info(request, "Kaydedilecek efor girilmedi.")
+            return redirect(week_url)
+
+        actor_name = request.user.get_full_name() or request.user.username
+        work_logs = [
+            WorkLog(task=task, user=request.user, date=day, hours=hours, description=description)
+            for task, description, cells in entries for day, hours in cells
+        ]
+        with transaction.atomic():
+            record_worklogs(work_logs)
+            for task, _, cells in entries:
+                total = sum(hours for _, hours in cells)
+                enqueue_notification(
+                    task, title="Haftalık efor girildi",
+                    message=f"{actor_name}, '{task.title}' için {len(cells)} güne toplam {total} saat efor girdi.",
+                    url=reverse("task_detail", args=[task.pk]), actor=request.user, level="info", event="timesheet",
+                )
+            for task, description, cells in entries:
+                _send_task_event_mail(
+                    request, task, subject=f"{actor_name} haftalık efor girdi: {task.title}", actor=request.user,
+                    body_lines=[*(f"{day:%d.%m.%Y}: {hours} saat" for day, hours in cells), f"Açıklama: {description}"],
+                )
+        messages.success(request, f"{len(entries)} görev için {len(work_logs)} efor kaydı eklendi.")
+        return redirect(week_url)
+
+    return render(request, "timesheet.html", {
+        "form": form, "days": days, "week_start": week_start, "today": today,
+        "prev_week": week_start - timedelta(days=7), "next_week": week_start + timedelta(days=7),
+        "page_title": "Haftalık Zaman Çizelgesi",
+    })
+
+@login_required
+@require_GET
+def team_weekly_report(request):
+    """
+    Yöneticinin takımı için kişi × hafta efor raporunu CSV olarak indirir. Toplamlar
+    `WorkLogDaily` özet tablosundan tek sorguda okunur; dönem varsayılan olarak bu hafta
+    dahil son 8 haftadır (`?weeks=`, en fazla 52).
+    """
+    team = request.user.team
+    if request.user.role != "manager" or not team:
+        return HttpResponseForbidden("Yalnızca ekip yöneticileri takım raporunu indirebilir.")
+    weeks = request.GET.get("weeks", "")
+    weeks = max(1, min(int(weeks), 52)) if weeks.isdigit() else 8
+    today = timezone.localdate()
+    week_starts = [today - timedelta(days=today.weekday() + 7 * i) for i in reversed(range(weeks))]
+    report = team_weekly_hours(team, week_starts[0], today)
+    members = CustomUser.objects.filter(
+        (Q(team=team) & ~Q(role="manager")) | Q(pk__in=list(report))
+    ).order_by("first_name", "last_name", "username")
+
+    response = HttpResponse(content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="haftalik-efor-{team}-{today:%Y%m%d}.csv"'
+    # Excel'in Türkçe karakterleri doğru okuması için BOM
+    response.write("\ufeff")
+    writer = csv.writer(response)
+    writer.writerow(["Çalışan", *(f"{week:%d.%m.%Y}" for week in week_starts), "Toplam"])
+    for member in members:
+        hours = report.get(member.pk, {})
+        row = [round(hours.get(week, 0.0), 2) for week in week_starts]
+        writer.writerow([member.get_full_name() or member.username, *row, round(sum(row), 2)])
+    return response
+
 
 # =========================================================
 # BİLDİRİM (INBOX) API VE ENDPOINT'LERİ
 # =========================================================
 @login_required
 def notifications_inbox(request):
-    qs = Notification.objects.filter(recipient=request.user).select_related("actor", "task").order_by("-created_at")
-    return render(request, "notifications/inbox.html", {"page_title": "Bildirim Merkezi", "notifications": qs[:200], "unread_count": qs.filter(is_read=False).count()})
+    notifications, next_cursor = notification_page(request.user, request.GET.get("cursor"), INBOX_PAGE_SIZE)
+    if _is_ajax(request):
+        # Sonsuz kaydırma: sonraki sayfanın satırları ve imleci
+        html = render_to_string("partials/notification_items.html", {"notifications": notifications}, request=request)
+        return JsonResponse({"html": html, "next_cursor": next_cursor})
+    can_announce = request.user.role == "manager" and bool(request.user.team)
+    return render(request, "notifications/inbox.html", {
+        "page_title": "Bildirim Merkezi", "notifications": notifications, "next_cursor": next_cursor,
+        "unread_count": unread_notification_count(request.user),
+        "announcement_form": TeamAnnouncementForm() if can_announce else None,
+    })
 
 @login_required
 def notifications_unread_count(request):
-    return JsonResponse({"unread": Notification.objects.filter(recipient=request.user, is_read=False).count()})
+    unread = unread_notification_count(request.user)
+    return _conditional_json(request, ("unread", request.user.pk, unread), lambda: {"unread": unread})
 
 @login_required
 @require_POST
 def notification_mark_read(request, pk):
-    n = get_object_or_404(Notification, pk=pk, recipient=request.user)
-    if not n.is_read:
-        n.is_read = True
-        n.save(update_fields=["is_read"])
+    with transaction.atomic():
+        if Notification.objects.filter(pk=pk, recipient=request.user, is_read=False).update(is_read=True):
+            adjust_unread_counts({request.user.pk: -1})
+        elif not Notification.objects.filter(pk=pk, recipient=request.user).exists():
+            raise Http404
     return JsonResponse({"ok": True}) if _is_ajax(request) else redirect("notifications_inbox")
 
 @login_required
 @require_POST
 def notifications_mark_all_read(request):
-    Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    with transaction.atomic():
+        marked = Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        adjust_unread_counts({request.user.pk: -marked})
+        mark_announcements_read(request.user)
+    return JsonResponse({"ok": True}) if _is_ajax(request) else redirect("notifications_inbox")
+
+@login_required
+@require_POST
+def announcement_mark_read(request, pk):
+    announcement = get_object_or_404(team_announcements_for(request.user), pk=pk)
+    mark_announcements_read(request.user, announcement.pk)
     return JsonResponse({"ok": True}) if _is_ajax(request) else redirect("notifications_inbox")
 
+@login_required
+@require_POST
+def team_announcement_create(request):
+    """
+    Yöneticinin kendi takımına duyuru göndermesi. Üye başına bildirim satırı yazılmaz;
+    duyuru tek satırdır ve üyelerin gelen kutusuna okuma anında eklenir.
+    """
+    if request.user.role != "manager" or not request.user.team:
+        return HttpResponseForbidden("Yalnızca ekip yöneticileri takım duyurusu gönderebilir.")
+    form = TeamAnnouncementForm(request.POST)
+    if form.is_valid():
+        announcement = form.save(commit=False)
+        announcement.team, announcement.author = request.user.team, request.user
+        announcement.save()
+        messages.success(request, "Duyuru takıma gönderildi.")
+    else:
+        messages.error(request, "Duyuru gönderilemedi: başlık zorunludur.")
+    return redirect("notifications_inbox")
+
 @login_required
 @require_POST
 def notifications_delete_all(request):
-    Notification.objects.filter(recipient=request.user).delete()
+    delete_notifications(Notification.objects.filter(recipient=request.user))
     return JsonResponse({"ok": True}) if _is_ajax(request) else redirect("notifications_inbox")
 
 @login_required
 @require_POST
 def notification_delete(request, pk):
-    get_object_or_404(Notification, pk=pk, recipient=request.user).delete()
+    with transaction.atomic():
+        n = get_object_or_404(Notification.objects.select_for_update(), pk=pk, recipient=request.user)
+        n.delete()
+        adjust_unread_counts({request.user.pk: 0 if n.is_read else -1}, touched={request.user.pk})
     return JsonResponse({"ok": True}) if _is_ajax(request) else redirect("notifications_inbox")
 
 @login_required
 @require_POST
 def notifications_delete_read(request):
-    Notification.objects.filter(recipient=request.user, is_read=True).delete()
+    delete_notifications(Notification.objects.filter(recipient=request.user, is_read=True))
     return JsonResponse({"ok": True}) if _is_ajax(request) else redirect("notifications_inbox")
 
 @login_required
 @require_GET
 def notifications_latest_api(request):
     limit = max(1, min(int(request.GET.get("limit", "5") if request.GET.get("limit", "5").isdigit() else 5), 20))
-    qs = Notification.objects.filter(recipient=request.user).select_related("actor", "task").order_by("-created_at")[:limit]
-    
-    items = [{
-        "id": n.id, "title": n.title, "message": (n.message or "")[:140],
-        "url": n.url or (reverse("task_detail", args=[n.task_id]) if n.task_id else ""),
-        "is_read": n.is_read, "level": n.level,
-        "created_at": timezone.localtime(n.created_at).isoformat(),
-        "created_at_display": timezone.localtime(n.created_at).strftime("%d %b %Y %H:%M"),
-        "actor": (n.actor.get_full_name() or n.actor.username) if n.actor else "",
-    } for n in qs]
-    return JsonResponse({"items": items})
\ No newline at end of file
+    cursor = request.GET.get("cursor") or ""
+    marker = notification_marker(request.user)
+
+    def build_payload():
+        notifications, next_cursor = notification_page(request.user, cursor, limit)
+        return {"items": serialize_notifications(notifications), "next_cursor": next_cursor}
+
+    validator = ("latest", request.user.pk, limit, cursor, marker["version"], marker["unread"], marker["announcement"])
+    return _conditional_json(request, validator, build_payload)
+
+
+def _stream_user(request):
+    return request.user if request.user.is_authenticated else None
+
+async def notifications_stream(request):
+    """
+    Bildirim sayısı ve son bildirimler için Server-Sent Events akışı (yalnızca ASGI altında).
+
+    WSGI altında uzun ömürlü bir akış bir işçiyi kilitleyeceğinden 204 döner; tarayıcıda
+    EventSource bağlantısı kapanır ve istemci 30 saniyelik sorgulamaya geri düşer.
+    """
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return HttpResponse(status=401)
+    if request.method != "GET" or not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(notification_event_stream(user), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
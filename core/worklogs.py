@@ -0,0 +1,317 @@
+import csv
+import json
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .forms import WorkLogForm
+from .models import CustomUser, Task, WorkLog, WorkLogDaily
+from .signals import _task_members, schedule_dashboard_invalidation, schedule_workload_refresh
+from .utils import adjust_worklog_daily
+
+_HOURS_FIELD = DecimalField(max_digits=6, decimal_places=2)
+
+
+# ==========================================
+# EFOR YAZMA YOLLARI
+# ==========================================
+# Task.spent_hours toplamı yeniden hesaplanmaz; her yazma kendi farkını (delta) görev satırına
+# `spent_hours = spent_hours + delta` olarak, efor kaydıyla aynı işlemde (transaction) uygular.
+# Eşzamanlı iki giriş birbirinin güncellemesini ezemez.
+
+def adjust_spent_hours(deltas):
+    """
+    Görevlerin harcanan süresine verilen farkları atomik olarak ekler.
+
+    Args:
+        deltas (dict): {görev id: Decimal fark}; sıfır olan farklar atlanır.
+    """
+    for task_id, delta in deltas.items():
+        if delta:
+            Task.objects.filter(pk=task_id).update(spent_hours=F("spent_hours") + delta)
+
+
+def record_worklog(work_log):
+    """Yeni efor kaydını yazar ve süresini görevin harcanan süresine ekler."""
+    with transaction.atomic():
+        work_log.save()
+        adjust_spent_hours({work_log.task_id: work_log.hours})
+    return work_log
+
+
+def change_worklog(work_log):
+    """
+    Var olan efor kaydını (ör. `form.save(commit=False)` sonucu) kaydeder; görevin harcanan
+    süresine yalnızca eski ve yeni süre arasındaki fark eklenir. Eski süre, kayıt satırı
+    kilitlenerek veritabanından okunur.
+
+    Returns:
+        Decimal: Veritabanındaki eski süre.
+    """
+    with transaction.atomic():
+        old_hours = WorkLog.objects.select_for_update().filter(pk=work_log.pk).values_list("hours", flat=True).first()
+        work_log.save()
+        adjust_spent_hours({work_log.task_id: work_log.hours - (old_hours or 0)})
+    return old_hours
+
+
+def remove_worklog(work_log):
+    """
+    Efor kaydını siler ve süresini görevin harcanan süresinden düşer. Kayıt başka bir
+    istekte zaten silindiyse süre ikinci kez düşülmez.
+    """
+    with transaction.atomic():
+        old_hours = WorkLog.objects.select_for_update().filter(pk=work_log.pk).values_list("hours", flat=True).first()
+        if old_hours is None:
+            return None
+        work_log.delete()
+        adjust_spent_hours({work_log.task_id: -old_hours})
+    return old_hours
+
+
+def _write_worklog_batch(batch):
+    deltas = defaultdict(Decimal)
+    daily = defaultdict(Decimal)
+    for work_log in batch:
+        deltas[work_log.task_id] += work_log.hours
+        daily[(work_log.user_id, work_log.task_id, work_log.date)] += work_log.hours
+    # Parti ve görev başına tek artırım aynı işlemde yazılır; yarıda kalan aktarım süreleri bozmaz.
+    # bulk_create sinyal üretmediğinden günlük özet tablo da burada güncellenir.
+    with transaction.atomic():
+        WorkLog.objects.bulk_create(batch)
+        adjust_spent_hours(deltas)
+        adjust_worklog_daily(daily)
+
+
+def record_worklogs(work_logs):
+    """
+    Birden çok yeni efor kaydını tek `bulk_create` ile yazar; harcanan süre görev başına tek
+    artırımla güncellenir. Kayıt sinyalleri tetiklenmediğinden iş yükü yenilemesi ve pano
+    geçersizleştirmesi etkilenen görevlerin üyeleri için burada planlanır.
+    """
+    with transaction.atomic():
+        _write_worklog_batch(work_logs)
+        members, spans = _task_members({work_log.task_id for work_log in work_logs})
+        schedule_workload_refresh(members, spans)
+        schedule_dashboard_invalidation(members)
+    return work_logs
+
+
+# ==========================================
+# TUTARLILIK KONTROLÜ
+# ==========================================
+
+def _expected_spent_hours():
+    total_sq = WorkLog.objects.filter(task_id=OuterRef("pk")).order_by().values("task_id").annotate(total=Sum("hours")).values("total")
+    return Coalesce(Subquery(total_sq, output_field=_HOURS_FIELD), Value(Decimal("0")), output_field=_HOURS_FIELD)
+
+
+def reconcile_spent_hours(chunk_size=500, repair=True):
+    """
+    Görevlerin harcanan süresini efor kayıtlarının toplamıyla birincil anahtar sırasıyla,
+    `chunk_size` görevlik parçalar halinde karşılaştırır; `repair` ise sapmaları onarır.
+
+    Returns:
+        list: (görev id, kayıtlı değer, gerçek toplam) demetleri; sapan görevler.
+    """
+    drifted = []
+    last_id = 0
+    while True:
+        rows = list(
+            Task.objects.filter(pk__gt=last_id).order_by("pk")
+            .annotate(expected=_expected_spent_hours())
+            .values_list("pk", "spent_hours", "expected")[:chunk_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        chunk = [(pk, stored, expected) for pk, stored, expected in rows if stored != expected]
+        if chunk and repair:
+            task_ids = [pk for pk, _, _ in chunk]
+            # Düzeltme aynı UPDATE içinde yeniden toplanır; okuma ile yazma arasındaki girişler kaybolmaz
+            with transaction.atomic():
+                Task.objects.filter(pk__in=task_ids).update(spent_hours=_expected_spent_hours())
+                members, spans = _task_members(task_ids)
+                schedule_workload_refresh(members, spans)
+                schedule_dashboard_invalidation(members)
+        drifted.extend(chunk)
+    return drifted
+
+
+def reconcile_worklog_daily(chunk_size=500, repair=True):
+    """
+    Günlük efor özet tablosunu (WorkLogDaily) efor kayıtlarının (çalışan, görev, gün) toplamlarıyla
+    görev id sırasıyla parçalar halinde karşılaştırır; `repair` ise sapan satırları yeniden yazar.
+
+    Returns:
+        list: (kullanıcı id, görev id, gün, tablodaki değer, gerçek toplam) demetleri.
+    """
+    drifted = []
+    last_id = 0
+    while True:
+        task_ids = list(Task.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not task_ids:
+            break
+        last_id = task_ids[-1]
+        actual = _daily_totals(task_ids)
+        stored = {
+            (uid, task_id, day): hours for uid, task_id, day, hours in
+            WorkLogDaily.objects.filter(task_id__in=task_ids).values_list("user_id", "task_id", "day", "hours")
+        }
+        chunk = [
+            (*key, stored.get(key), actual.get(key, Decimal("0")))
+            for key in sorted(stored.keys() | actual.keys()) if stored.get(key) != actual.get(key)
+        ]
+        if chunk and repair:
+            _rewrite_daily_rows(sorted({task_id for _, task_id, _, _, _ in chunk}))
+        drifted.extend(chunk)
+    return drifted
+
+
+def _daily_totals(task_ids):
+    return {
+        (uid, task_id, day): total for uid, task_id, day, total in
+        WorkLog.objects.filter(task_id__in=task_ids).order_by()
+        .values("user_id", "task_id", "date").annotate(total=Sum("hours")).values_list("user_id", "task_id", "date", "total")
+    }
+
+
+def _rewrite_daily_rows(task_ids):
+    # Sapan görevlerin satırları silinip aynı işlem içinde yeniden toplanan değerlerle yazılır; mevcut satırların takımı korunur
+    with transaction.atomic():
+        rows = WorkLogDaily.objects.filter(task_id__in=task_ids)
+        teams = {(uid, task_id, day): team for uid, task_id, day, team in rows.values_list("user_id", "task_id", "day", "team")}
+        rows.delete()
+        actual = _daily_totals(task_ids)
+        missing = {uid for uid, task_id, day in actual if (uid, task_id, day) not in teams}
+        user_teams = dict(CustomUser.objects.filter(pk__in=missing).values_list("id", "team")) if missing else {}
+        WorkLogDaily.objects.bulk_create([
+            WorkLogDaily(user_id=uid, task_id=task_id, day=day, hours=hours, team=teams.get((uid, task_id, day), user_teams.get(uid) or ""))
+            for (uid, task_id, day), hours in actual.items() if hours
+        ], batch_size=2000)
+
+
+# ==========================================
+# TOPLU İÇE AKTARMA
+# ==========================================
+
+WORKLOG_IMPORT_BATCH_SIZE = 2000
+
+# Raporlanan hatalı satır sayısının üst sınırı; bellek kullanımı dosya boyutundan bağımsız kalır
+WORKLOG_IMPORT_MAX_ERRORS = 100
+
+
+def read_worklog_rows(stream, fmt="csv"):
+    """
+    Metin akışından efor satırlarını tek tek okur; dosya belleğe alınmaz.
+
+    CSV başlık satırı ya da JSONL nesneleri `task` (görev id), `user` (kullanıcı adı),
+    `hours`, `date` (YYYY-AA-GG) ve `description` alanlarını içerir.
+
+    Yields:
+        tuple: (satır numarası, alan sözlüğü); JSONL'de çözülemeyen satır için sözlük yerine None.
+    """
+    if fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_no, row if isinstance(row, dict) else None
+        return
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, {(key or "").strip(): value for key, value in row.items()}
+
+
+class _WorkLogRowValidator:
+    """
+    Satırları `WorkLogForm` kurallarıyla (gelecek tarih yasağı dahil) doğrular.
+    Görev ve kullanıcı çözümleri akış boyunca önbellekte tutulur.
+    """
+
+    def __init__(self):
+        self.task_ids = {}
+        self.user_ids = {}
+
+    def _task_id(self, value):
+        try:
+            task_id = int(value)
+        except (TypeError, ValueError):
+            return None
+        if task_id not in self.task_ids:
+            self.task_ids[task_id] = Task.objects.filter(pk=task_id).exists()
+        return task_id if self.task_ids[task_id] else None
+
+    def _user_id(self, value):
+        username = str(value or "").strip()
+        if username not in self.user_ids:
+            self.user_ids[username] = CustomUser.objects.filter(username=username).values_list("id", flat=True).first()
+        return self.user_ids[username]
+
+    def build(self, row):
+        """Satırdan kaydedilmemiş bir WorkLog üretir; hatalıysa (None, hata metni) döner."""
+        if row is None:
+            return None, "Satır çözümlenemedi."
+        task_id = self._task_id(row.get("task"))
+        if task_id is None:
+            return None, f"Görev bulunamadı: {row.get('task')!r}"
+        user_id = self._user_id(row.get("user"))
+        if user_id is None:
+            return None, f"Kullanıcı bulunamadı: {row.get('user')!r}"
+
+        form = WorkLogForm(
+            {name: row.get(name) for name in ("hours", "date", "description")},
+            instance=WorkLog(task_id=task_id, user_id=user_id),
+        )
+        if not form.is_valid():
+            return None, "; ".join(f"{name}: {' '.join(errors)}" for name, errors in form.errors.items())
+        if form.instance.hours <= 0:
+            return None, "hours: Süre sıfırdan büyük olmalıdır."
+        return form.instance, None
+
+
+def import_worklogs(rows, batch_size=WORKLOG_IMPORT_BATCH_SIZE, dry_run=False):
+    """
+    `read_worklog_rows` çıktısını doğrulayıp `batch_size` satırlık partiler halinde
+    `bulk_create` ile yazar. Kayıt sinyalleri tetiklenmez: satır başına bildirim, e-posta
+    ya da iş yükü yenilemesi yapılmaz; yenileme ve pano geçersizleştirmesi aktarım sonunda
+    etkilenen görevlerin üyeleri için bir kez yapılır.
+
+    Returns:
+        dict: created (yazılan / `dry_run` ise geçerli satır), failed (hatalı satır) ve
+        errors (ilk `WORKLOG_IMPORT_MAX_ERRORS` hata için (satır numarası, mesaj)).
+    """
+    validator = _WorkLogRowValidator()
+    result = {"created": 0, "failed": 0, "errors": []}
+    affected = set()
+    batch = []
+    for line_no, row in rows:
+        work_log, error = validator.build(row)
+        if error:
+            result["failed"] += 1
+            if len(result["errors"]) < WORKLOG_IMPORT_MAX_ERRORS:
+                result["errors"].append((line_no, error))
+            continue
+        result["created"] += 1
+        if dry_run:
+            continue
+        batch.append(work_log)
+        affected.add(work_log.task_id)
+        if len(batch) >= batch_size:
+            _write_worklog_batch(batch)
+            batch = []
+    if batch:
+        _write_worklog_batch(batch)
+
+    task_ids = sorted(affected)
+    for start in range(0, len(task_ids), 500):
+        members, spans = _task_members(task_ids[start:start + 500])
+        schedule_workload_refresh(members, spans)
+        schedule_dashboard_invalidation(members)
+    return result
@@ -9,6 +9,7 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 django.setup()
 
 from core.models import CustomUser, Task, RoadmapItem, WorkLog, Notification
+from core.notifications import reconcile_unread_counts
 
 def run():
     print("Eski veriler temizleniyor.")
@@ -171,6 +172,9 @@ def run():
     make_notification(m2, t2_u4, task7, "Efor kaydı güncellendi", "İrem Bulut, girdiği eforu 15 saatten 25 saate güncelledi.", "warning", 2, is_read=False)
     make_notification(m2, t2_u2, task8, "Görev güncellendi 📝", "Gizem Polat, 'Regresyon Otomasyonu' görevini Tamamlandı yaptı.", "warning", 15, is_read=True)
 
+    # Doğrudan oluşturulan bildirimler için okunmamış sayaçlarını eşitle
+    reconcile_unread_counts()
+
     print("\n" + "="*60)
     print("="*60)
     print("\n[ TEST HESAPLARI ] (Şifre: 123)")